@@ -0,0 +1,83 @@
+"""
+Bitlings benchmark suite.
+
+Run from the backend directory:
+
+    python -m benchmarks run [--quick] [--filter REGEX] [--output results.json]
+    python -m benchmarks run --save-baseline benchmarks/baseline.json
+    python -m benchmarks compare benchmarks/baseline.json [results.json] [--threshold 0.2]
+
+`compare` runs the suite itself when no results file is given, prints a table
+and exits with status 1 if any case regressed by more than the threshold.
+"""
+import argparse
+import json
+import re
+import sys
+
+from .cases import all_cases
+from .harness import (run_cases, load_results, save_results, compare, format_comparison,
+                      DEFAULT_THRESHOLD)
+
+
+def _select(args):
+    cases = all_cases()
+    if args.filter:
+        pattern = re.compile(args.filter)
+        cases = [case for case in cases if pattern.search(case.name)]
+    if args.quick:
+        cases = [case for case in cases if not case.slow]
+    return cases
+
+
+def _run(args):
+    def progress(name, timing):
+        print(f"{name:<44} median {timing['median_ms']:>10.3f} ms  best {timing['best_ms']:>10.3f} ms",
+              file=sys.stderr, flush=True)
+    return run_cases(_select(args), repeat_scale=0.3 if args.quick else 1.0, progress=progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "compare"):
+        command = commands.add_parser(name)
+        command.add_argument("--filter", help="Only run cases whose name matches this regex")
+        command.add_argument("--quick", action="store_true", help="Fewer samples, skip slow cases")
+    commands.choices["run"].add_argument("--output", help="Write results JSON here (default: stdout)")
+    commands.choices["run"].add_argument("--save-baseline", metavar="PATH",
+                                         help="Also store the results as a baseline file")
+    commands.choices["compare"].add_argument("baseline", help="Baseline results file")
+    commands.choices["compare"].add_argument("current", nargs="?",
+                                             help="Results file to check (default: run the suite now)")
+    commands.choices["compare"].add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                             help="Relative slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        document = _run(args)
+        if args.save_baseline:
+            save_results(document, args.save_baseline)
+        if args.output:
+            save_results(document, args.output)
+        elif not args.save_baseline:
+            print(json.dumps(document, indent=2, sort_keys=True))
+        return 0
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current) if args.current else _run(args)
+    rows = compare(baseline, current, args.threshold)
+    if args.filter:
+        # Cases filtered out of this run are not "missing"
+        rows = [row for row in rows if row[3] != "missing"]
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row[3] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
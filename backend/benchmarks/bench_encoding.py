@@ -0,0 +1,79 @@
+"""
+Compare JSON and binary world_update encodings.
+
+Builds worlds of increasing size, encodes a keyframe and a delta after one
+simulated tick, and reports bytes per frame and encode time for each encoding.
+
+Run from the backend directory:
+    python -m benchmarks.bench_encoding [--sizes 100 1000 10000] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from bitlings.simulation.environment import Environment
+from bitlings.network.delta import DeltaEncoder
+from bitlings.network import binary
+
+
+def _time(fn, repeat: int) -> float:
+    """Best-of-`repeat` wall time of `fn()` in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def measure(creatures: int, repeat: int):
+    """Encode a keyframe and a one-tick delta for a world with `creatures` Bitlings."""
+    random.seed(0)
+    np.random.seed(0)
+    environment = Environment(width=2000, height=2000)
+    environment.add_initial_creatures(creatures - len(environment.bitlings))
+    encoder = DeltaEncoder()
+    keyframe = encoder.encode(environment.get_state())
+
+    environment.population.update_passive(0.1)
+    environment.choose_actions()
+    for bitling in environment.bitlings:
+        bitling.execute_action(0.1)
+    delta = encoder.encode(environment.get_state())
+
+    rows = []
+    for label, message in (("keyframe", keyframe), ("delta", delta)):
+        json_bytes = len(json.dumps(message).encode("utf-8"))
+        binary_bytes = len(binary.encode_frame(message))
+        rows.append({
+            "creatures": creatures,
+            "frame": label,
+            "json_bytes": json_bytes,
+            "binary_bytes": binary_bytes,
+            "json_ms": _time(lambda: json.dumps(message), repeat),
+            "binary_ms": _time(lambda: binary.encode_frame(message), repeat),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'creatures':>9} {'frame':>8} {'json B':>10} {'binary B':>10} {'ratio':>6} "
+          f"{'json ms':>8} {'binary ms':>9}")
+    for size in args.sizes:
+        for row in measure(size, args.repeat):
+            ratio = row["binary_bytes"] / row["json_bytes"]
+            print(f"{row['creatures']:>9} {row['frame']:>8} {row['json_bytes']:>10} "
+                  f"{row['binary_bytes']:>10} {ratio:>6.2f} {row['json_ms']:>8.2f} "
+                  f"{row['binary_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
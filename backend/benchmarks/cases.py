@@ -0,0 +1,296 @@
+"""
+Benchmark cases: perception, inference and learning, full ticks, state
+serialization and snapshot persistence.
+
+Every world is built from a fixed seed so runs are comparable.
+"""
+import json
+import math
+import os
+import random
+import tempfile
+from typing import List
+
+import numpy as np
+
+from bitlings.ai.network import BitlingNetwork
+from bitlings.ai.topology import DynamicNetwork
+from bitlings.simulation.environment import Environment
+from bitlings.simulation.loop import Simulation
+from bitlings.network.delta import DeltaEncoder
+from bitlings.network import binary
+from bitlings.simulation.snapshot import save_snapshot, load_snapshot
+from bitlings.simulation.traces import EligibilityTraces
+from bitlings.simulation.wakeups import DecisionScheduler
+from bitlings.simulation.lod import LevelOfDetail
+
+from .harness import Case
+
+SEED = 1234
+TICK_SIZES = (10, 100, 1000, 10000)
+# World edge per sqrt(creature), so density stays the same at every size
+SPACING = 100.0
+
+
+def build_world(creatures: int, food: int = None, obstacles: int = 4, seed: int = SEED) -> Environment:
+    """A seeded world with `creatures` Bitlings at a constant density."""
+    random.seed(seed)
+    np.random.seed(seed)
+    side = max(500.0, SPACING * math.sqrt(max(creatures, food or 0, obstacles)))
+    environment = Environment(width=side, height=side,
+                              initial_creatures=creatures,
+                              initial_food=creatures if food is None else food)
+    environment.obstacles = []
+    for _ in range(obstacles):
+        environment.add_obstacle(random.uniform(0, side), random.uniform(0, side),
+                                 random.uniform(10, 30))
+    return environment
+
+
+def _perception(food: int, obstacles: int):
+    def setup():
+        environment = build_world(creatures=100, food=food, obstacles=obstacles)
+        bitlings = environment.bitlings
+        cache = environment.perception
+
+        def run():
+            # Cold perception: drop the per-tick cache so every call scans
+            cache.invalidate()
+            for bitling in bitlings:
+                bitling.perceive_environment()
+        return run
+    return setup
+
+
+def _avoidance(obstacles: int):
+    def setup():
+        environment = build_world(creatures=100, food=0, obstacles=obstacles)
+        bitlings = environment.bitlings
+
+        def run():
+            for bitling in bitlings:
+                environment.obstacle_avoidance(bitling.x, bitling.y)
+        return run
+    return setup
+
+
+def _flow_update(food: int):
+    def setup():
+        environment = build_world(creatures=0, food=food)
+        flow = environment.flow
+        flow.sync()
+
+        def run():
+            # One item eaten and one grown elsewhere, as during a busy tick
+            environment.remove_food(environment.food_sources[0]['id'])
+            environment.add_food({})
+            flow.sync()
+        return run
+    return setup
+
+
+def _settle():
+    random.seed(SEED)
+    np.random.seed(SEED)
+    network = BitlingNetwork()
+    network.set_inputs(60.0, 40.0, 120.0, 0.6, -0.8)
+    return network.settle
+
+
+def _apply_learning():
+    random.seed(SEED)
+    np.random.seed(SEED)
+    network = BitlingNetwork()
+    network.set_inputs(60.0, 40.0, 120.0, 0.6, -0.8)
+    network.settle()
+    return lambda: network.apply_learning(2, True)
+
+
+def _learning(creatures: int, batched: bool):
+    def setup():
+        environment = build_world(creatures)
+        population = environment.population
+        rows = np.arange(population.count)
+        networks = population.networks
+        networks.set_inputs(rows, population.hunger[rows], population.energy[rows],
+                            np.full(len(rows), 120.0), np.full(len(rows), 0.6),
+                            np.full(len(rows), -0.8))
+        networks.settle(rows)
+        # Every creature finishes an action in the same tick
+        events = [(bitling, 2, 1.0) for bitling in environment.bitlings]
+        if batched:
+            return lambda: population.apply_learning(events)
+
+        def run():
+            for bitling, action, _ in events:
+                bitling.network.apply_learning(action, True)
+        return run
+    return setup
+
+
+def _trace_update(creatures: int):
+    def setup():
+        environment = build_world(creatures)
+        population = environment.population
+        rows = np.arange(population.count)
+        networks = population.networks
+        networks.set_inputs(rows, population.hunger[rows], population.energy[rows],
+                            np.full(len(rows), 120.0), np.full(len(rows), 0.6),
+                            np.full(len(rows), -0.8))
+        networks.settle(rows)
+        traces = EligibilityTraces()
+        return lambda: traces.mark(population, 0.1)
+    return setup
+
+
+def _dynamic_settle(hidden: int, sparse: bool):
+    def setup():
+        random.seed(SEED)
+        np.random.seed(SEED)
+        network = DynamicNetwork.from_network(BitlingNetwork())
+        # A large hidden layer where one grown unit in 20 has an input and an output
+        new = np.array(network.add_hidden_units(hidden - network.hidden_size))[::20]
+        sources = np.random.randint(0, network.input_size, new.size)
+        targets = np.random.randint(0, network.output_size, new.size)
+        network.connect("input_hidden", sources, new, np.random.uniform(-0.5, 0.5, new.size))
+        network.connect("hidden_output", new, targets, np.random.uniform(-0.5, 0.5, new.size))
+        if not sparse:
+            network = DynamicNetwork(network.weights_input_hidden.to_dense(),
+                                     network.weights_hidden_output.to_dense(),
+                                     network.bias_hidden, network.bias_output)
+            network.weights_input_hidden.live[...] = True  # Dense storage regardless of density
+            network.weights_hidden_output.live[...] = True
+        network.set_inputs(60.0, 40.0, 120.0, 0.6, -0.8)
+        return network.settle
+    return setup
+
+
+def _batched_settle(creatures: int):
+    def setup():
+        environment = build_world(creatures)
+        population = environment.population
+        rows = np.arange(population.count)
+        networks = population.networks
+        networks.set_inputs(rows, population.hunger[rows], population.energy[rows],
+                            np.full(len(rows), 120.0), np.full(len(rows), 0.6),
+                            np.full(len(rows), -0.8))
+        return lambda: networks.settle(rows)
+    return setup
+
+
+def _tick(creatures: int):
+    def setup():
+        simulation = Simulation(build_world(creatures))
+        dt = simulation.timestep.dt
+        return lambda: simulation.step(dt)
+    return setup
+
+
+def _scheduled_tick(creatures: int):
+    def setup():
+        environment = build_world(creatures)
+        simulation = Simulation(environment, decider=DecisionScheduler(environment))
+        dt = simulation.timestep.dt
+        for _ in range(50):  # Past the first ticks, where everyone is due at once
+            simulation.step(dt)
+        return lambda: simulation.step(dt)
+    return setup
+
+
+def _lod_tick(creatures: int):
+    def setup():
+        environment = build_world(creatures)
+        lod = LevelOfDetail(environment)
+        # One 800x600 client viewport in a corner of the world
+        lod.set_regions([(0.0, 0.0, 800.0, 600.0)])
+        simulation = Simulation(environment, lod=lod)
+        dt = simulation.timestep.dt
+        return lambda: simulation.step(dt)
+    return setup
+
+
+def _get_state(creatures: int):
+    def setup():
+        environment = build_world(creatures)
+        return environment.get_state
+    return setup
+
+
+def _state_json(creatures: int):
+    def setup():
+        environment = build_world(creatures)
+        return lambda: json.dumps(environment.get_state())
+    return setup
+
+
+def _delta_binary(creatures: int):
+    def setup():
+        simulation = Simulation(build_world(creatures))
+        before = simulation.environment.get_state()
+        simulation.step(simulation.timestep.dt)
+        states = [before, simulation.environment.get_state()]
+        encoder = DeltaEncoder(keyframe_interval=2 ** 31)
+        encoder.encode(before)
+        flip = [0]
+
+        def run():
+            # Alternate between the two states so every call is a one-tick delta
+            flip[0] ^= 1
+            binary.encode_frame(encoder.encode(states[flip[0]]))
+        return run
+    return setup
+
+
+def _snapshot_save(creatures: int):
+    def setup():
+        environment = build_world(creatures)
+        path = os.path.join(tempfile.mkdtemp(prefix="bitlings-bench-"), "world")
+        return lambda: save_snapshot(environment, path)
+    return setup
+
+
+def _snapshot_load(creatures: int, mmap: bool):
+    def setup():
+        path = os.path.join(tempfile.mkdtemp(prefix="bitlings-bench-"), "world")
+        save_snapshot(build_world(creatures), path)
+        return lambda: load_snapshot(path, mmap=mmap)
+    return setup
+
+
+def all_cases() -> List[Case]:
+    cases = []
+    for food, obstacles in ((10, 4), (100, 16), (1000, 64)):
+        cases.append(Case(f"perception/food={food},obstacles={obstacles}",
+                          _perception(food, obstacles), repeat=15))
+    for obstacles in (4, 64):
+        cases.append(Case(f"obstacles/avoidance/obstacles={obstacles}", _avoidance(obstacles), repeat=15))
+    cases.append(Case("flow/update/food=100", _flow_update(100), repeat=15, number=20))
+    cases.append(Case("network/settle", _settle, repeat=15, number=200))
+    cases.append(Case("network/apply_learning", _apply_learning, repeat=15, number=200))
+    for batched in (False, True):
+        cases.append(Case(f"learning/{'batched' if batched else 'per_network'}/creatures=1000",
+                          _learning(1000, batched), repeat=11))
+    cases.append(Case("traces/update/creatures=1000", _trace_update(1000), repeat=11))
+    for sparse in (False, True):
+        cases.append(Case(f"topology/settle/{'sparse' if sparse else 'dense'}/hidden=20000",
+                          _dynamic_settle(20000, sparse), repeat=11, number=20))
+    for creatures in TICK_SIZES:
+        slow = creatures >= 10000
+        cases.append(Case(f"inference/creatures={creatures}", _batched_settle(creatures),
+                          repeat=5 if slow else 11))
+        cases.append(Case(f"tick/creatures={creatures}", _tick(creatures),
+                          repeat=3 if slow else 9, slow=slow))
+    cases.append(Case("tick/scheduled/creatures=1000", _scheduled_tick(1000), repeat=9))
+    cases.append(Case("tick/lod/creatures=1000", _lod_tick(1000), repeat=9))
+    for creatures in (100, 1000):
+        cases.append(Case(f"state/get_state/creatures={creatures}", _get_state(creatures), repeat=11))
+        cases.append(Case(f"state/json/creatures={creatures}", _state_json(creatures), repeat=11))
+        cases.append(Case(f"state/delta_binary/creatures={creatures}", _delta_binary(creatures), repeat=11))
+    for creatures in (1000, 10000):
+        slow = creatures >= 10000
+        cases.append(Case(f"snapshot/save/creatures={creatures}", _snapshot_save(creatures),
+                          repeat=5, slow=slow))
+        for mmap in (False, True):
+            cases.append(Case(f"snapshot/load{'_mmap' if mmap else ''}/creatures={creatures}",
+                              _snapshot_load(creatures, mmap), repeat=5, slow=slow))
+    return cases
@@ -0,0 +1,153 @@
+"""
+Timing, result files and baseline comparison for the benchmark suite.
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+# Results format version, bumped when the JSON layout changes
+RESULTS_VERSION = 1
+# A case is a regression when its median is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.20
+
+
+class Case:
+    """
+    A named benchmark.
+
+    `setup` builds whatever the case needs and returns the callable to time,
+    so construction cost is never measured.
+    """
+
+    def __init__(self, name: str, setup: Callable[[], Callable[[], Any]],
+                 repeat: int = 7, number: int = 1, slow: bool = False):
+        """
+        Args:
+            name (str): Unique case name, e.g. "tick/creatures=100".
+            setup (Callable): Returns the function to time.
+            repeat (int): Timed samples to take.
+            number (int): Calls per sample; the sample is their mean.
+            slow (bool): Skipped by quick runs.
+        """
+        self.name = name
+        self.setup = setup
+        self.repeat = repeat
+        self.number = number
+        self.slow = slow
+
+
+def time_case(case: Case, repeat_scale: float = 1.0) -> Dict[str, Any]:
+    """
+    Run one case and summarize its timings.
+
+    Args:
+        case (Case): The case to run.
+        repeat_scale (float): Multiplier on the case's repeat count (e.g. 0.3
+            for a quick run); at least 3 samples are always taken.
+
+    Returns:
+        dict: best/median/mean/stdev per call in milliseconds, and the sample
+        count.
+    """
+    fn = case.setup()
+    fn()  # Warm-up: caches, lazy allocations, first-use code tables
+    repeat = max(3, int(round(case.repeat * repeat_scale)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(case.number):
+            fn()
+        samples.append((time.perf_counter() - start) / case.number * 1000.0)
+    return {
+        "best_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "stdev_ms": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": len(samples),
+    }
+
+
+def run_cases(cases: List[Case], repeat_scale: float = 1.0,
+              progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Run every case and return a results document.
+
+    Returns:
+        dict: {"version", "meta", "results": {case name: timing summary}}.
+    """
+    results = {}
+    for case in cases:
+        results[case.name] = time_case(case, repeat_scale)
+        if progress is not None:
+            progress(case.name, results[case.name])
+    return {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read a results document written by `save_results`."""
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {document.get('version')}")
+    return document
+
+
+def save_results(document: Dict[str, Any], path: str):
+    """Write a results document as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, Optional[float], Optional[float], str]]:
+    """
+    Compare medians of two results documents.
+
+    Args:
+        baseline (dict): The stored baseline document.
+        current (dict): The document to check.
+        threshold (float): Relative slowdown that counts as a regression.
+
+    Returns:
+        List[Tuple]: (case, baseline ms, current ms, status) rows, where status
+        is "regression", "improvement", "ok", "new" or "missing".
+    """
+    rows = []
+    old, new = baseline["results"], current["results"]
+    for name in sorted(set(old) | set(new)):
+        if name not in old:
+            rows.append((name, None, new[name]["median_ms"], "new"))
+            continue
+        if name not in new:
+            rows.append((name, old[name]["median_ms"], None, "missing"))
+            continue
+        before, after = old[name]["median_ms"], new[name]["median_ms"]
+        if after > before * (1.0 + threshold):
+            status = "regression"
+        elif after < before * (1.0 - threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, status))
+    return rows
+
+
+def format_comparison(rows) -> str:
+    lines = [f"{'case':<44} {'baseline ms':>12} {'current ms':>12} {'change':>8}  status"]
+    for name, before, after, status in rows:
+        change = f"{(after / before - 1.0) * 100:+.1f}%" if before and after is not None else ""
+        lines.append(f"{name:<44} {before if before is not None else float('nan'):>12.3f} "
+                     f"{after if after is not None else float('nan'):>12.3f} {change:>8}  {status}")
+    return "\n".join(lines)
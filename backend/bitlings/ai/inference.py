@@ -0,0 +1,411 @@
+import numpy as np
+from typing import List, Any, Optional, Sequence, Callable, Tuple
+
+# Food farther than this reads as the maximum distance input; BitlingNetwork
+# and the batched engine share this single definition
+MAX_PERCEIVABLE_DISTANCE = 500.0
+
+# Settling stops once no activation changes by more than this between iterations
+SETTLE_TOLERANCE = 1e-6
+
+# Hebbian learning only strengthens input weights into hidden units above this activation
+HEBBIAN_THRESHOLD = 0.1
+
+# Per-network parameters, activations, settle statistics and eligibility
+# traces, stacked along a leading population axis
+PARAMETERS = (
+    "weights_input_hidden", "weights_hidden_output", "bias_hidden", "bias_output",
+    "input_activations", "hidden_activations", "output_activations",
+    "feedback_strength", "settle_iterations", "settle_converged",
+    "trace_input_hidden", "trace_hidden_output",
+)
+# Eligibility traces, one per weight matrix (see `update_traces`)
+TRACES = ("trace_input_hidden", "trace_hidden_output")
+
+
+def private_zeros(name: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+    """Default storage allocator: a zeroed array owned by this process."""
+    return np.zeros(shape, dtype=dtype)
+
+
+# Allocates the storage for one named array: (name, shape, dtype) -> zeroed array
+Allocator = Callable[[str, Tuple[int, ...], Any], np.ndarray]
+
+
+def _sigmoid(x):
+    """Sigmoid activation, clipped like BitlingNetwork._sigmoid to avoid overflow."""
+    x = np.clip(x, -500, 500)
+    return 1 / (1 + np.exp(-x))
+
+
+class PopulationInference:
+    """
+    Stacked weights and activations for a population of BitlingNetworks.
+
+    Row `i` of every tensor belongs to the network in `views[i]`; each
+    `BitlingNetwork` reads and writes its parameters through views of its row, so
+    per-network learning updates land directly in the stacked tensors. The batched
+    methods run set-inputs, settle and argmax for many rows with a handful of
+    NumPy calls instead of one small `np.dot` per creature.
+
+    Tensors are allocated lazily, when the first network is attached, so the layer
+    sizes always match the networks stored here. They are obtained from
+    `allocator`, which can place them somewhere other processes can read.
+    """
+
+    def __init__(self, capacity: int = 64, allocator: Allocator = private_zeros):
+        """
+        Args:
+            capacity (int): Number of rows to allocate once layer sizes are known.
+            allocator (Allocator): Provides the storage of every tensor.
+        """
+        self.capacity = max(1, capacity)
+        self.allocator = allocator
+        self.count = 0
+        self.input_size: Optional[int] = None
+        self.hidden_size: Optional[int] = None
+        self.output_size: Optional[int] = None
+        for name in PARAMETERS:
+            setattr(self, name, None)
+        self.views: List[Any] = []
+
+    def _layout(self):
+        """Return the per-row shape and dtype of every stacked tensor."""
+        i, h, o = self.input_size, self.hidden_size, self.output_size
+        return {
+            "weights_input_hidden": ((i, h), float),
+            "weights_hidden_output": ((h, o), float),
+            "bias_hidden": ((h,), float),
+            "bias_output": ((o,), float),
+            "input_activations": ((i,), float),
+            "hidden_activations": ((h,), float),
+            "output_activations": ((o,), float),
+            "feedback_strength": ((), float),
+            "settle_iterations": ((), np.int32),
+            "settle_converged": ((), bool),
+            "trace_input_hidden": ((i, h), float),
+            "trace_hidden_output": ((h, o), float),
+        }
+
+    def _allocate(self, capacity: int):
+        """(Re)allocate every tensor with `capacity` rows, keeping existing rows."""
+        for name, (shape, dtype) in self._layout().items():
+            grown = self.allocator(f"network.{name}", (capacity,) + shape, dtype)
+            current = getattr(self, name)
+            if current is not None:
+                grown[:self.count] = current[:self.count]
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def set_allocator(self, allocator: Allocator):
+        """Move every tensor into storage from `allocator`, which is used from now on."""
+        self.allocator = allocator
+        if self.allocated:
+            self._allocate(max(self.capacity, self.count, 1))
+
+    @property
+    def allocated(self) -> bool:
+        return self.input_size is not None
+
+    def append(self) -> int:
+        """
+        Append an empty row.
+
+        Returns:
+            int: The new row index.
+        """
+        if self.allocated and self.count >= self.capacity:
+            self._allocate(max(1, self.capacity * 2))
+        row = self.count
+        if self.allocated:
+            for name in PARAMETERS:
+                getattr(self, name)[row] = 0
+        self.views.append(None)
+        self.count += 1
+        return row
+
+    def bind(self, row: int, network: Any):
+        """Make `network` a view over `row` without copying any values."""
+        self.views[row] = network
+        network._stack = self
+        network._row = row
+
+    def attach(self, row: int, network: Any):
+        """
+        Copy a network's parameters into `row` and rebind the network to it.
+
+        The first network attached fixes the layer sizes of the stack.
+
+        Raises:
+            ValueError: If the network's layer sizes differ from the stack's.
+        """
+        sizes = (network.input_size, network.hidden_size, network.output_size)
+        if not self.allocated:
+            self.input_size, self.hidden_size, self.output_size = sizes
+            self._allocate(max(self.capacity, self.count))
+        elif sizes != (self.input_size, self.hidden_size, self.output_size):
+            raise ValueError(
+                f"Network sizes {sizes} do not match population sizes "
+                f"{(self.input_size, self.hidden_size, self.output_size)}")
+
+        source, source_row = getattr(network, "_stack", None), getattr(network, "_row", -1)
+        if source is not None and source is not self:
+            for name in PARAMETERS:
+                getattr(self, name)[row] = getattr(source, name)[source_row]
+            # The old row no longer backs this network
+            if source.views[source_row] is network:
+                source.views[source_row] = None
+        previous = self.views[row]
+        if previous is not None and previous is not network:
+            previous._stack = None
+        self.bind(row, network)
+
+    def restore(self, sizes, tensors, views: List[Any]):
+        """
+        Replace the stack's contents with whole tensors, e.g. loaded from a snapshot.
+
+        The arrays are adopted as they are (memory-mapped arrays stay mapped) and
+        become the stack's storage; they grow like any other storage on the next
+        append.
+
+        Args:
+            sizes (Tuple[int, int, int]): Input, hidden and output layer sizes.
+            tensors (dict): One array per name in PARAMETERS, with one row per view.
+            views (List): Network objects to bind to the rows, in row order
+                (None leaves a row unbound, to be bound later with `bind`).
+        """
+        self.input_size, self.hidden_size, self.output_size = sizes
+        count = len(views)
+        for name, (shape, dtype) in self._layout().items():
+            tensor = tensors[name]
+            if tensor.shape != (count,) + shape:
+                raise ValueError(f"{name} must have shape {(count,) + shape}, got {tensor.shape}")
+            setattr(self, name, tensor if tensor.dtype == dtype else tensor.astype(dtype))
+        self.capacity = count
+        self.count = count
+        self.views = [None] * count
+        for row, view in enumerate(views):
+            if view is not None:
+                self.bind(row, view)
+
+    def _discard(self, row: int):
+        """Drop `row` by moving the last row into it (swap-remove)."""
+        last = self.count - 1
+        if row != last:
+            if self.allocated:
+                for name in PARAMETERS:
+                    tensor = getattr(self, name)
+                    tensor[row] = tensor[last]
+            moved = self.views[last]
+            self.views[row] = moved
+            if moved is not None:
+                moved._row = row
+        self.views.pop()
+        self.count -= 1
+
+    # --- Batched inference ---
+
+    def set_inputs(self, rows: Sequence[int], hunger, energy, distance_to_food, food_dx, food_dy):
+        """
+        Normalize and set input activations for many rows at once.
+
+        Applies the same normalization as `BitlingNetwork.set_inputs`; every
+        argument after `rows` is an array with one entry per row.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        distance = np.asarray(distance_to_food, dtype=float)
+        distance_norm = np.minimum(distance / MAX_PERCEIVABLE_DISTANCE, 1.0)
+        # inf / 500 is inf, which the minimum already caps at 1.0
+        self.input_activations[rows] = np.column_stack([
+            np.clip(np.asarray(hunger, dtype=float) / 100.0, 0.0, 1.0),
+            np.clip(np.asarray(energy, dtype=float) / 100.0, 0.0, 1.0),
+            distance_norm,
+            np.clip(food_dx, -1.0, 1.0),
+            np.clip(food_dy, -1.0, 1.0),
+        ])
+
+    def _step(self, rows, inputs, output, feedback):
+        """
+        One settling step for `rows`, returning (hidden, output) activations.
+
+        With zero feedback this is a plain feedforward pass. Otherwise the hidden
+        layer also receives the previous output through the transposed
+        hidden-to-output weights, as in BM-style symmetric settling.
+        """
+        weights_hidden_output = self.weights_hidden_output[rows]
+        hidden_inputs = np.einsum("ni,nih->nh", inputs, self.weights_input_hidden[rows])
+        if feedback is not None:
+            top_down = np.einsum("no,nho->nh", output, weights_hidden_output)
+            hidden_inputs = hidden_inputs + feedback[:, None] * top_down
+        hidden = _sigmoid(hidden_inputs + self.bias_hidden[rows])
+        output_inputs = np.einsum("nh,nho->no", hidden, weights_hidden_output)
+        output = _sigmoid(output_inputs + self.bias_output[rows])
+        return hidden, output
+
+    def settle(self, rows: Sequence[int], iterations: int = 10,
+               tolerance: float = SETTLE_TOLERANCE):
+        """
+        Settle the networks in `rows` until their activations stop changing.
+
+        Feedforward rows (zero `feedback_strength`) reach their fixed point in a
+        single pass. Recurrent rows are iterated together, and each row drops out
+        of the batch as soon as no activation moves by more than `tolerance`.
+        The iteration count and convergence flag of every row are recorded in
+        `settle_iterations` and `settle_converged`.
+
+        Args:
+            rows (Sequence[int]): Rows to settle.
+            iterations (int): Maximum number of settling steps per row.
+            tolerance (float): Largest activation change treated as converged.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        if rows.size == 0:
+            return
+        if iterations <= 0:
+            self.settle_iterations[rows] = 0
+            self.settle_converged[rows] = False
+            return
+
+        recurrent = self.feedback_strength[rows] != 0
+        direct = rows[~recurrent]
+        if direct.size:
+            hidden, output = self._step(direct, self.input_activations[direct], None, None)
+            self.hidden_activations[direct] = hidden
+            self.output_activations[direct] = output
+            self.settle_iterations[direct] = 1
+            self.settle_converged[direct] = True
+
+        active = rows[recurrent]
+        if active.size == 0:
+            return
+        self.settle_iterations[active] = 0
+        self.settle_converged[active] = False
+        for _ in range(iterations):
+            hidden, output = self._step(
+                active, self.input_activations[active],
+                self.output_activations[active], self.feedback_strength[active])
+            change = np.maximum(
+                np.abs(hidden - self.hidden_activations[active]).max(axis=1),
+                np.abs(output - self.output_activations[active]).max(axis=1))
+            self.hidden_activations[active] = hidden
+            self.output_activations[active] = output
+            self.settle_iterations[active] += 1
+            settled = change <= tolerance
+            self.settle_converged[active[settled]] = True
+            active = active[~settled]
+            if active.size == 0:
+                break
+
+    def settle_stats(self) -> dict:
+        """
+        Summarize the most recent settle call of every network in the stack.
+
+        Returns:
+            dict: Network count, mean/max/total iterations and converged fraction.
+        """
+        if not self.allocated or self.count == 0:
+            return {"networks": 0, "mean_iterations": 0.0, "max_iterations": 0,
+                    "total_iterations": 0, "converged_fraction": 0.0}
+        iterations = self.settle_iterations[:self.count]
+        return {
+            "networks": self.count,
+            "mean_iterations": float(iterations.mean()),
+            "max_iterations": int(iterations.max()),
+            "total_iterations": int(iterations.sum()),
+            "converged_fraction": float(self.settle_converged[:self.count].mean()),
+        }
+
+    # --- Batched learning ---
+
+    def apply_learning(self, rows: Sequence[int], actions: Sequence[int], rewards: Sequence[float],
+                       learning_rates: Sequence[float]):
+        """
+        Apply the Hebbian rule of `BitlingNetwork.apply_learning` to many rows at once.
+
+        For every event with a positive reward, the chosen output's column of
+        the hidden-to-output weights grows by `rate * reward * hidden`, and the
+        input-to-hidden weights grow by the outer product of `rate * reward *
+        inputs` and the hidden activations above HEBBIAN_THRESHOLD. All events
+        are applied with two scatter-adds; several events for the same row add up.
+
+        Args:
+            rows (Sequence[int]): Row of each event.
+            actions (Sequence[int]): Index of the reinforced output unit.
+            rewards (Sequence[float]): Reward of each event; 1.0 is one
+                `apply_learning(..., was_successful=True)` call, rewards <= 0
+                change nothing.
+            learning_rates (Sequence[float]): Learning rate of each event's network.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        actions = np.asarray(actions, dtype=np.intp)
+        rewards = np.asarray(rewards, dtype=float)
+        rewarded = rewards > 0
+        if not rewarded.any():
+            return
+        rows, actions = rows[rewarded], actions[rewarded]
+        scale = np.asarray(learning_rates, dtype=float)[rewarded] * rewards[rewarded]
+
+        hidden = self.hidden_activations[rows]
+        np.add.at(self.weights_hidden_output, (rows, slice(None), actions), scale[:, None] * hidden)
+        active = hidden > HEBBIAN_THRESHOLD
+        scaled_inputs = scale[:, None] * self.input_activations[rows]
+        np.add.at(self.weights_input_hidden, rows,
+                  scaled_inputs[:, :, None] * hidden[:, None, :] * active[:, None, :])
+
+    def update_traces(self, rows: Sequence[int], actions: Sequence[int], decay):
+        """
+        Decay the eligibility traces of `rows` and blend in this tick's co-activity.
+
+        The traces have the shapes of the weights and average the terms the
+        Hebbian rule would add for the chosen action (see `apply_learning`),
+        without the learning rate: `decay * trace + (1 - decay) * activity`.
+        Weighting the new activity by `1 - decay` keeps a trace no larger
+        than one decision's worth of activity, however often rows decide.
+
+        Args:
+            rows (Sequence[int]): Rows that decided this tick.
+            actions (Sequence[int]): Output unit chosen by each row.
+            decay (float or Sequence[float]): Factor applied to the existing
+                traces (0..1), one for all rows or one per row.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        if rows.size == 0:
+            return
+        decay = np.asarray(decay, dtype=float)
+        if decay.ndim:
+            decay = decay.reshape(-1, 1, 1)
+        gain = 1.0 - decay
+        hidden = self.hidden_activations[rows]
+        trace_hidden_output = self.trace_hidden_output[rows] * decay
+        trace_hidden_output[np.arange(rows.size), :, np.asarray(actions, dtype=np.intp)] += \
+            hidden * (gain[:, :, 0] if np.ndim(gain) else gain)
+        self.trace_hidden_output[rows] = trace_hidden_output
+        active_hidden = hidden * (hidden > HEBBIAN_THRESHOLD)
+        self.trace_input_hidden[rows] = (self.trace_input_hidden[rows] * decay
+                                         + gain * self.input_activations[rows][:, :, None] * active_hidden[:, None, :])
+
+    def apply_trace_learning(self, rows: Sequence[int], rewards: Sequence[float],
+                             learning_rates: Sequence[float]):
+        """
+        Reinforce whatever the traces of `rows` hold, scaled by reward.
+
+        Adds `rate * reward * trace` to both weight matrices of every row with
+        a positive reward. Rows must be unique.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        rewards = np.asarray(rewards, dtype=float)
+        rewarded = rewards > 0
+        rows = rows[rewarded]
+        if rows.size == 0:
+            return
+        scale = (np.asarray(learning_rates, dtype=float)[rewarded] * rewards[rewarded])[:, None, None]
+        self.weights_hidden_output[rows] += scale * self.trace_hidden_output[rows]
+        self.weights_input_hidden[rows] += scale * self.trace_input_hidden[rows]
+
+    def chosen_actions(self, rows: Sequence[int]) -> np.ndarray:
+        """
+        Return the index of the highest output activation for each row.
+        Assumes `settle()` has been called for those rows.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        return np.argmax(self.output_activations[rows], axis=1)
@@ -1,12 +1,64 @@
 import numpy as np
 import math
 
-MAX_PERCEIVABLE_DISTANCE = 500.0 # Class/Module Constant
+from .inference import PopulationInference, MAX_PERCEIVABLE_DISTANCE, SETTLE_TOLERANCE, HEBBIAN_THRESHOLD
+
+
+def _parameter(name: str):
+    """Property exposing the network's row of a stacked `PopulationInference` tensor."""
+    def fget(self):
+        return getattr(self._stack, name)[self._row]
+
+    def fset(self, value):
+        target = getattr(self._stack, name)[self._row]
+        value = np.asarray(value, dtype=float)
+        if value.shape != target.shape:
+            raise ValueError(f"{name} must have shape {target.shape}, got {value.shape}")
+        target[...] = value
+
+    return property(fget, fset)
+
+
+def _scalar(name: str, cast, writable: bool = True):
+    """Property exposing the network's entry of a per-row scalar column."""
+    def fget(self):
+        return cast(getattr(self._stack, name)[self._row])
+
+    def fset(self, value):
+        getattr(self._stack, name)[self._row] = value
+
+    return property(fget, fset if writable else None)
+
 
 class BitlingNetwork:
     """
     A simple feedforward neural network for Bitling decision-making.
+
+    Weights, biases and activations are views over one row of a
+    `PopulationInference` stack. A standalone network owns a private single-row
+    stack; networks of creatures in an environment share the population's stack.
     """
+    weights_input_hidden = _parameter("weights_input_hidden")
+    weights_hidden_output = _parameter("weights_hidden_output")
+    bias_hidden = _parameter("bias_hidden")
+    bias_output = _parameter("bias_output")
+    input_activations = _parameter("input_activations")
+    hidden_activations = _parameter("hidden_activations")
+    output_activations = _parameter("output_activations")
+    # Strength of top-down (output -> hidden) feedback; 0 keeps settling feedforward
+    feedback_strength = _scalar("feedback_strength", float)
+    # Iterations used and convergence status of the most recent settle() call
+    last_settle_iterations = _scalar("settle_iterations", int, writable=False)
+    last_settle_converged = _scalar("settle_converged", bool, writable=False)
+    # Decaying eligibility of each weight (see `EligibilityTraces`)
+    trace_input_hidden = _parameter("trace_input_hidden")
+    trace_hidden_output = _parameter("trace_hidden_output")
+
+    # Names of the input and output units, in unit order
+    INPUT_NAMES = ("hunger", "energy", "distance_to_food", "food_dx", "food_dy")
+    OUTPUT_NAMES = ("seeking_food", "eating", "seeking_sleep", "wandering", "idle")
+    DEFAULT_LEARNING_RATE = 0.05
+
     def __init__(self, hidden_size=4, output_size=5): # Removed input_size from signature
         """
         Initialize the neural network's structure, weights, and biases.
@@ -16,13 +68,17 @@ class BitlingNetwork:
             output_size (int): Number of output neurons.
         """
         # Define names for input and output layers for clarity
-        self.input_names = ["hunger", "energy", "distance_to_food", "food_dx", "food_dy"]
-        self.output_names = ["seeking_food", "eating", "seeking_sleep", "wandering", "idle"]
+        self.input_names = list(self.INPUT_NAMES)
+        self.output_names = list(self.OUTPUT_NAMES)
 
         self.input_size = len(self.input_names) # Updated input_size
         self.hidden_size = hidden_size
         self.output_size = output_size
 
+        self._stack = None
+        self._row = -1
+        stack = PopulationInference(capacity=1)
+        stack.attach(stack.append(), self)
 
         # Initialize weights with small random values between -0.5 and 0.5
         self.weights_input_hidden = np.random.uniform(-0.5, 0.5, (self.input_size, self.hidden_size))
@@ -41,7 +97,26 @@ class BitlingNetwork:
         self.hidden_activations = np.zeros(self.hidden_size, dtype=float)
         self.output_activations = np.zeros(self.output_size, dtype=float)
 
-        self.learning_rate = 0.05
+        self.learning_rate = self.DEFAULT_LEARNING_RATE
+
+    @classmethod
+    def view(cls, stack: PopulationInference, row: int,
+             learning_rate: float = DEFAULT_LEARNING_RATE) -> 'BitlingNetwork':
+        """
+        Create a network over an existing row of `stack` without initializing it.
+
+        Used when restoring stacked weights in bulk (e.g. from a snapshot); the
+        row's values are taken as they are.
+        """
+        network = cls.__new__(cls)
+        network.input_names = list(cls.INPUT_NAMES)
+        network.output_names = list(cls.OUTPUT_NAMES)
+        network.input_size = stack.input_size
+        network.hidden_size = stack.hidden_size
+        network.output_size = stack.output_size
+        network.learning_rate = learning_rate
+        stack.bind(row, network)
+        return network
 
     def set_inputs(self, hunger: float, energy: float, distance_to_food: float, food_dx: float, food_dy: float):
         """
@@ -86,23 +161,51 @@ class BitlingNetwork:
     def _feedforward_step(self):
         """
         Performs a single feedforward pass through the network.
+        With a non-zero `feedback_strength` the hidden layer also receives the
+        previous output activations through the transposed output weights.
         """
         # Calculate hidden layer activations
         hidden_inputs = np.dot(self.input_activations, self.weights_input_hidden) + self.bias_hidden
+        if self.feedback_strength:
+            hidden_inputs += self.feedback_strength * np.dot(self.output_activations, self.weights_hidden_output.T)
         self.hidden_activations = self._sigmoid(hidden_inputs)
 
         # Calculate output layer activations
         output_inputs = np.dot(self.hidden_activations, self.weights_hidden_output) + self.bias_output
         self.output_activations = self._sigmoid(output_inputs)
 
-    def settle(self, iterations: int = 10):
+    def settle(self, iterations: int = 10, tolerance: float = SETTLE_TOLERANCE):
         """
-        Calls _feedforward_step() multiple times to allow activations to stabilize.
+        Calls _feedforward_step() until activations stabilize.
+
+        A purely feedforward network reaches its fixed point after one pass, so
+        it stops there. With feedback, steps repeat until no activation changes
+        by more than `tolerance` or `iterations` is reached. The iteration count
+        and convergence status are available afterwards as
+        `last_settle_iterations` and `last_settle_converged`.
+
         Args:
-            iterations (int): The number of feedforward passes.
+            iterations (int): The maximum number of passes.
+            tolerance (float): Largest activation change treated as converged.
         """
+        stack, row = self._stack, self._row
+        stack.settle_iterations[row] = 0
+        stack.settle_converged[row] = False
         for _ in range(iterations):
+            if not self.feedback_strength:
+                self._feedforward_step()
+                stack.settle_iterations[row] = 1
+                stack.settle_converged[row] = True
+                break
+            previous_hidden = self.hidden_activations.copy()
+            previous_output = self.output_activations.copy()
             self._feedforward_step()
+            stack.settle_iterations[row] += 1
+            change = max(np.abs(self.hidden_activations - previous_hidden).max(),
+                         np.abs(self.output_activations - previous_output).max())
+            if change <= tolerance:
+                stack.settle_converged[row] = True
+                break
         # The final state of self.output_activations is the result.
 
     def get_chosen_action(self) -> str:
@@ -146,19 +249,16 @@ class BitlingNetwork:
         if not was_successful:
             return # Only apply positive reinforcement for now
 
+        hidden = self.hidden_activations
         # Reinforce weights from Hidden layer to the chosen Output action
-        for j in range(self.hidden_size):
-            self.weights_hidden_output[j, chosen_action_index] += \
-                self.learning_rate * self.hidden_activations[j]
-
-        # Reinforce weights from Input layer to active Hidden units
-        # This strengthens connections that contributed to the active hidden units
-        # which in turn contributed to the successful action.
-        for i in range(self.input_size):
-            for j in range(self.hidden_size):
-                if self.hidden_activations[j] > 0.1: # Only for significantly active hidden units
-                    self.weights_input_hidden[i, j] += \
-                        self.learning_rate * self.input_activations[i] * self.hidden_activations[j]
+        self.weights_hidden_output[:, chosen_action_index] += self.learning_rate * hidden
+
+        # Reinforce weights from Input layer to active Hidden units, as one outer
+        # product masked to the significantly active hidden units. This strengthens
+        # connections that contributed to the active hidden units which in turn
+        # contributed to the successful action.
+        active = hidden > HEBBIAN_THRESHOLD
+        self.weights_input_hidden += np.outer(self.learning_rate * self.input_activations, hidden) * active
         
         # Optional: Clip weights to prevent them from growing too large, e.g., np.clip
         # self.weights_hidden_output = np.clip(self.weights_hidden_output, -1.0, 1.0)
@@ -0,0 +1,284 @@
+import numpy as np
+from typing import Tuple, Union
+
+# Connectivity switches to sparse storage below this density and back to dense
+# above DENSE_ABOVE; the gap keeps a matrix near the boundary from flapping.
+# Around 5% live connections a gather + bincount matvec catches up with a
+# dense BLAS one (measured from 200x200 to 1000x1000 and 5x20000).
+SPARSE_BELOW = 0.05
+DENSE_ABOVE = 0.1
+
+
+class SparseWeights:
+    """
+    A weight matrix stored as a list of its live connections.
+
+    Connections are kept in row-major order (CSR order, with the row of every
+    entry stored explicitly) in parallel `source`, `target` and `weight`
+    arrays, plus a sorted key per entry for lookups. Memory, `matvec` and
+    Hebbian updates cost O(connections); adding units only changes the shape.
+    """
+
+    def __init__(self, shape: Tuple[int, int]):
+        """
+        Args:
+            shape (Tuple[int, int]): (rows, columns), i.e. (source units, target units).
+        """
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.source = np.zeros(0, dtype=np.intp)
+        self.target = np.zeros(0, dtype=np.intp)
+        self.weight = np.zeros(0, dtype=float)
+        self._keys = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_dense(cls, dense: np.ndarray, mask: np.ndarray = None) -> 'SparseWeights':
+        """
+        Build from a dense matrix, keeping the entries where `mask` is set
+        (default: the non-zero entries).
+        """
+        dense = np.asarray(dense, dtype=float)
+        matrix = cls(dense.shape)
+        source, target = np.nonzero(dense if mask is None else mask)
+        matrix.insert(source, target, dense[source, target])
+        return matrix
+
+    def to_dense(self) -> np.ndarray:
+        """Return the matrix as a dense array (missing connections are 0)."""
+        dense = np.zeros(self.shape)
+        dense[self.source, self.target] = self.weight
+        return dense
+
+    def mask(self) -> np.ndarray:
+        """Return a dense boolean array marking the live connections."""
+        mask = np.zeros(self.shape, dtype=bool)
+        mask[self.source, self.target] = True
+        return mask
+
+    @property
+    def nnz(self) -> int:
+        """Number of live connections."""
+        return len(self.weight)
+
+    @property
+    def density(self) -> float:
+        """Live connections as a fraction of rows x columns."""
+        size = self.shape[0] * self.shape[1]
+        return self.nnz / size if size else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return self.source.nbytes + self.target.nbytes + self.weight.nbytes + self._keys.nbytes
+
+    def _key(self, source: np.ndarray, target: np.ndarray) -> np.ndarray:
+        return source.astype(np.int64) * self.shape[1] + target
+
+    def _find(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (position in the entry arrays, whether the entry exists) for `keys`."""
+        positions = np.searchsorted(self._keys, keys)
+        found = positions < len(self._keys)
+        found[found] = self._keys[positions[found]] == keys[found]
+        return positions, found
+
+    def insert(self, source, target, weight):
+        """
+        Set the weight of connections, creating the ones that don't exist.
+
+        Args:
+            source, target: Row and column of each connection (scalars or arrays).
+            weight: New weight of each connection.
+
+        Raises:
+            IndexError: If a connection lies outside the matrix.
+        """
+        source, target = np.atleast_1d(source).astype(np.intp), np.atleast_1d(target).astype(np.intp)
+        weight = np.broadcast_to(np.asarray(weight, dtype=float), source.shape)
+        if source.size == 0:
+            return
+        if (source.min() < 0 or target.min() < 0
+                or source.max() >= self.shape[0] or target.max() >= self.shape[1]):
+            raise IndexError(f"Connection outside a {self.shape} matrix")
+        keys = self._key(source, target)
+        # The last value given for a connection wins
+        keys, last = np.unique(keys[::-1], return_index=True)
+        source, target, weight = source[::-1][last], target[::-1][last], weight[::-1][last]
+
+        positions, found = self._find(keys)
+        self.weight[positions[found]] = weight[found]
+        new = ~found
+        if new.any():
+            at = positions[new]
+            self._keys = np.insert(self._keys, at, keys[new])
+            self.source = np.insert(self.source, at, source[new])
+            self.target = np.insert(self.target, at, target[new])
+            self.weight = np.insert(self.weight, at, weight[new])
+
+    def get(self, source: int, target: int) -> float:
+        """Return the weight of one connection, 0.0 if it doesn't exist."""
+        positions, found = self._find(self._key(np.array([source]), np.array([target])))
+        return float(self.weight[positions[0]]) if found[0] else 0.0
+
+    def _keep(self, keep: np.ndarray) -> int:
+        removed = int(len(keep) - np.count_nonzero(keep))
+        if removed:
+            self._keys, self.source = self._keys[keep], self.source[keep]
+            self.target, self.weight = self.target[keep], self.weight[keep]
+        return removed
+
+    def remove(self, source, target) -> int:
+        """
+        Delete connections; missing ones are ignored.
+
+        Returns:
+            int: Number of connections removed.
+        """
+        keys = self._key(np.atleast_1d(source), np.atleast_1d(target))
+        return self._keep(~np.isin(self._keys, keys))
+
+    def prune(self, threshold: float) -> int:
+        """
+        Delete every connection whose weight magnitude is below `threshold`.
+
+        Returns:
+            int: Number of connections removed.
+        """
+        return self._keep(np.abs(self.weight) >= threshold)
+
+    def grow(self, rows: int = 0, columns: int = 0):
+        """Add unconnected source (rows) and target (columns) units at the end."""
+        self.shape = (self.shape[0] + rows, self.shape[1] + columns)
+        if columns:
+            # Keys encode the column count; row-major order is unchanged
+            self._keys = self._key(self.source, self.target)
+
+    def matvec(self, x: np.ndarray) -> np.ndarray:
+        """Return `x @ W` (source activations to target inputs)."""
+        return np.bincount(self.target, weights=x[self.source] * self.weight, minlength=self.shape[1])
+
+    def rmatvec(self, y: np.ndarray) -> np.ndarray:
+        """Return `W @ y` (target activations back to the sources)."""
+        return np.bincount(self.source, weights=y[self.target] * self.weight, minlength=self.shape[0])
+
+    def add_outer(self, a: np.ndarray, b: np.ndarray):
+        """Add `outer(a, b)` to the live connections only (a Hebbian update)."""
+        self.weight += a[self.source] * b[self.target]
+
+
+class Connectivity:
+    """
+    A weight matrix stored dense or sparse, whichever suits its density.
+
+    Dense storage keeps a boolean mask of the live connections, so pruned
+    connections stay pruned under learning in either form. After every
+    structural change (`insert`, `remove`, `prune`, `grow`) the density is
+    checked and the storage converted when it crosses SPARSE_BELOW or
+    DENSE_ABOVE; the values are the same in both forms.
+    """
+
+    def __init__(self, weights: Union[np.ndarray, SparseWeights], mask: np.ndarray = None):
+        """
+        Args:
+            weights (np.ndarray or SparseWeights): The initial matrix. A dense
+                matrix is fully connected unless `mask` says otherwise.
+            mask (np.ndarray, optional): Live connections of a dense matrix.
+        """
+        if isinstance(weights, SparseWeights):
+            self.dense, self.live, self.sparse = None, None, weights
+        else:
+            weights = np.array(weights, dtype=float)
+            live = np.ones(weights.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool).copy()
+            self.dense, self.live, self.sparse = weights * live, live, None
+        self._rebalance()
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.sparse is not None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.sparse.shape if self.is_sparse else self.dense.shape
+
+    @property
+    def nnz(self) -> int:
+        return self.sparse.nnz if self.is_sparse else int(np.count_nonzero(self.live))
+
+    @property
+    def density(self) -> float:
+        size = self.shape[0] * self.shape[1]
+        return self.nnz / size if size else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return self.sparse.nbytes if self.is_sparse else self.dense.nbytes + self.live.nbytes
+
+    def _rebalance(self):
+        """Convert the storage if the density crossed a threshold."""
+        if self.is_sparse and self.density > DENSE_ABOVE:
+            self.live = self.sparse.mask()
+            self.dense, self.sparse = self.sparse.to_dense(), None
+        elif not self.is_sparse and self.density < SPARSE_BELOW:
+            self.sparse = SparseWeights.from_dense(self.dense, self.live)
+            self.dense = self.live = None
+
+    def to_dense(self) -> np.ndarray:
+        return self.sparse.to_dense() if self.is_sparse else self.dense.copy()
+
+    def matvec(self, x: np.ndarray) -> np.ndarray:
+        """Return `x @ W`."""
+        return self.sparse.matvec(x) if self.is_sparse else np.dot(x, self.dense)
+
+    def rmatvec(self, y: np.ndarray) -> np.ndarray:
+        """Return `W @ y`."""
+        return self.sparse.rmatvec(y) if self.is_sparse else np.dot(self.dense, y)
+
+    def add_outer(self, a: np.ndarray, b: np.ndarray):
+        """Add `outer(a, b)` to the live connections only."""
+        if self.is_sparse:
+            self.sparse.add_outer(a, b)
+        else:
+            self.dense += np.outer(a, b) * self.live
+
+    def insert(self, source, target, weight):
+        """Set (and create if needed) connections; see `SparseWeights.insert`."""
+        if self.is_sparse:
+            self.sparse.insert(source, target, weight)
+        else:
+            self.dense[source, target] = weight
+            self.live[source, target] = True
+        self._rebalance()
+
+    def remove(self, source, target) -> int:
+        """Delete connections; returns how many existed."""
+        if self.is_sparse:
+            removed = self.sparse.remove(source, target)
+        else:
+            removed = int(np.count_nonzero(self.live[source, target]))
+            self.dense[source, target] = 0.0
+            self.live[source, target] = False
+        self._rebalance()
+        return removed
+
+    def prune(self, threshold: float) -> int:
+        """Delete connections weaker than `threshold`; returns how many."""
+        if self.is_sparse:
+            removed = self.sparse.prune(threshold)
+        else:
+            weak = self.live & (np.abs(self.dense) < threshold)
+            removed = int(np.count_nonzero(weak))
+            self.dense[weak] = 0.0
+            self.live[weak] = False
+        self._rebalance()
+        return removed
+
+    def grow(self, rows: int = 0, columns: int = 0):
+        """Add unconnected source and target units."""
+        grown = (self.shape[0] + rows) * (self.shape[1] + columns)
+        if not self.is_sparse and self.nnz < SPARSE_BELOW * grown:
+            # Convert before growing, so the dense matrix is never padded out
+            self.sparse = SparseWeights.from_dense(self.dense, self.live)
+            self.dense = self.live = None
+        if self.is_sparse:
+            self.sparse.grow(rows, columns)
+        else:
+            self.dense = np.pad(self.dense, ((0, rows), (0, columns)))
+            self.live = np.pad(self.live, ((0, rows), (0, columns)))
+        self._rebalance()
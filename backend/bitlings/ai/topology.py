@@ -0,0 +1,163 @@
+import numpy as np
+
+from .inference import SETTLE_TOLERANCE, HEBBIAN_THRESHOLD
+from .network import BitlingNetwork
+from .sparse import Connectivity
+
+
+class DynamicNetwork:
+    """
+    A BitlingNetwork whose hidden layer can grow and whose connections can be
+    added and pruned.
+
+    Each weight matrix is a `Connectivity`, which stores itself dense or
+    sparse depending on how many connections are live, so memory and settling
+    cost follow the connections rather than the number of units squared. Its
+    shapes are its own, so it runs outside the population's stacked
+    `PopulationInference`; inputs, outputs, settling and the Hebbian rule are
+    those of `BitlingNetwork`.
+    """
+    INPUT_NAMES = BitlingNetwork.INPUT_NAMES
+    OUTPUT_NAMES = BitlingNetwork.OUTPUT_NAMES
+
+    # Input normalization and action selection only touch the activations
+    set_inputs = BitlingNetwork.set_inputs
+    get_chosen_action = BitlingNetwork.get_chosen_action
+    _get_action_probabilities = BitlingNetwork._get_action_probabilities
+    _sigmoid = BitlingNetwork._sigmoid
+
+    def __init__(self, weights_input_hidden, weights_hidden_output, bias_hidden, bias_output,
+                 feedback_strength: float = 0.0,
+                 learning_rate: float = BitlingNetwork.DEFAULT_LEARNING_RATE):
+        """
+        Args:
+            weights_input_hidden (np.ndarray or Connectivity): Input x hidden weights.
+            weights_hidden_output (np.ndarray or Connectivity): Hidden x output weights.
+            bias_hidden, bias_output (np.ndarray): Biases of the two layers.
+            feedback_strength (float): Top-down feedback, as in BitlingNetwork.
+            learning_rate (float): Hebbian learning rate.
+        """
+        self.weights_input_hidden = _connectivity(weights_input_hidden)
+        self.weights_hidden_output = _connectivity(weights_hidden_output)
+        self.input_names = list(self.INPUT_NAMES)
+        self.output_names = list(self.OUTPUT_NAMES)
+        self.input_size, self.hidden_size = self.weights_input_hidden.shape
+        self.output_size = self.weights_hidden_output.shape[1]
+        self.bias_hidden = np.array(bias_hidden, dtype=float)
+        self.bias_output = np.array(bias_output, dtype=float)
+        self.input_activations = np.zeros(self.input_size)
+        self.hidden_activations = np.zeros(self.hidden_size)
+        self.output_activations = np.zeros(self.output_size)
+        self.feedback_strength = feedback_strength
+        self.learning_rate = learning_rate
+        self.last_settle_iterations = 0
+        self.last_settle_converged = False
+
+    @classmethod
+    def from_network(cls, network: BitlingNetwork) -> 'DynamicNetwork':
+        """Copy a (stacked) BitlingNetwork's parameters into a fully connected DynamicNetwork."""
+        return cls(network.weights_input_hidden, network.weights_hidden_output,
+                   network.bias_hidden, network.bias_output,
+                   network.feedback_strength, network.learning_rate)
+
+    @property
+    def connections(self) -> int:
+        """Number of live connections in both weight matrices."""
+        return self.weights_input_hidden.nnz + self.weights_hidden_output.nnz
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the weight storage."""
+        return self.weights_input_hidden.nbytes + self.weights_hidden_output.nbytes
+
+    def add_hidden_units(self, count: int = 1, bias: float = 0.0) -> range:
+        """
+        Append unconnected hidden units; wire them up with `connect`.
+
+        Returns:
+            range: Indices of the new units.
+        """
+        first = self.hidden_size
+        self.weights_input_hidden.grow(columns=count)
+        self.weights_hidden_output.grow(rows=count)
+        self.bias_hidden = np.append(self.bias_hidden, np.full(count, bias))
+        self.hidden_activations = np.append(self.hidden_activations, np.zeros(count))
+        self.hidden_size += count
+        return range(first, self.hidden_size)
+
+    def connect(self, layer: str, source, target, weight):
+        """
+        Create or set connections.
+
+        Args:
+            layer (str): "input_hidden" or "hidden_output".
+            source, target: Unit indices in the two layers.
+            weight: Weight of each connection.
+
+        Raises:
+            ValueError: If `layer` is unknown.
+        """
+        self._layer(layer).insert(source, target, weight)
+
+    def prune(self, threshold: float) -> int:
+        """
+        Remove every connection weaker than `threshold` in both layers.
+
+        Returns:
+            int: Number of connections removed.
+        """
+        return self.weights_input_hidden.prune(threshold) + self.weights_hidden_output.prune(threshold)
+
+    def _layer(self, layer: str) -> Connectivity:
+        if layer == "input_hidden":
+            return self.weights_input_hidden
+        if layer == "hidden_output":
+            return self.weights_hidden_output
+        raise ValueError(f"Unknown layer {layer!r}; expected 'input_hidden' or 'hidden_output'")
+
+    def _feedforward_step(self):
+        """One pass, with top-down feedback when `feedback_strength` is set (see BitlingNetwork)."""
+        hidden_inputs = self.weights_input_hidden.matvec(self.input_activations) + self.bias_hidden
+        if self.feedback_strength:
+            hidden_inputs += self.feedback_strength * self.weights_hidden_output.rmatvec(self.output_activations)
+        self.hidden_activations = self._sigmoid(hidden_inputs)
+        output_inputs = self.weights_hidden_output.matvec(self.hidden_activations) + self.bias_output
+        self.output_activations = self._sigmoid(output_inputs)
+
+    def settle(self, iterations: int = 10, tolerance: float = SETTLE_TOLERANCE):
+        """Settle the activations; see `BitlingNetwork.settle`."""
+        self.last_settle_iterations = 0
+        self.last_settle_converged = False
+        for _ in range(iterations):
+            if not self.feedback_strength:
+                self._feedforward_step()
+                self.last_settle_iterations = 1
+                self.last_settle_converged = True
+                break
+            previous_hidden = self.hidden_activations.copy()
+            previous_output = self.output_activations.copy()
+            self._feedforward_step()
+            self.last_settle_iterations += 1
+            change = max(np.abs(self.hidden_activations - previous_hidden).max(),
+                         np.abs(self.output_activations - previous_output).max())
+            if change <= tolerance:
+                self.last_settle_converged = True
+                break
+
+    def apply_learning(self, chosen_action_index: int, was_successful: bool):
+        """
+        The Hebbian rule of `BitlingNetwork.apply_learning`, applied to live
+        connections only, so pruned connections stay pruned.
+        """
+        if not was_successful:
+            return
+        hidden = self.hidden_activations
+        chosen = np.zeros(self.output_size)
+        chosen[chosen_action_index] = 1.0
+        self.weights_hidden_output.add_outer(self.learning_rate * hidden, chosen)
+        active = hidden > HEBBIAN_THRESHOLD
+        self.weights_input_hidden.add_outer(self.learning_rate * self.input_activations, hidden * active)
+
+
+def _connectivity(weights) -> Connectivity:
+    return weights if isinstance(weights, Connectivity) else Connectivity(weights)
@@ -2,17 +2,61 @@ import uuid
 import random
 import math
 from typing import Dict, Any
-from backend.bitlings.ai.network import BitlingNetwork # Added BitlingNetwork import
+from ..ai.network import BitlingNetwork # Added BitlingNetwork import
+from ..simulation.population import PopulationStore, ACTION_NAMES, EMOJI_NAMES, action_code, emoji_code
+from ..simulation.perception import scan
 
 
-# Constants for obstacle avoidance
-AVOIDANCE_DISTANCE_THRESHOLD = 50.0
-AVOIDANCE_STRENGTH = 1.5
+def _column(name: str):
+    """Property reading and writing one column of the creature's population row."""
+    def fget(self):
+        return float(getattr(self._store, name)[self._row])
+
+    def fset(self, value):
+        getattr(self._store, name)[self._row] = value
+
+    return property(fget, fset)
+
+
+def _code_column(name: str, table, encode):
+    """Property mapping an integer code column to its string value."""
+    def fget(self):
+        return table[getattr(self._store, name)[self._row]]
+
+    def fset(self, value):
+        getattr(self._store, name)[self._row] = encode(value)
+
+    return property(fget, fset)
+
 
 class Bitling:
-    """Represents a single Bitling creature."""
+    """
+    Represents a single Bitling creature.
+
+    Numeric state (position, needs, stress, action and timers) lives in a row of a
+    `PopulationStore`; this object is a thin view over that row. A Bitling starts in
+    a private single-row store and moves into the environment's store when it is
+    added to the world.
+    """
+
+    x = _column("x")
+    y = _column("y")
+    health = _column("health")
+    hunger = _column("hunger")
+    energy = _column("energy")
+    mood = _column("mood")
+    age = _column("age")
+    stress = _column("stress")
+    action_timer = _column("action_timer")
+    current_action = _code_column("action", ACTION_NAMES, action_code)
+    emoji = _code_column("emoji", EMOJI_NAMES, emoji_code)
 
     def __init__(self, x: float, y: float, environment):
+        self._store = None
+        self._row = -1
+        PopulationStore(capacity=1).add(self)
+
+        self._network = None
         self.id = str(uuid.uuid4())
         self.x = x
         self.y = y
@@ -45,43 +89,48 @@ class Bitling:
         self.wander_target_dx = 0.0 # For persistent wander direction
         self.wander_target_dy = 0.0 # For persistent wander direction
 
+    @classmethod
+    def restored(cls, bitling_id: str, environment) -> 'Bitling':
+        """
+        Create a Bitling for state restored in bulk (e.g. from a snapshot).
+
+        Nothing is initialized beyond defaults for the non-column attributes: the
+        caller binds the object to a populated store row with
+        `PopulationStore.restore` and attaches its network.
+        """
+        bitling = cls.__new__(cls)
+        bitling._store = None
+        bitling._row = -1
+        bitling._network = None
+        bitling.id = bitling_id
+        bitling.environment = environment
+        bitling.target_food_pos = None
+        bitling.eating_food_id = None
+        bitling.move_speed = 50.0
+        bitling.action_chosen_by_network_for_learning = None
+        bitling.target_food_item_id = None
+        bitling.wander_target_dx = 0.0
+        bitling.wander_target_dy = 0.0
+        return bitling
+
+    @property
+    def network(self) -> BitlingNetwork:
+        """The creature's decision network, stored in its population's network stack."""
+        return self._network
+
+    @network.setter
+    def network(self, network: BitlingNetwork):
+        self._network = network
+        self._store.networks.attach(self._row, network)
+
     def update_passive(self, time_delta: float):
-        """Update needs and passive states over time."""
-        self.age += time_delta
-        # Hunger increases (faster if active?)
-        self.hunger = min(100, self.hunger + 1.0 * time_delta)
-        # Energy decreases (faster if active?)
-        self.energy = max(0, self.energy - 0.5 * time_delta)
-
-        # Basic mood/health effects (simple thresholds)
-        if self.hunger > 80:
-            self.mood = max(0, self.mood - 2 * time_delta)
-        if self.energy < 20:
-            self.mood = max(0, self.mood - 2 * time_delta)
-        if self.hunger >= 100:
-            self.health = max(0, self.health - 1 * time_delta)
-
-        # Update emoji based on state (simple example)
-        if self.hunger > 80:
-            self.emoji = "😫"
-        elif self.energy < 20:
-            self.emoji = "😴"
-        elif self.mood < 30:
-            self.emoji = "😟"
-        elif self.mood > 70:
-            self.emoji = "😃"
-        else:
-            self.emoji = "😊"
-
-        if self.health <= 0:
-            self.emoji = "💀"
-            self.current_action = "dead"  # Stop further actions
-
-        # Calculate stress
-        stress_from_hunger = (self.hunger / 100) * 50
-        stress_from_low_energy = ((100 - self.energy) / 100) * 50
-        self.stress = stress_from_hunger + stress_from_low_energy
-        self.stress = max(0, min(100, self.stress))  # Cap stress between 0 and 100
+        """
+        Update needs and passive states over time.
+
+        Runs the population-wide rules (see `PopulationStore.update_passive`) on
+        this creature's row only; the simulation loop updates everyone at once.
+        """
+        self._store.update_passive(time_delta, rows=slice(self._row, self._row + 1))
 
     def choose_action(self):
         """Decide the next action using the BitlingNetwork."""
@@ -89,7 +138,7 @@ class Bitling:
             return
 
         # Perceive the environment
-        distance, food_dx, food_dy = self.perceive_environment()
+        distance, food_dx, food_dy, _, _, _ = self.perceive_environment()
 
         # Set network inputs with new sensory data
         self.network.set_inputs(self.hunger, self.energy, distance, food_dx, food_dy)
@@ -98,19 +147,30 @@ class Bitling:
         self.network.settle() # Using default iterations
 
         # Get chosen action from the network
-        chosen_action = self.network.get_chosen_action()
+        self.begin_action(self.network.get_chosen_action(), distance)
+
+    def begin_action(self, chosen_action: str, distance: float):
+        """
+        Start an action chosen by the network.
+
+        Args:
+            chosen_action (str): The action name chosen by the network.
+            distance (float): Perceived distance to the nearest food.
+        """
         self.current_action = chosen_action
         self.action_chosen_by_network_for_learning = chosen_action # Store for learning
 
+        if chosen_action not in ("seeking_food", "eating"):
+            # No longer heading for or eating food: let others claim it
+            self.environment.release_food_claim(self.id)
+
         # Handle actions that require specific setup
         if chosen_action == "seeking_food":
-            if distance != float('inf') and self.environment.food_sources:
-                # Target the first available food source from the list.
-                # Note: perceive_environment gives distance/direction to nearest,
-                # but for simplicity here, we'll target food_sources[0].
-                # A more advanced implementation might ensure target_food_pos
-                # aligns with the *perceived* nearest food item's actual coordinates.
-                target_food = self.environment.food_sources[0] # Simplified: target the first food item
+            target_food = None
+            if distance != float('inf'):
+                # Reserve the nearest food nobody else is heading for, so seekers spread out
+                target_food, _ = self.environment.claim_nearest_food(self.x, self.y, self.id)
+            if target_food is not None:
                 self.target_food_pos = (target_food['x'], target_food['y'])
                 self.target_food_item_id = target_food['id'] # Store the ID of the targeted food
             else:
@@ -118,7 +178,6 @@ class Bitling:
                 self.current_action = "idle" 
                 self.target_food_pos = None 
                 self.target_food_item_id = None # Clear target ID as well
-
         elif chosen_action == "eating":
             # If the network chooses "eating" directly:
             # - The Bitling should ideally be very close to food (low distance).
@@ -154,69 +213,21 @@ class Bitling:
         """
         Finds the nearest food source and nearest obstacle, returning their
         distances and direction vectors.
+        Results are shared through the environment's per-tick perception cache
+        and only recomputed after the Bitling moves or food/obstacles change.
         Returns:
             Tuple: (distance_to_food, food_dx, food_dy,
                     distance_to_obstacle, obstacle_dx, obstacle_dy)
         """
-        # --- Food Perception ---
-        nearest_food_item = None
-        min_dist_sq_food = float('inf')
-        actual_distance_food = float('inf')
-        food_dx = 0.0
-        food_dy = 0.0
-
-        if self.environment.food_sources:
-            for food in self.environment.food_sources:
-                dist_x_food = food['x'] - self.x
-                dist_y_food = food['y'] - self.y
-                dist_sq_food_current = dist_x_food**2 + dist_y_food**2
-                if dist_sq_food_current < min_dist_sq_food:
-                    min_dist_sq_food = dist_sq_food_current
-                    nearest_food_item = food
-            
-            if nearest_food_item is not None:
-                actual_distance_food = math.sqrt(min_dist_sq_food)
-                if actual_distance_food > 0:
-                    food_dx = (nearest_food_item['x'] - self.x) / actual_distance_food
-                    food_dy = (nearest_food_item['y'] - self.y) / actual_distance_food
-                else: # Bitling is on top of food
-                    food_dx = 0.0
-                    food_dy = 0.0
-        
-        # --- Obstacle Perception ---
-        nearest_obstacle = None
-        min_dist_sq_obstacle_center = float('inf') # Squared distance to center of nearest obstacle
-        
-        final_distance_to_obstacle_surface = float('inf')
-        final_obstacle_dx_to_center = 0.0
-        final_obstacle_dy_to_center = 0.0
-
-        if self.environment.obstacles:
-            for obstacle in self.environment.obstacles:
-                dist_x_obs_center = obstacle['x'] - self.x
-                dist_y_obs_center = obstacle['y'] - self.y
-                dist_sq_obs_center_current = dist_x_obs_center**2 + dist_y_obs_center**2
-                
-                if dist_sq_obs_center_current < min_dist_sq_obstacle_center:
-                    min_dist_sq_obstacle_center = dist_sq_obs_center_current
-                    nearest_obstacle = obstacle
+        return self.environment.perception.get(self)
 
-            if nearest_obstacle is not None:
-                center_distance_to_nearest_obs = math.sqrt(min_dist_sq_obstacle_center)
-                
-                # Calculate distance to the surface of the obstacle
-                final_distance_to_obstacle_surface = max(0, center_distance_to_nearest_obs - nearest_obstacle['radius'])
-                
-                # Calculate direction vector to the center of the obstacle
-                if center_distance_to_nearest_obs > 0:
-                    final_obstacle_dx_to_center = (nearest_obstacle['x'] - self.x) / center_distance_to_nearest_obs
-                    final_obstacle_dy_to_center = (nearest_obstacle['y'] - self.y) / center_distance_to_nearest_obs
-                else: # Bitling is at the center of the obstacle
-                    final_obstacle_dx_to_center = 0.0
-                    final_obstacle_dy_to_center = 0.0
-        
-        return (actual_distance_food, food_dx, food_dy, 
-                final_distance_to_obstacle_surface, final_obstacle_dx_to_center, final_obstacle_dy_to_center)
+    def scan_environment(self):
+        """
+        Uncached form of `perceive_environment`: queries the environment's
+        spatial indexes directly.
+        """
+        # The environment's spatial indexes only search cells around the Bitling
+        return scan(self.x, self.y, self.environment.nearest_food, self.environment.nearest_obstacle)
 
     def execute_action(self, time_delta: float):
         """Perform the current action."""
@@ -224,13 +235,6 @@ class Bitling:
             return
 
         stress_before_action = self.stress
-        
-        # Get perception data for movement decisions
-        # distance_to_food, food_dx_perc, food_dy_perc, \
-        # distance_to_obstacle, obs_dx_perc, obs_dy_perc = self.perceive_environment()
-        # Renaming perceived food dx/dy to avoid conflict with target dx/dy
-        _, _, _, distance_to_obstacle, obs_dx_perc, obs_dy_perc = self.perceive_environment()
-
 
         if self.action_timer > 0:
             self.action_timer -= time_delta
@@ -254,15 +258,9 @@ class Bitling:
                 goal_force_x = self.wander_target_dx
                 goal_force_y = self.wander_target_dy
                 
-                obstacle_avoidance_force_x = 0.0
-                obstacle_avoidance_force_y = 0.0
-                if distance_to_obstacle < AVOIDANCE_DISTANCE_THRESHOLD:
-                    steer_dx = -obs_dx_perc # Steer away from obstacle center
-                    steer_dy = -obs_dy_perc
-                    normalized_dist_to_obstacle = distance_to_obstacle / AVOIDANCE_DISTANCE_THRESHOLD
-                    magnitude_avoidance = AVOIDANCE_STRENGTH * (1.0 - normalized_dist_to_obstacle)
-                    obstacle_avoidance_force_x = steer_dx * magnitude_avoidance
-                    obstacle_avoidance_force_y = steer_dy * magnitude_avoidance
+                # Steer away from every nearby obstacle (one field lookup)
+                obstacle_avoidance_force_x, obstacle_avoidance_force_y = \
+                    self.environment.obstacle_avoidance(self.x, self.y)
                 
                 combined_force_x = goal_force_x + obstacle_avoidance_force_x
                 combined_force_y = goal_force_y + obstacle_avoidance_force_y
@@ -284,6 +282,10 @@ class Bitling:
                 self.energy = max(0, self.energy - 1.0 * time_delta) # Energy for wandering
         
         elif self.current_action == "seeking_food":
+            if self.target_food_item_id is not None and self.target_food_item_id not in self.environment.food:
+                # Someone else ate the target before we got there
+                self.target_food_pos = None
+                self.target_food_item_id = None
             if self.target_food_pos:
                 target_dx_food = self.target_food_pos[0] - self.x
                 target_dy_food = self.target_food_pos[1] - self.y
@@ -299,16 +301,16 @@ class Bitling:
                 else:
                     goal_force_x = target_dx_food / dist_to_target_food if dist_to_target_food > 0 else 0
                     goal_force_y = target_dy_food / dist_to_target_food if dist_to_target_food > 0 else 0
-
-                    obstacle_avoidance_force_x = 0.0
-                    obstacle_avoidance_force_y = 0.0
-                    if distance_to_obstacle < AVOIDANCE_DISTANCE_THRESHOLD:
-                        steer_dx = -obs_dx_perc
-                        steer_dy = -obs_dy_perc
-                        normalized_dist_to_obstacle = distance_to_obstacle / AVOIDANCE_DISTANCE_THRESHOLD
-                        magnitude_avoidance = AVOIDANCE_STRENGTH * (1.0 - normalized_dist_to_obstacle)
-                        obstacle_avoidance_force_x = steer_dx * magnitude_avoidance
-                        obstacle_avoidance_force_y = steer_dy * magnitude_avoidance
+                    # Follow the shared flow field when it leads to our target; its
+                    # paths already keep clear of obstacles, so there is nothing to
+                    # steer away from. Otherwise head straight there and avoid.
+                    flow = self.environment.food_flow(self.x, self.y, self.target_food_pos)
+                    if flow is not None:
+                        goal_force_x, goal_force_y = flow
+                        obstacle_avoidance_force_x = obstacle_avoidance_force_y = 0.0
+                    else:
+                        obstacle_avoidance_force_x, obstacle_avoidance_force_y = \
+                            self.environment.obstacle_avoidance(self.x, self.y)
                     
                     combined_force_x = goal_force_x + obstacle_avoidance_force_x
                     combined_force_y = goal_force_y + obstacle_avoidance_force_y
@@ -337,10 +339,7 @@ class Bitling:
             else:
                 self.hunger = max(0, self.hunger - 50) # Reduce hunger
                 if self.eating_food_id:
-                    self.environment.food_sources = [
-                        food for food in self.environment.food_sources
-                        if food['id'] != self.eating_food_id
-                    ]
+                    self.environment.remove_food(self.eating_food_id)
                     self.eating_food_id = None # Clear food ID
                 
                 self.update_passive(time_delta=0) # Update stress based on new hunger
@@ -350,7 +349,7 @@ class Bitling:
                 action_to_reinforce_name = self.action_chosen_by_network_for_learning
                 if action_to_reinforce_name in self.network.output_names:
                     action_index = self.network.output_names.index(action_to_reinforce_name)
-                    self.network.apply_learning(action_index, was_successful)
+                    self.environment.reinforce(self, action_index, was_successful)
                 
                 self.current_action = "idle"
                 # Emoji will be updated in update_passive
@@ -377,7 +376,7 @@ class Bitling:
                     # Find the index for "seeking_sleep" to reinforce that choice
                     if "seeking_sleep" in self.network.output_names:
                         action_index = self.network.output_names.index("seeking_sleep")
-                        self.network.apply_learning(action_index, was_successful)
+                        self.environment.reinforce(self, action_index, was_successful)
                 
                 self.current_action = "idle"
                 # Emoji will be updated in update_passive based on new energy
@@ -0,0 +1,126 @@
+import json
+import struct
+import uuid
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from ..simulation.population import ACTION_NAMES, EMOJI_NAMES
+
+# Binary world frame layout (all little-endian):
+#   header     u8 version, u8 kind, u32 seq, u32 base_seq, u32 count
+#   columns    count x 16-byte UUID ids, count x f32 x, count x f32 y,
+#              then one u8 column each for BYTE_COLUMNS
+#   trailer    u32 length + UTF-8 JSON with everything that is not a creature
+#              column (food, obstacles, removed creature ids)
+FRAME_VERSION = 1
+KIND_KEYFRAME = 0
+KIND_DELTA = 1
+HEADER = struct.Struct("<BBIII")
+BYTE_COLUMNS = ("emoji", "action", "health", "hunger", "energy", "mood", "stress")
+CODED_COLUMNS = {"emoji": EMOJI_NAMES, "action": ACTION_NAMES}
+
+
+def dictionary() -> Dict[str, List[str]]:
+    """The code tables a binary client needs to decode emoji and action columns."""
+    return {"emojis": list(EMOJI_NAMES), "actions": list(ACTION_NAMES)}
+
+
+def dictionary_size() -> tuple:
+    """Sizes of the code tables, to detect when clients need an updated dictionary."""
+    return (len(EMOJI_NAMES), len(ACTION_NAMES))
+
+
+def encode_frame(message: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Pack a `world_update` keyframe or `world_delta` message into a binary frame.
+
+    Creature fields become fixed-width columns; emoji and action strings are
+    sent as their codes from `dictionary()`.
+
+    Returns:
+        bytes: The frame, or None if the message cannot be packed (e.g. a creature
+        id that is not a UUID), in which case the caller should send JSON instead.
+    """
+    payload = message["payload"]
+    if message["type"] == "world_update":
+        kind = KIND_KEYFRAME
+        creatures = payload.get("bitlings", [])
+        trailer = {name: entities for name, entities in payload.items() if name != "bitlings"}
+    else:
+        kind = KIND_DELTA
+        section = payload.get("bitlings", {"added": [], "changed": [], "removed": []})
+        creatures = section["added"] + section["changed"]
+        trailer = {name: entities for name, entities in payload.items() if name != "bitlings"}
+        trailer["bitlings_removed"] = section["removed"]
+
+    count = len(creatures)
+    try:
+        ids = b"".join(uuid.UUID(creature["id"]).bytes for creature in creatures)
+        codes = {}
+        for column, table in CODED_COLUMNS.items():
+            codes[column] = [table.index(creature[column]) for creature in creatures]
+    except (ValueError, KeyError):
+        return None
+    if any(code > 255 for column in codes.values() for code in column):
+        return None
+
+    parts = [HEADER.pack(FRAME_VERSION, kind, message["seq"], message.get("base_seq", 0), count), ids]
+    parts.append(np.fromiter((c["x"] for c in creatures), dtype="<f4", count=count).tobytes())
+    parts.append(np.fromiter((c["y"] for c in creatures), dtype="<f4", count=count).tobytes())
+    for column in BYTE_COLUMNS:
+        if column in codes:
+            values = np.array(codes[column], dtype=np.int64)
+        else:
+            values = np.fromiter((c.get(column, 0) for c in creatures), dtype=np.int64, count=count)
+        parts.append(np.clip(values, 0, 255).astype(np.uint8).tobytes())
+    trailer_bytes = json.dumps(trailer, separators=(",", ":")).encode("utf-8")
+    parts.append(struct.pack("<I", len(trailer_bytes)))
+    parts.append(trailer_bytes)
+    return b"".join(parts)
+
+
+def decode_frame(frame: bytes, tables: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    Unpack a binary frame back into the JSON message it was encoded from.
+
+    Mirrors the frontend decoder; creature numbers come back at the binary
+    precision (f32 positions, integer needs).
+    """
+    tables = tables or dictionary()
+    version, kind, seq, base_seq, count = HEADER.unpack_from(frame, 0)
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported binary frame version {version}")
+    offset = HEADER.size
+    ids = [str(uuid.UUID(bytes=frame[offset + 16 * i: offset + 16 * (i + 1)])) for i in range(count)]
+    offset += 16 * count
+    xs = np.frombuffer(frame, dtype="<f4", count=count, offset=offset)
+    offset += 4 * count
+    ys = np.frombuffer(frame, dtype="<f4", count=count, offset=offset)
+    offset += 4 * count
+    columns = {}
+    for column in BYTE_COLUMNS:
+        columns[column] = np.frombuffer(frame, dtype=np.uint8, count=count, offset=offset)
+        offset += count
+    (trailer_length,) = struct.unpack_from("<I", frame, offset)
+    offset += 4
+    trailer = json.loads(frame[offset: offset + trailer_length].decode("utf-8"))
+
+    creatures = []
+    for i in range(count):
+        creature = {"id": ids[i], "x": float(xs[i]), "y": float(ys[i])}
+        for column in BYTE_COLUMNS:
+            value = int(columns[column][i])
+            if column == "emoji":
+                value = tables["emojis"][value]
+            elif column == "action":
+                value = tables["actions"][value]
+            creature[column] = value
+        creatures.append(creature)
+
+    if kind == KIND_KEYFRAME:
+        return {"type": "world_update", "seq": seq, "keyframe": True,
+                "payload": dict(trailer, bitlings=creatures)}
+    removed = trailer.pop("bitlings_removed", [])
+    # Added and changed creatures are both upserts for a client
+    trailer["bitlings"] = {"added": [], "changed": creatures, "removed": removed}
+    return {"type": "world_delta", "seq": seq, "base_seq": base_seq, "payload": trailer}
@@ -0,0 +1,106 @@
+from typing import Dict, Any, List, Optional
+
+# Send a full keyframe every this many encoded frames
+KEYFRAME_INTERVAL = 50
+# Positions must move further than this (world units) before a change is sent
+POSITION_THRESHOLD = 0.5
+# Entity collections in a world state, each a list of dicts with an 'id'
+COLLECTIONS = ("bitlings", "food", "obstacles")
+
+
+class DeltaEncoder:
+    """
+    Encodes successive world states as keyframes and deltas.
+
+    The encoder remembers what it last sent for every entity. A delta lists the
+    entities added, removed, or changed beyond the quantization threshold since
+    then, so message size follows world activity rather than world size. Every
+    message carries a sequence number; a client that sees a gap asks for a
+    resync and receives `keyframe()` built from the same remembered state the
+    delta stream is based on.
+    """
+
+    def __init__(self, keyframe_interval: int = KEYFRAME_INTERVAL,
+                 position_threshold: float = POSITION_THRESHOLD):
+        """
+        Args:
+            keyframe_interval (int): Frames between forced full keyframes.
+            position_threshold (float): Smallest x/y movement reported in a delta.
+        """
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.position_threshold = position_threshold
+        self.seq = 0
+        self.frames_since_keyframe = 0
+        # collection -> entity id -> entity dict as last sent
+        self.sent: Optional[Dict[str, Dict[Any, Dict[str, Any]]]] = None
+
+    def reset(self):
+        """Forget the sent state so the next frame is a keyframe."""
+        self.sent = None
+
+    def _changed(self, old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+        """True if `new` differs from `old` beyond the quantization threshold."""
+        for key, value in new.items():
+            previous = old.get(key)
+            if key in ("x", "y"):
+                if previous is None or abs(value - previous) > self.position_threshold:
+                    return True
+            elif value != previous:
+                return True
+        return False
+
+    def encode(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encode the next frame of the stream.
+
+        Args:
+            state (dict): A world state as returned by `Environment.get_state()`.
+
+        Returns:
+            dict: A `world_update` keyframe or a `world_delta` message.
+        """
+        self.seq += 1
+        self.frames_since_keyframe += 1
+        if self.sent is None or self.frames_since_keyframe >= self.keyframe_interval:
+            self.sent = {
+                name: {entity['id']: dict(entity) for entity in state.get(name, [])}
+                for name in COLLECTIONS
+            }
+            self.frames_since_keyframe = 0
+            return self.keyframe()
+
+        payload = {}
+        for name in COLLECTIONS:
+            sent = self.sent[name]
+            added: List[Dict[str, Any]] = []
+            changed: List[Dict[str, Any]] = []
+            seen = set()
+            for entity in state.get(name, []):
+                entity_id = entity['id']
+                seen.add(entity_id)
+                previous = sent.get(entity_id)
+                if previous is None:
+                    added.append(entity)
+                    sent[entity_id] = dict(entity)
+                elif self._changed(previous, entity):
+                    changed.append(entity)
+                    sent[entity_id] = dict(entity)
+            removed = [entity_id for entity_id in sent if entity_id not in seen]
+            for entity_id in removed:
+                del sent[entity_id]
+            if added or changed or removed:
+                payload[name] = {"added": added, "changed": changed, "removed": removed}
+
+        return {"type": "world_delta", "seq": self.seq, "base_seq": self.seq - 1,
+                "payload": payload}
+
+    def keyframe(self) -> Dict[str, Any]:
+        """
+        Build a full `world_update` from the state the delta stream is based on.
+
+        Used for the periodic keyframes, for clients that just connected and for
+        clients that requested a resync.
+        """
+        payload = {name: list(entities.values())
+                   for name, entities in (self.sent or {}).items()}
+        return {"type": "world_update", "seq": self.seq, "keyframe": True, "payload": payload}
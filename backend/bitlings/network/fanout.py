@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# A single websocket message as handed to `websocket.send`
+Frame = Union[str, bytes]
+# Turns (client, message, shared encoded cache) into the frames to send
+Serializer = Callable[[Any, Dict[str, Any], Dict[str, Any]], List[Frame]]
+
+
+class ClientWriter:
+    """
+    Sends world messages to one client from a dedicated task.
+
+    The writer has a one-slot mailbox. Offering a message while an older one is
+    still waiting replaces it (latest wins) and counts the old one as dropped,
+    so a slow client skips stale frames instead of building a backlog and the
+    simulation never waits on its socket. A skipped delta would leave a gap in
+    the client's sequence, so after a drop the next delta is promoted to a
+    keyframe of the stream it came from.
+
+    Messages are serialized by the writer when it takes them, through a cache
+    shared by every client of the same frame, so each frame is encoded at most
+    once per wire format and frames that end up dropped are never encoded.
+    """
+
+    def __init__(self, websocket, serialize: Serializer):
+        """
+        Args:
+            websocket: The client connection.
+            serialize (Serializer): Produces the frames for a message in this
+                client's encoding.
+        """
+        self.websocket = websocket
+        self.serialize = serialize
+        # (message, encoded cache, source stream, time offered)
+        self.pending: Optional[Tuple[Dict[str, Any], Dict[str, Any], Any, float]] = None
+        self.resync = False  # A frame was dropped since the last one sent
+        self.closed = False
+        self.task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Counters
+        self.frames_offered = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def offer(self, message: Dict[str, Any], encoded: Optional[Dict[str, Any]] = None, stream=None):
+        """
+        Put a message in the mailbox, replacing any message still waiting.
+
+        Never blocks. Starts the writer task on first use.
+
+        Args:
+            message (dict): A world_update or world_delta message.
+            encoded (dict, optional): Encoded-form cache shared with other clients
+                receiving the same message.
+            stream (DeltaEncoder, optional): The stream the message belongs to,
+                used to build a keyframe after a drop.
+        """
+        if self.closed:
+            return
+        self.frames_offered += 1
+        if self.pending is not None:
+            self.frames_dropped += 1
+            self.resync = True
+        self.pending = (message, {} if encoded is None else encoded, stream, time.perf_counter())
+        self._idle.clear()
+        self._wakeup.set()
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    def _take(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Empty the mailbox, promoting a delta to a keyframe after a drop."""
+        message, encoded, stream, offered_at = self.pending
+        self.pending = None
+        if self.resync and message["type"] == "world_delta" and stream is not None \
+                and stream.sent is not None:
+            message, encoded = stream.keyframe(), {}
+        self.resync = False
+        latency = time.perf_counter() - offered_at
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+        return message, encoded
+
+    async def _run(self):
+        while not self.closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.pending is None:
+                self._idle.set()
+                continue
+            message, encoded = self._take()
+            try:
+                for frame in self.serialize(self.websocket, message, encoded):
+                    await self.websocket.send(frame)
+                self.frames_sent += 1
+            except websockets.exceptions.ConnectionClosed as e:
+                logger.info(f"Stopped writing to {self.websocket.remote_address}: {e}")
+                self.closed = True
+                self.pending = None
+            except Exception as e:
+                logger.error(f"Error sending message to {self.websocket.remote_address}: {e}")
+            if self.pending is None:
+                self._idle.set()
+        self._idle.set()
+
+    async def drain(self):
+        """Wait until the mailbox is empty and nothing is being sent."""
+        await self._idle.wait()
+
+    async def close(self):
+        """Stop the writer task, discarding any waiting message."""
+        self.closed = True
+        self.pending = None
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self._idle.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Frames offered, sent and dropped, and queue latency (seconds
+            between a frame being offered and the writer picking it up).
+        """
+        taken = self.frames_offered - self.frames_dropped - (self.pending is not None)
+        return {
+            "frames_offered": self.frames_offered,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "queue_latency_last": self.last_latency,
+            "queue_latency_max": self.max_latency,
+            "queue_latency_mean": self.total_latency / taken if taken > 0 else 0.0,
+        }
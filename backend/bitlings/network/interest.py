@@ -0,0 +1,111 @@
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from ..simulation.spatial import SpatialHash
+from .delta import COLLECTIONS
+
+# Extra world units around a viewport that are still sent, so entities moving
+# in from the edge are already known to the client when they become visible
+VIEWPORT_MARGIN = 100.0
+# Cell size of the interest index built for a bare state; viewports span many
+# small simulation cells, so coarser cells keep rectangle queries cheap
+INTEREST_CELL_SIZE = 200.0
+
+
+class Viewport:
+    """An axis-aligned rectangle of the world that a client is looking at."""
+
+    def __init__(self, x: float, y: float, width: float, height: float):
+        """
+        Args:
+            x (float): Left edge in world units.
+            y (float): Top edge in world units.
+            width (float): Width in world units.
+            height (float): Height in world units.
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> Optional['Viewport']:
+        """
+        Build a viewport from a client's `viewport` message payload.
+
+        Returns:
+            Viewport: The viewport, or None if the payload is malformed (missing or
+            non-numeric fields, negative size).
+        """
+        try:
+            x, y = float(payload["x"]), float(payload["y"])
+            width, height = float(payload["width"]), float(payload["height"])
+        except (TypeError, KeyError, ValueError):
+            return None
+        if width < 0 or height < 0:
+            return None
+        return cls(x, y, width, height)
+
+    def bounds(self, margin: float = 0.0):
+        """Return (min_x, min_y, max_x, max_y), grown by `margin` on every side."""
+        return (self.x - margin, self.y - margin,
+                self.x + self.width + margin, self.y + self.height + margin)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Viewport) and self.bounds() == other.bounds()
+
+    def __repr__(self) -> str:
+        return f"Viewport({self.x}, {self.y}, {self.width}, {self.height})"
+
+
+class InterestIndex:
+    """
+    Spatial lookups over one world state, used to cut it down per client.
+
+    Given the environment the state was just taken from, it re-indexes
+    nothing: food and obstacles come from the environment's own spatial
+    indexes, which hold the same dicts the state does, and creatures from a
+    vectorized rectangle test on the population's position columns (the
+    state lists them in row order). A bare state is indexed once instead.
+    Either way each client's view is a rectangle query per collection.
+    """
+
+    def __init__(self, state: Dict[str, Any], environment=None, cell_size: float = INTEREST_CELL_SIZE):
+        """
+        Args:
+            state (dict): A world state as returned by `Environment.get_state()`.
+            environment (Environment, optional): The world `state` was taken
+                from, unchanged since. None indexes `state` itself.
+            cell_size (float): Cell size of the spatial hashes over a bare state.
+        """
+        self.state = state
+        self.environment = environment
+        self.indexes: Dict[str, SpatialHash] = {}
+        if environment is None:
+            for name in COLLECTIONS:
+                index = SpatialHash(cell_size)
+                for entity in state.get(name, []):
+                    index.insert(entity['id'], entity['x'], entity['y'], entity)
+                self.indexes[name] = index
+
+    def visible(self, viewport: Viewport, margin: float = VIEWPORT_MARGIN) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return the part of the state inside `viewport` plus `margin`.
+
+        Returns:
+            dict: A world state with the same collections, holding only the
+            entities in range.
+        """
+        bounds = viewport.bounds(margin)
+        environment = self.environment
+        if environment is None:
+            return {name: index.query_rect(*bounds) for name, index in self.indexes.items()}
+        min_x, min_y, max_x, max_y = bounds
+        population = environment.population
+        x, y = population.x[:population.count], population.y[:population.count]
+        rows = np.flatnonzero((x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y))
+        bitlings = self.state["bitlings"]
+        return {"bitlings": [bitlings[row] for row in rows.tolist()],
+                "food": environment.food.index.query_rect(*bounds),
+                "obstacles": environment.obstacle_index.query_rect(*bounds)}
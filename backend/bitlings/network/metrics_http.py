@@ -0,0 +1,58 @@
+import asyncio
+import logging
+
+from ..simulation.metrics import SimulationMetrics
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsHTTPServer:
+    """
+    Minimal HTTP endpoint serving `SimulationMetrics` for Prometheus scrapes.
+
+    Runs on the same asyncio loop as the simulation and answers `GET /metrics`
+    only; rendering happens per request, so it costs nothing between scrapes.
+    """
+
+    def __init__(self, metrics: SimulationMetrics):
+        self.metrics = metrics
+        self.server = None
+
+    async def start(self, host: str = "0.0.0.0", port: int = 9100):
+        """Start listening on `host`:`port`."""
+        self.server = await asyncio.start_server(self.handle, host, port)
+        logger.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer one HTTP request and close the connection."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain the headers; nothing in them matters here
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                status, body, content_type = "405 Method Not Allowed", "", "text/plain"
+            elif parts[1].split("?")[0] != "/metrics":
+                status, body, content_type = "404 Not Found", "", "text/plain"
+            else:
+                status, body, content_type = "200 OK", self.metrics.render_prometheus(), PROMETHEUS_CONTENT_TYPE
+            payload = body.encode("utf-8")
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+            writer.write(payload)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
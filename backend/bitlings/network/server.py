@@ -1,24 +1,53 @@
 import asyncio
 import json
 import logging
-from typing import Set, Callable, Awaitable, Any
+from typing import Set, Dict, List, Tuple, Callable, Awaitable, Any, Optional
 import websockets
 
+from .delta import DeltaEncoder, KEYFRAME_INTERVAL
+from .interest import InterestIndex, Viewport, VIEWPORT_MARGIN
+from .fanout import ClientWriter, Frame
+from . import binary
+
+# Wire encodings a client can choose in its "hello" message
+ENCODINGS = ("json", "binary")
+
 logger = logging.getLogger(__name__)
 
 
 class NetworkServer:
     """Handles WebSocket connections and communication."""
 
-    def __init__(self, action_queue: asyncio.Queue):
+    def __init__(self, action_queue: asyncio.Queue, keyframe_interval: int = KEYFRAME_INTERVAL,
+                 viewport_margin: float = VIEWPORT_MARGIN, metrics=None):
         self.connected_clients: Set[websockets.WebSocketServerProtocol] = set()
         self.action_queue = action_queue  # Queue for user actions
+        self.keyframe_interval = keyframe_interval
+        # Shared keyframe/delta stream sent to clients that see the whole world
+        self.delta_encoder = DeltaEncoder(keyframe_interval)
+        # Clients that sent a viewport get only what is inside it (plus a margin),
+        # each on its own keyframe/delta stream
+        self.viewport_margin = viewport_margin
+        self.client_viewports: Dict[Any, Viewport] = {}
+        self.client_streams: Dict[Any, DeltaEncoder] = {}
+        # Negotiated wire encoding per client (JSON unless the client asks for binary)
+        self.client_encodings: Dict[Any, str] = {}
+        # Code table sizes each binary client has been sent
+        self.client_dictionaries: Dict[Any, tuple] = {}
+        # World messages reach each client through its own writer task
+        self.writers: Dict[Any, ClientWriter] = {}
+        # Simulation metrics served to clients that ask for them (None if disabled)
+        self.metrics = metrics
 
     async def handler(self, websocket):
         """Handles a single client connection."""
         logger.info(f"Client connected: {websocket.remote_address}")
         self.connected_clients.add(websocket)
+        self.writer_for(websocket)
         try:
+            # Start the client off with the state the delta stream is based on
+            self.send_keyframe(websocket)
+
             # Listen for messages from the client
             async for message in websocket:
                 await self.handle_message(websocket, message)
@@ -36,6 +65,13 @@ class NetworkServer:
             # Ensure client is removed on disconnect/error
             logger.info(f"Removing client: {websocket.remote_address}")
             self.connected_clients.remove(websocket)
+            self.client_encodings.pop(websocket, None)
+            self.client_dictionaries.pop(websocket, None)
+            self.client_viewports.pop(websocket, None)
+            self.client_streams.pop(websocket, None)
+            writer = self.writers.pop(websocket, None)
+            if writer is not None:
+                await writer.close()
 
     async def handle_message(self, websocket: websockets.WebSocketServerProtocol, message: str):
         """Processes incoming messages from a client."""
@@ -58,6 +94,44 @@ class NetworkServer:
             elif message_type == "ping":
                 await websocket.send(json.dumps({"type": "pong"}))
 
+            elif message_type == "hello":
+                # Client chooses its world_update encoding
+                encoding = (payload or {}).get("encoding", "json")
+                if encoding not in ENCODINGS:
+                    logger.warning(f"Unsupported encoding '{encoding}', using json")
+                    encoding = "json"
+                self.client_encodings[websocket] = encoding
+                welcome = {"encoding": encoding}
+                if encoding == "binary":
+                    welcome["dictionary"] = binary.dictionary()
+                    self.client_dictionaries[websocket] = binary.dictionary_size()
+                await websocket.send(json.dumps({"type": "welcome", "payload": welcome}))
+                self.send_keyframe(websocket)
+
+            elif message_type == "viewport":
+                # Client scrolled or resized; a null payload asks for the whole world
+                if payload is None:
+                    self.client_viewports.pop(websocket, None)
+                    if self.client_streams.pop(websocket, None) is not None:
+                        self.send_keyframe(websocket)
+                    return
+                viewport = Viewport.from_payload(payload)
+                if viewport is None:
+                    logger.warning(f"Ignoring malformed viewport from {websocket.remote_address}: {payload}")
+                    return
+                self.client_viewports[websocket] = viewport
+                # The client's next frame is a keyframe of its own stream; later
+                # viewport changes arrive as added/removed entries in its deltas
+                self.client_streams.setdefault(websocket, DeltaEncoder(self.keyframe_interval))
+
+            elif message_type == "metrics":
+                await websocket.send(json.dumps({"type": "metrics", "payload": self.metrics_snapshot()}))
+
+            elif message_type == "resync":
+                # Client missed a delta; send it a fresh keyframe
+                logger.info(f"Resync requested by {websocket.remote_address}")
+                self.send_keyframe(websocket)
+
             else:
                 logger.warning(
                     f"Received unknown message type: {message_type}")
@@ -69,29 +143,146 @@ class NetworkServer:
             logger.error(
                 f"Error handling message from {websocket.remote_address}: {e}", exc_info=True)
 
-    async def broadcast_state(self, state: Any):
-        """Broadcasts the current environment state to all connected clients."""
-        if not self.connected_clients:
-            return
-        message = json.dumps({"type": "world_update", "payload": state})
-        tasks = [asyncio.create_task(self.send_to_client(
-            client, message)) for client in self.connected_clients]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                client = list(self.connected_clients)[i]
-                logger.warning(
-                    f"Failed to send state to client {client.remote_address}: {result}")
+    def writer_for(self, client) -> ClientWriter:
+        """Return the client's writer, creating it on first use."""
+        writer = self.writers.get(client)
+        if writer is None:
+            writer = self.writers[client] = ClientWriter(client, self.serialize_frame)
+        return writer
 
-    async def send_to_client(self, client, message: str):
-        try:
-            await client.send(message)
-        except websockets.exceptions.ConnectionClosedOK:
-            logger.info(
-                f"Client {client.remote_address} disconnected cleanly.")
-        except websockets.exceptions.ConnectionClosedError as e:
-            logger.warning(
-                f"Client {client.remote_address} disconnected with error: {e}")
-        except Exception as e:
-            logger.error(
-                f"Error sending message to {client.remote_address}: {e}")
+    def send_keyframe(self, websocket):
+        """Queue a full world_update keyframe for a single client."""
+        encoder = self.client_streams.get(websocket, self.delta_encoder)
+        if encoder.sent is None:
+            return  # Nothing broadcast yet; the next frame is a keyframe anyway
+        self.writer_for(websocket).offer(encoder.keyframe(), {}, encoder)
+
+    def serialize_frame(self, client, message: Dict[str, Any], encoded: Dict[str, Any]) -> List[Frame]:
+        """
+        Encode a world message in the client's negotiated encoding.
+
+        Args:
+            client: The websocket the frames are for.
+            message (dict): A world_update or world_delta message.
+            encoded (dict): Per-message cache of encoded forms, shared across
+                clients so each encoding is produced at most once.
+
+        Returns:
+            List[Frame]: The websocket messages to send, in order.
+        """
+        if self.client_encodings.get(client) == "binary":
+            if "binary" not in encoded:
+                encoded["binary"] = binary.encode_frame(message)
+            if encoded["binary"] is not None:
+                frames: List[Frame] = []
+                size = binary.dictionary_size()
+                if self.client_dictionaries.get(client) != size:
+                    # New emoji/action codes appeared since the handshake
+                    self.client_dictionaries[client] = size
+                    frames.append(json.dumps({"type": "dictionary", "payload": binary.dictionary()}))
+                frames.append(encoded["binary"])
+                return frames
+        if "json" not in encoded:
+            encoded["json"] = json.dumps(message)
+        return [encoded["json"]]
+
+    async def broadcast_state(self, state: Any, environment=None):
+        """
+        Hands the current environment state to every client's writer.
+
+        Sends a keyframe every `keyframe_interval` frames and deltas in between.
+        Clients without a viewport share one stream of the whole world; clients
+        with a viewport get their own stream filtered through an `InterestIndex`
+        (the environment's own indexes when `environment` is given). Returns
+        without waiting for any socket; a client that is still busy with an
+        older frame skips it.
+
+        Args:
+            state: The world state, as returned by `Environment.get_state()`.
+            environment (Environment, optional): The world `state` was just
+                taken from, whose spatial indexes then answer viewport queries.
+        """
+        for client, message, encoded, stream in self.encode_frames(state, environment):
+            self.writer_for(client).offer(message, encoded, stream)
+
+    def encode_frames(self, state: Any,
+                      environment=None) -> List[Tuple[Any, Dict[str, Any], Dict[str, Any], DeltaEncoder]]:
+        """
+        Encode the next frame for every connected client.
+
+        Args:
+            state: The world state.
+            environment (Environment, optional): See `broadcast_state`.
+
+        Returns:
+            List[Tuple]: (client, message, encoded cache, stream) entries. Clients
+            on the shared stream share one message and one encoded cache.
+        """
+        clients = list(self.connected_clients)
+        frames = []
+        shared = [client for client in clients if client not in self.client_viewports]
+        if shared:
+            message = self.delta_encoder.encode(state)
+            encoded: Dict[str, Any] = {}
+            frames.extend((client, message, encoded, self.delta_encoder) for client in shared)
+        else:
+            # Nobody is tracking the shared stream; start over with a keyframe
+            self.delta_encoder.reset()
+
+        viewers = [client for client in clients if client in self.client_viewports]
+        if viewers:
+            index = InterestIndex(state, environment)
+            for client in viewers:
+                stream = self.client_streams[client]
+                visible = index.visible(self.client_viewports[client], self.viewport_margin)
+                frames.append((client, stream.encode(visible), {}, stream))
+        return frames
+
+    def observed_regions(self) -> Optional[List[Tuple[float, float, float, float]]]:
+        """
+        Return the parts of the world clients are watching, for `LevelOfDetail`.
+
+        Returns:
+            List: (min_x, min_y, max_x, max_y) of every connected client's
+            viewport grown by `viewport_margin` (what the client is sent), or
+            None when some client receives the whole world.
+        """
+        regions = []
+        for client in self.connected_clients:
+            viewport = self.client_viewports.get(client)
+            if viewport is None:
+                return None
+            regions.append(viewport.bounds(self.viewport_margin))
+        return regions
+
+    def client_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            dict: Per-client send counters (see `ClientWriter.stats`), keyed by
+            remote address.
+        """
+        return {f"{client.remote_address}": writer.stats()
+                for client, writer in self.writers.items()}
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: The simulation metrics snapshot plus per-client send counters,
+            or just {"enabled": False} when metrics are disabled.
+        """
+        if self.metrics is None:
+            return {"enabled": False}
+        snapshot = self.metrics.snapshot()
+        snapshot["enabled"] = True
+        snapshot["clients"] = self.client_stats()
+        return snapshot
+
+    async def drain(self):
+        """Wait until every client's writer has sent or dropped what it was given."""
+        await asyncio.gather(*(writer.drain() for writer in list(self.writers.values())))
+
+    async def close(self):
+        """Stop every writer task."""
+        writers = list(self.writers.values())
+        self.writers.clear()
+        await asyncio.gather(*(writer.close() for writer in writers))
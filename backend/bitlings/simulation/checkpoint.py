@@ -0,0 +1,174 @@
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+from .snapshot import Snapshot, capture_snapshot, write_snapshot, MANIFEST
+
+# Seconds between periodic checkpoints
+DEFAULT_INTERVAL = 60.0
+# Completed checkpoints kept on disk; older ones are deleted
+DEFAULT_KEEP = 3
+# Checkpoint directory names are PREFIX + zero-padded sequence number
+PREFIX = "checkpoint-"
+TEMP_SUFFIX = ".tmp"
+
+logger = logging.getLogger(__name__)
+
+
+def _fsync_directory(path: str):
+    """Flush a directory entry so a rename inside it survives a crash."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def list_checkpoints(directory: str) -> List[str]:
+    """Return the completed checkpoints in `directory`, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith(PREFIX) and not name.endswith(TEMP_SUFFIX)
+                   and os.path.exists(os.path.join(directory, name, MANIFEST)))
+    return [os.path.join(directory, name) for name in names]
+
+
+def latest_checkpoint(directory: str) -> Optional[str]:
+    """Return the newest completed checkpoint in `directory`, or None."""
+    checkpoints = list_checkpoints(directory)
+    return checkpoints[-1] if checkpoints else None
+
+
+class Checkpointer:
+    """
+    Periodic snapshots written off the simulation loop.
+
+    Between ticks the loop calls `maybe_checkpoint`, which takes a consistent
+    in-memory copy of the environment (`capture_snapshot`: array copies plus one
+    pass over creature attributes) and hands it to a single worker thread. The
+    worker writes the snapshot into a temporary directory, fsyncs it, renames it
+    into place and deletes checkpoints beyond `keep`. A reader therefore only
+    ever sees complete checkpoints. If the previous write is still running when
+    the next one is due, that checkpoint is skipped rather than queued.
+    """
+
+    def __init__(self, directory: str, interval: float = DEFAULT_INTERVAL, keep: int = DEFAULT_KEEP):
+        """
+        Args:
+            directory (str): Where checkpoints are kept; created if needed.
+            interval (float): Seconds between periodic checkpoints.
+            keep (int): Completed checkpoints to retain.
+        """
+        self.directory = directory
+        self.interval = interval
+        self.keep = max(1, keep)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        self.pending: Optional[Future] = None
+        self.last_started: Optional[float] = None
+        existing = list_checkpoints(directory)
+        self.sequence = int(os.path.basename(existing[-1])[len(PREFIX):]) if existing else 0
+        # Counters
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.last_capture_seconds = 0.0
+        self.last_write_seconds = 0.0
+        self.last_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._remove_partial()
+
+    @property
+    def busy(self) -> bool:
+        """True while a checkpoint is being written."""
+        return self.pending is not None and not self.pending.done()
+
+    def due(self, now: float) -> bool:
+        return self.last_started is None or now - self.last_started >= self.interval
+
+    def maybe_checkpoint(self, environment, now: Optional[float] = None) -> Optional[Future]:
+        """
+        Start a checkpoint if the interval has elapsed and no write is running.
+
+        Returns:
+            Future: Resolves to the checkpoint path, or None if nothing started.
+        """
+        now = time.monotonic() if now is None else now
+        if not self.due(now):
+            return None
+        if self.busy:
+            self.skipped += 1
+            logger.warning("Previous checkpoint still being written; skipping this one")
+            self.last_started = now
+            return None
+        self.last_started = now
+        return self.checkpoint(environment)
+
+    def checkpoint(self, environment) -> Future:
+        """
+        Capture `environment` now and write it in the background.
+
+        Returns:
+            Future: Resolves to the path of the completed checkpoint.
+        """
+        start = time.perf_counter()
+        snapshot = capture_snapshot(environment)
+        self.last_capture_seconds = time.perf_counter() - start
+        self.sequence += 1
+        self.pending = self.executor.submit(self._write, snapshot, self.sequence)
+        self.pending.add_done_callback(self._finished)
+        return self.pending
+
+    def _write(self, snapshot: Snapshot, sequence: int) -> str:
+        start = time.perf_counter()
+        final = os.path.join(self.directory, f"{PREFIX}{sequence:08d}")
+        temporary = final + TEMP_SUFFIX
+        shutil.rmtree(temporary, ignore_errors=True)
+        try:
+            write_snapshot(snapshot, temporary, fsync=True)
+            _fsync_directory(temporary)
+            os.rename(temporary, final)
+            _fsync_directory(self.directory)
+        except BaseException:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+        self._rotate()
+        self.last_write_seconds = time.perf_counter() - start
+        self.last_bytes = snapshot.nbytes
+        return final
+
+    def _finished(self, future: Future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.failed += 1
+            logger.error(f"Checkpoint failed: {error}")
+        else:
+            self.written += 1
+            logger.info(f"Checkpoint written to {future.result()} "
+                        f"(capture {self.last_capture_seconds * 1000:.1f} ms, "
+                        f"write {self.last_write_seconds:.2f} s)")
+
+    def _rotate(self):
+        """Delete the oldest completed checkpoints beyond `keep`."""
+        for path in list_checkpoints(self.directory)[:-self.keep]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _remove_partial(self):
+        """Delete temporary directories left behind by an interrupted write."""
+        for name in os.listdir(self.directory):
+            if name.startswith(PREFIX) and name.endswith(TEMP_SUFFIX):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def close(self, wait: bool = True):
+        """Stop the worker, by default after the running write finishes."""
+        self.executor.shutdown(wait=wait)
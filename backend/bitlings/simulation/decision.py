@@ -0,0 +1,52 @@
+import numpy as np
+from typing import Optional
+
+from ..ai.inference import PopulationInference
+from .perception import scan, NearestQuery
+
+
+def decide_rows(rows: np.ndarray, x: np.ndarray, y: np.ndarray, hunger: np.ndarray, energy: np.ndarray,
+                stack: Optional[PopulationInference], nearest_food: NearestQuery,
+                nearest_obstacle: NearestQuery, perception: np.ndarray, chosen: np.ndarray):
+    """
+    Perceive and run network inference for a chunk of creature rows.
+
+    Only reads world state and writes `perception[rows]`, `chosen[rows]` and
+    the networks' activation rows, so disjoint chunks can be evaluated
+    concurrently (threads or processes) and applied afterwards with
+    `apply_decisions`.
+
+    Args:
+        rows (np.ndarray): Population rows to decide for.
+        x, y, hunger, energy (np.ndarray): Population columns.
+        stack (PopulationInference, optional): The population's networks; None
+            when no network is attached yet (nothing is chosen).
+        nearest_food, nearest_obstacle (NearestQuery): Spatial queries.
+        perception (np.ndarray): Output, one Perception per row (N x 6).
+        chosen (np.ndarray): Output, the index of the chosen network output.
+    """
+    for row, row_x, row_y in zip(rows.tolist(), x[rows].tolist(), y[rows].tolist()):
+        perception[row] = scan(row_x, row_y, nearest_food, nearest_obstacle)
+    if stack is not None and rows.size:
+        stack.set_inputs(rows, hunger[rows], energy[rows],
+                         perception[rows, 0], perception[rows, 1], perception[rows, 2])
+        stack.settle(rows)
+        chosen[rows] = stack.chosen_actions(rows)
+
+
+def apply_decisions(environment, rows: np.ndarray, perception: np.ndarray, chosen: np.ndarray):
+    """
+    Start the actions chosen by `decide_rows`, serially and in row order.
+
+    Each perception is stored in the environment's perception cache, so the
+    execute phase reads the same values, and `begin_action` makes any food
+    claims in the same order as `Environment.choose_actions` would.
+    """
+    views = environment.population.views
+    cache = environment.perception
+    for row, row_perception, action_index in zip(rows.tolist(), perception[rows].tolist(),
+                                                 chosen[rows].tolist()):
+        bitling = views[row]
+        row_perception = tuple(row_perception)
+        cache.store(bitling, row_perception)
+        bitling.begin_action(bitling.network.output_names[action_index], row_perception[0])
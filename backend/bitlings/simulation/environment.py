@@ -1,24 +1,52 @@
 import uuid
 import random
-from typing import List, Dict, Any
-# Assuming creature.py is in bitlings folder
-from bitlings.creature.bitling import Bitling
+import numpy as np
+from typing import List, Dict, Any, Tuple, Optional
+from ..creature.bitling import Bitling
+from .population import PopulationStore
+from .spatial import SpatialHash, DEFAULT_CELL_SIZE
+from .perception import PerceptionCache
+from .food import FoodStore
+from .obstacles import ObstacleField, DEFAULT_FIELD_RESOLUTION
+from .flow import FlowField, DEFAULT_FLOW_CELL_SIZE
 
 
 class Environment:
     """Manages the simulation world state."""
 
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, cell_size: float = DEFAULT_CELL_SIZE,
+                 initial_creatures: int = 5, initial_food: int = 10,
+                 obstacle_resolution: float = DEFAULT_FIELD_RESOLUTION,
+                 flow_cell_size: float = DEFAULT_FLOW_CELL_SIZE):
         self.width = width
         self.height = height
-        self.bitlings: List[Bitling] = []
+        # Columnar state for every creature; `bitlings` exposes the row views
+        self.population = PopulationStore()
+        # Food items with O(1) removal, a spatial index and claims
         # Example: {'id': uuid, 'x': float, 'y': float, 'emoji': '🍎'}
-        self.food_sources: List[Dict[str, Any]] = []
-        self.obstacles: List[Dict[str, Any]] = [] # Initialize obstacles
+        self.food = FoodStore(cell_size)
+        # Spatial index kept in sync with obstacles
+        self.obstacle_index = SpatialHash(cell_size)
+        self._obstacles: List[Dict[str, Any]] = []
+        # Distance and avoidance field, updated where obstacles are added or removed
+        self.obstacle_field = ObstacleField(width, height, obstacle_resolution)
+        # Paths to the nearest food around obstacles, shared by every seeker
+        self.flow = FlowField(self, flow_cell_size)
+        # Bumped whenever obstacles change, to invalidate cached perception
+        self.obstacle_version = 0
+        self.tick = 0
+        # Simulated seconds elapsed, summed over `update` calls
+        self.time = 0.0
+        self.perception = PerceptionCache(self)
+        # Learning events (creature, output index, reward) collected while a
+        # batch is open; None applies each reinforcement immediately
+        self.learning_events: Optional[List[Tuple[Bitling, int, float]]] = None
+        # Population rows decided by the last `choose_actions` call
+        self.last_decided_rows = np.zeros(0, dtype=np.intp)
 
         # --- Populate initial state ---
-        self.add_initial_creatures(5)
-        self.add_initial_food(10)
+        self.add_initial_creatures(initial_creatures)
+        self.add_initial_food(initial_food)
         self.add_initial_obstacles() # Call to populate obstacles
 
     def add_obstacle(self, x: float, y: float, radius: float, emoji: str = "🚧"):
@@ -31,7 +59,24 @@ class Environment:
             'radius': radius,
             'emoji': emoji
         }
-        self.obstacles.append(obstacle)
+        self._obstacles.append(obstacle)
+        self.obstacle_index.insert(new_id, x, y, obstacle)
+        self.obstacle_field.add(obstacle)
+        self.obstacle_version += 1
+
+    def remove_obstacle(self, obstacle_id: str) -> bool:
+        """
+        Remove an obstacle.
+
+        Returns:
+            bool: True if the obstacle existed.
+        """
+        if not self.obstacle_index.remove(obstacle_id):
+            return False
+        self._obstacles = [obstacle for obstacle in self._obstacles if obstacle['id'] != obstacle_id]
+        self.obstacle_field.remove(obstacle_id)
+        self.obstacle_version += 1
+        return True
 
     def add_initial_obstacles(self):
         """Populate some initial obstacles."""
@@ -41,8 +86,48 @@ class Environment:
         self.add_obstacle(x=self.width/2, y=self.height*3/4, radius=25, emoji="🌳")
 
 
+    @property
+    def bitlings(self) -> List[Bitling]:
+        """The living creatures, in population row order."""
+        return self.population.members()
+
+    @bitlings.setter
+    def bitlings(self, bitlings: List[Bitling]):
+        self.population.clear()
+        for bitling in bitlings:
+            self.add_bitling(bitling)
+
     def add_bitling(self, bitling: Bitling):
-        self.bitlings.append(bitling)
+        self.population.adopt(bitling)
+
+    @property
+    def food_sources(self) -> List[Dict[str, Any]]:
+        """The food items, in storage slot order. Use add_food/remove_food to change them."""
+        return self.food.items
+
+    @food_sources.setter
+    def food_sources(self, food_sources: List[Dict[str, Any]]):
+        self.food.clear()
+        for food in food_sources:
+            self.food.add(food)
+
+    @property
+    def food_version(self) -> int:
+        """Bumped whenever food is added or removed, to invalidate cached perception."""
+        return self.food.version
+
+    @property
+    def obstacles(self) -> List[Dict[str, Any]]:
+        return self._obstacles
+
+    @obstacles.setter
+    def obstacles(self, obstacles: List[Dict[str, Any]]):
+        self._obstacles = list(obstacles)
+        self.obstacle_index.clear()
+        for obstacle in self._obstacles:
+            self.obstacle_index.insert(obstacle['id'], obstacle['x'], obstacle['y'], obstacle)
+        self.obstacle_field.rebuild(self._obstacles)
+        self.obstacle_version += 1
 
     def add_food(self, food: Dict[str, Any]):
         """Add food to the environment."""
@@ -55,7 +140,76 @@ class Environment:
             food['x'] = random.uniform(0, self.width)
             food['y'] = random.uniform(0, self.height)
 
-        self.food_sources.append(food)
+        self.food.add(food)
+
+    def remove_food(self, food_id: str) -> bool:
+        """
+        Remove a food item, e.g. once it has been eaten.
+
+        Returns:
+            bool: True if the food item existed.
+        """
+        return self.food.remove(food_id)
+
+    def nearest_food(self, x: float, y: float) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Find the food item nearest to (x, y).
+
+        Returns:
+            Tuple: (food item, distance), or (None, inf) if there is no food.
+        """
+        return self.food.nearest(x, y)
+
+    def nearest_obstacle(self, x: float, y: float) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Find the obstacle whose center is nearest to (x, y).
+
+        Returns:
+            Tuple: (obstacle, distance to its center), or (None, inf) if there are none.
+        """
+        return self.obstacle_index.nearest(x, y)
+
+    def obstacle_avoidance(self, x: float, y: float) -> Tuple[float, float]:
+        """
+        Return the steering force away from every obstacle near (x, y).
+
+        Looked up in the obstacle field, so the cost doesn't depend on the
+        number of obstacles (see `ObstacleField`).
+        """
+        return self.obstacle_field.avoidance(x, y)
+
+    def food_flow(self, x: float, y: float,
+                  target: Tuple[float, float]) -> Optional[Tuple[float, float]]:
+        """
+        Return the direction that leads from (x, y) around obstacles to the food at `target`.
+
+        Returns:
+            Tuple: Unit (dx, dy) from the shared flow field, or None where the
+            field leads to other food or the target is in the same cell (steer
+            straight there).
+        """
+        return self.flow.steer(x, y, target[0], target[1])
+
+    def food_within(self, x: float, y: float, radius: float) -> List[Tuple[Dict[str, Any], float]]:
+        """Return (food item, distance) pairs within `radius` of (x, y), nearest first."""
+        return self.food.index.query_radius(x, y, radius)
+
+    def claim_nearest_food(self, x: float, y: float, claimant: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Reserve the nearest food item nobody else has claimed.
+
+        Returns:
+            Tuple: (food item, distance), or (None, inf) if no food is available.
+        """
+        return self.food.claim_nearest(x, y, claimant)
+
+    def release_food_claim(self, claimant: str):
+        """Drop the food claim held by `claimant`, if any."""
+        self.food.release(claimant)
+
+    def obstacles_within(self, x: float, y: float, radius: float) -> List[Tuple[Dict[str, Any], float]]:
+        """Return (obstacle, center distance) pairs within `radius` of (x, y), nearest first."""
+        return self.obstacle_index.query_radius(x, y, radius)
 
     def add_initial_creatures(self, count: int):
         for _ in range(count):
@@ -75,10 +229,89 @@ class Environment:
 
     def update(self, time_delta: float):
         """Update environment state (e.g., food spawning/decaying)."""
-        # Remove dead bitlings
-        self.bitlings = [b for b in self.bitlings if b.health > 0]
+        self.tick += 1
+        self.time += time_delta
+        self.perception.begin_tick(self.tick)
+        # Remove dead bitlings and free the food they were heading for
+        for dead in self.population.remove_dead():
+            self.food.release(dead.id)
         # TODO: Add logic for food spawning, object interactions etc.
 
+    def choose_actions(self, creatures: Optional[List[Bitling]] = None):
+        """
+        Decide the next action for every living creature.
+
+        Equivalent to calling `Bitling.choose_action` on each creature, but network
+        inference runs as one batched pass over the population's network stack.
+
+        Args:
+            creatures (List[Bitling], optional): Decide for these creatures only,
+                in the given order (see `DecisionScheduler`). Defaults to everyone.
+        """
+        population = self.population
+        if creatures is None:
+            creatures = population.members()
+        deciding = [b for b in creatures if b.current_action != "dead"]
+        rows = np.array([b._row for b in deciding], dtype=np.intp)
+        self.last_decided_rows = rows
+        if not deciding:
+            return
+        # Bulk perception for the tick; execute_action reads the same cache entries
+        perceptions = np.array(self.perception.compute_all(deciding), dtype=float)
+        distances = perceptions[:, 0]
+
+        networks = population.networks
+        networks.set_inputs(rows, population.hunger[rows], population.energy[rows],
+                            distances, perceptions[:, 1], perceptions[:, 2])
+        networks.settle(rows)
+        chosen = networks.chosen_actions(rows)
+
+        for bitling, action_index, distance in zip(deciding, chosen, distances):
+            bitling.begin_action(bitling.network.output_names[action_index], distance)
+
+    def reinforce(self, bitling: Bitling, action_index: int, was_successful: bool):
+        """
+        Reinforce an action in a creature's network (see `BitlingNetwork.apply_learning`).
+
+        While a learning batch is open the event is queued and applied by
+        `apply_learning_batch`; otherwise it is applied right away.
+        """
+        if self.learning_events is None:
+            bitling.network.apply_learning(action_index, was_successful)
+        elif was_successful:
+            self.learning_events.append((bitling, action_index, 1.0))
+
+    def begin_learning_batch(self):
+        """Queue reinforcements from now on instead of applying them one by one."""
+        if self.learning_events is None:
+            self.learning_events = []
+
+    def apply_learning_batch(self) -> int:
+        """
+        Apply every queued reinforcement in one vectorized update and close the batch.
+
+        Learning only changes weights, which are next read when creatures
+        decide, so applying a tick's events at its end gives the same result
+        as applying each immediately.
+
+        Returns:
+            int: Number of events applied.
+        """
+        events, self.learning_events = self.learning_events or [], None
+        self.population.apply_learning(events)
+        return len(events)
+
+    def discard_learning_batch(self) -> int:
+        """
+        Close the batch without applying its reinforcements, e.g. when
+        `EligibilityTraces` credits the same stress drops.
+
+        Returns:
+            int: Number of events dropped.
+        """
+        events, self.learning_events = self.learning_events or [], None
+        return len(events)
+
     def get_state(self) -> Dict[str, Any]:
         """Return the environment state for serialization."""
         state_dict = {
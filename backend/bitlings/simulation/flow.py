@@ -0,0 +1,226 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# World units per flow field cell
+DEFAULT_FLOW_CELL_SIZE = 10.0
+# Neighbour offsets (row, column) and their step length in cells
+_NEIGHBOURS = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+               (-1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (1, 1, math.sqrt(2))]
+_INF = float('inf')
+
+
+class FlowField:
+    """
+    Shared path distances from every grid cell to the nearest food, around obstacles.
+
+    The world is divided into square cells; cells whose center lies within
+    half a cell of an obstacle are blocked, so paths keep clear of surfaces.
+    A multi-source Dijkstra from every cell holding food gives each cell its
+    path distance to the nearest food and the food cell it drains to
+    (`source`), moving between 8-connected cells without cutting blocked
+    corners. A creature follows the field by stepping toward the neighbouring
+    cell with the smallest distance, an O(1) lookup whatever the number of
+    seekers.
+
+    The field follows the environment lazily, on the next lookup: new food
+    only lowers distances and is relaxed outward from its cell; eaten food
+    re-floods just the cells that drained to it, from their neighbours. A
+    change of obstacles rebuilds the whole field.
+    """
+
+    def __init__(self, environment, cell_size: float = DEFAULT_FLOW_CELL_SIZE):
+        """
+        Args:
+            environment (Environment): The world whose food and obstacles are followed.
+            cell_size (float): World units per cell.
+        """
+        self.environment = environment
+        self.cell_size = cell_size
+        self.columns = max(1, int(math.ceil(environment.width / cell_size)))
+        self.rows = max(1, int(math.ceil(environment.height / cell_size)))
+        count = self.rows * self.columns
+        # Flat, row-major per-cell state; plain lists keep the Dijkstra loop fast
+        self._distance: List[float] = [_INF] * count
+        self._source: List[int] = [-1] * count
+        self._blocked: List[bool] = [False] * count
+        self.food_cells: Dict[int, int] = {}  # cell -> number of food items in it
+        self.food_version = None
+        self.obstacle_version = None
+        # Cells settled by Dijkstra so far, to check that updates stay local
+        self.cells_settled = 0
+
+    def cell_of(self, x: float, y: float) -> int:
+        """Return the flat index of the cell containing (x, y), clamped to the world."""
+        column = min(max(int(x // self.cell_size), 0), self.columns - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return row * self.columns + column
+
+    def distance(self) -> np.ndarray:
+        """Return the path distance grid (rows x columns; inf where no food is reachable)."""
+        self.sync()
+        return np.array(self._distance).reshape(self.rows, self.columns)
+
+    # --- Updates ---
+
+    def sync(self):
+        """Bring the field up to date with the environment's food and obstacles."""
+        environment = self.environment
+        if environment.obstacle_version != self.obstacle_version:
+            self._rebuild()
+        elif environment.food_version != self.food_version:
+            cells = self._current_food_cells()
+            for cell in [cell for cell in self.food_cells if cell not in cells]:
+                self._remove_source(cell)
+            added = [cell for cell in cells if cell not in self.food_cells]
+            self.food_cells = cells
+            self._add_sources(added)
+        self.food_version = environment.food_version
+
+    def _current_food_cells(self) -> Dict[int, int]:
+        food = self.environment.food
+        count = len(food)
+        if count == 0:
+            return {}
+        columns = np.clip((food.x[:count] // self.cell_size).astype(np.int64), 0, self.columns - 1)
+        rows = np.clip((food.y[:count] // self.cell_size).astype(np.int64), 0, self.rows - 1)
+        cells, counts = np.unique(rows * self.columns + columns, return_counts=True)
+        return dict(zip(cells.tolist(), counts.tolist()))
+
+    def _rebuild(self):
+        """Recompute blocked cells and every distance from scratch."""
+        environment = self.environment
+        count = self.rows * self.columns
+        blocked = np.zeros((self.rows, self.columns), dtype=bool)
+        centers_x = (np.arange(self.columns) + 0.5) * self.cell_size
+        centers_y = (np.arange(self.rows) + 0.5) * self.cell_size
+        for obstacle in environment.obstacles:
+            blocked |= np.hypot(centers_x[None, :] - obstacle['x'], centers_y[:, None] - obstacle['y']) \
+                < obstacle['radius'] + self.cell_size / 2
+        self._blocked = blocked.ravel().tolist()
+        self._distance = [_INF] * count
+        self._source = [-1] * count
+        self.food_cells = self._current_food_cells()
+        self._add_sources(list(self.food_cells))
+        self.obstacle_version = environment.obstacle_version
+
+    def _add_sources(self, cells: List[int]):
+        """Make `cells` sources (distance 0) and relax outward from them."""
+        heap = []
+        for cell in cells:
+            self._distance[cell] = 0.0
+            self._source[cell] = cell
+            heap.append((0.0, cell))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def _remove_source(self, cell: int):
+        """Drop a food cell and re-flood the cells that drained to it from their neighbours."""
+        distance, source = self._distance, self._source
+        rows, columns = self.rows, self.columns
+        # Every cell draining to `cell` was reached from a neighbour draining to
+        # it, so the region is connected: collect it by flooding out from `cell`
+        region = []
+        if source[cell] == cell:
+            source[cell] = -1
+            region.append(cell)
+        for index in region:
+            row, column = divmod(index, columns)
+            for d_row, d_column, _ in _NEIGHBOURS:
+                r, c = row + d_row, column + d_column
+                if 0 <= r < rows and 0 <= c < columns and source[r * columns + c] == cell:
+                    source[r * columns + c] = -1
+                    region.append(r * columns + c)
+        for index in region:
+            distance[index] = _INF
+        # Every settled neighbour is a seed; `_propagate` applies the step rules
+        heap = []
+        for index in region:
+            row, column = divmod(index, columns)
+            for d_row, d_column, _ in _NEIGHBOURS:
+                r, c = row + d_row, column + d_column
+                if 0 <= r < self.rows and 0 <= c < columns and distance[r * columns + c] < _INF:
+                    heap.append((distance[r * columns + c], r * columns + c))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def _neighbours(self, cell: int):
+        """Yield the cells reachable in one step from `cell` (no corner cutting)."""
+        columns, blocked = self.columns, self._blocked
+        row, column = divmod(cell, columns)
+        for d_row, d_column, _ in _NEIGHBOURS:
+            r, c = row + d_row, column + d_column
+            if 0 <= r < self.rows and 0 <= c < columns:
+                neighbour = r * columns + c
+                if not blocked[neighbour] and not (
+                        d_row and d_column and (blocked[row * columns + c] or blocked[r * columns + column])):
+                    yield neighbour
+
+    def _propagate(self, heap: List[Tuple[float, int]]):
+        """Dijkstra from the entries in `heap`, lowering distances only."""
+        distance, source, blocked = self._distance, self._source, self._blocked
+        rows, columns, size = self.rows, self.columns, self.cell_size
+        settled = 0
+        while heap:
+            current, cell = heapq.heappop(heap)
+            if current > distance[cell]:
+                continue
+            settled += 1
+            origin = source[cell]
+            row, column = divmod(cell, columns)
+            for d_row, d_column, step in _NEIGHBOURS:
+                r, c = row + d_row, column + d_column
+                if not (0 <= r < rows and 0 <= c < columns):
+                    continue
+                neighbour = r * columns + c
+                if blocked[neighbour] or (d_row and d_column and (
+                        blocked[row * columns + c] or blocked[r * columns + column])):
+                    continue
+                candidate = current + step * size
+                if candidate < distance[neighbour]:
+                    distance[neighbour] = candidate
+                    source[neighbour] = origin
+                    heapq.heappush(heap, (candidate, neighbour))
+        self.cells_settled += settled
+
+    # --- Lookups ---
+
+    def direction(self, x: float, y: float) -> Optional[Tuple[float, float, int]]:
+        """
+        Return the way to the nearest food from (x, y).
+
+        Returns:
+            Tuple: (unit dx, unit dy, food cell it leads to), or None when
+            (x, y) is in a food cell, a blocked cell or cannot reach any food.
+        """
+        self.sync()
+        cell = self.cell_of(x, y)
+        distance = self._distance
+        if distance[cell] == 0.0 or distance[cell] == _INF:
+            return None
+        best, best_distance = -1, distance[cell]
+        for neighbour in self._neighbours(cell):
+            if distance[neighbour] < best_distance:
+                best, best_distance = neighbour, distance[neighbour]
+        if best < 0:
+            return None
+        row, column = divmod(best, self.columns)
+        dx = (column + 0.5) * self.cell_size - x
+        dy = (row + 0.5) * self.cell_size - y
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return None
+        return dx / length, dy / length, self._source[cell]
+
+    def steer(self, x: float, y: float, target_x: float, target_y: float) -> Optional[Tuple[float, float]]:
+        """
+        Return the unit direction to follow from (x, y) toward the food at
+        (target_x, target_y), or None when the field doesn't lead there (the
+        nearest food is another item, or the target is in the same cell).
+        """
+        way = self.direction(x, y)
+        if way is None or way[2] != self.cell_of(target_x, target_y):
+            return None
+        return way[0], way[1]
@@ -0,0 +1,170 @@
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+from .spatial import SpatialHash, DEFAULT_CELL_SIZE
+
+
+class FoodStore:
+    """
+    Indexed storage for food items.
+
+    Food dicts are kept in dense slots with their coordinates mirrored in NumPy
+    arrays. An id-to-slot map gives O(1) lookup, and removal swaps the last slot
+    into the freed one. A spatial hash answers nearest-food queries, and a claim
+    table lets each creature reserve the item it is heading for so seekers spread
+    out instead of piling onto the same food.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE, capacity: int = 64):
+        """
+        Args:
+            cell_size (float): Cell size of the spatial index.
+            capacity (int): Initial number of coordinate slots.
+        """
+        self.capacity = max(1, capacity)
+        self.x = np.zeros(self.capacity, dtype=float)
+        self.y = np.zeros(self.capacity, dtype=float)
+        self.items: List[Dict[str, Any]] = []
+        self.slots: Dict[str, int] = {}
+        self.index = SpatialHash(cell_size)
+        self.claims: Dict[str, str] = {}      # food id -> claimant id
+        self.claimed_by: Dict[str, str] = {}  # claimant id -> food id
+        # Bumped on every add/remove so caches can tell the food set changed
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, food_id) -> bool:
+        return food_id in self.slots
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def get(self, food_id: str) -> Optional[Dict[str, Any]]:
+        """Return the food item with `food_id`, or None."""
+        slot = self.slots.get(food_id)
+        return None if slot is None else self.items[slot]
+
+    def add(self, food: Dict[str, Any]) -> int:
+        """
+        Store a food item that already has 'id', 'x' and 'y'.
+
+        Returns:
+            int: The slot the item was stored in.
+        """
+        if food['id'] in self.slots:
+            self.remove(food['id'])
+        slot = len(self.items)
+        if slot >= self.capacity:
+            self.x = np.concatenate([self.x, np.zeros(self.capacity)])
+            self.y = np.concatenate([self.y, np.zeros(self.capacity)])
+            self.capacity *= 2
+        self.x[slot] = food['x']
+        self.y[slot] = food['y']
+        self.items.append(food)
+        self.slots[food['id']] = slot
+        self.index.insert(food['id'], food['x'], food['y'], food)
+        self.version += 1
+        return slot
+
+    def remove(self, food_id: str) -> bool:
+        """
+        Remove a food item in O(1) by moving the last slot into its place.
+        Any claim on the item is released.
+
+        Returns:
+            bool: True if the item existed.
+        """
+        slot = self.slots.pop(food_id, None)
+        if slot is None:
+            return False
+        last = len(self.items) - 1
+        if slot != last:
+            moved = self.items[last]
+            self.items[slot] = moved
+            self.x[slot] = self.x[last]
+            self.y[slot] = self.y[last]
+            self.slots[moved['id']] = slot
+        self.items.pop()
+        self.index.remove(food_id)
+        claimant = self.claims.pop(food_id, None)
+        if claimant is not None:
+            self.claimed_by.pop(claimant, None)
+        self.version += 1
+        return True
+
+    def clear(self):
+        """Remove every food item and claim."""
+        self.items.clear()
+        self.slots.clear()
+        self.index.clear()
+        self.claims.clear()
+        self.claimed_by.clear()
+        self.version += 1
+
+    # --- Claims ---
+
+    def claim(self, food_id: str, claimant: str) -> bool:
+        """
+        Reserve a food item for `claimant`, releasing its previous claim.
+
+        Returns:
+            bool: False if the item does not exist or is claimed by someone else.
+        """
+        if food_id not in self.slots:
+            return False
+        holder = self.claims.get(food_id)
+        if holder is not None and holder != claimant:
+            return False
+        self.release(claimant)
+        self.claims[food_id] = claimant
+        self.claimed_by[claimant] = food_id
+        return True
+
+    def release(self, claimant: str):
+        """Drop the claim held by `claimant`, if any."""
+        food_id = self.claimed_by.pop(claimant, None)
+        if food_id is not None:
+            self.claims.pop(food_id, None)
+
+    def claimant_of(self, food_id: str) -> Optional[str]:
+        """Return who holds the claim on `food_id`, or None."""
+        return self.claims.get(food_id)
+
+    # --- Queries ---
+
+    def nearest(self, x: float, y: float, claimant: Optional[str] = None,
+                unclaimed_only: bool = False) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Find the food item nearest to (x, y).
+
+        Args:
+            x (float): Query X position.
+            y (float): Query Y position.
+            claimant (str, optional): With `unclaimed_only`, items claimed by this
+                claimant still count as available.
+            unclaimed_only (bool): Skip items claimed by anyone else.
+
+        Returns:
+            Tuple: (food item, distance), or (None, inf) if nothing matched.
+        """
+        if not unclaimed_only or not self.claims:
+            return self.index.nearest(x, y)
+        claims = self.claims
+        return self.index.nearest(
+            x, y, predicate=lambda food: claims.get(food['id'], claimant) == claimant)
+
+    def claim_nearest(self, x: float, y: float, claimant: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Claim the nearest food item not reserved by another claimant.
+
+        Returns:
+            Tuple: (food item, distance), or (None, inf) if no food is available.
+        """
+        food, distance = self.nearest(x, y, claimant=claimant, unclaimed_only=True)
+        if food is None:
+            self.release(claimant)
+        else:
+            self.claim(food['id'], claimant)
+        return food, distance
@@ -0,0 +1,76 @@
+import time
+from collections import Counter
+from typing import Dict, Any, Optional, Callable
+
+from .loop import Simulation
+from .population import ACTION_DEAD
+
+
+def population_summary(environment) -> Dict[str, Any]:
+    """
+    Summarize the population and world for reports.
+
+    Returns:
+        dict: Creature count, mean needs of the living, action histogram and
+        food count.
+    """
+    population = environment.population
+    count = population.count
+    alive = population.action[:count] != ACTION_DEAD
+    summary: Dict[str, Any] = {
+        "tick": environment.tick,
+        "creatures": count,
+        "alive": int(alive.sum()),
+        "food": len(environment.food),
+    }
+    for column in ("health", "hunger", "energy", "stress", "age"):
+        values = getattr(population, column)[:count][alive]
+        summary[f"mean_{column}"] = float(values.mean()) if values.size else 0.0
+    summary["actions"] = dict(Counter(b.current_action for b in population.members()))
+    return summary
+
+
+def fast_forward(simulation: Simulation, steps: int,
+                 report_every: int = 0,
+                 report: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Advance a simulation `steps` fixed steps as fast as the CPU allows.
+
+    No server is involved and nothing sleeps; each step is the same
+    `Simulation.step` the realtime loop runs, at the simulation's fixed `dt`.
+
+    Args:
+        simulation (Simulation): The simulation to advance.
+        steps (int): Number of steps to run.
+        report_every (int): Call `report` every this many steps (0 disables).
+        report (Callable, optional): Receives a progress dict with throughput so
+            far and a `population_summary`.
+
+    Returns:
+        dict: Steps run, simulated and wall seconds, throughput (steps/s,
+        creature steps/s, simulated seconds per wall second) and the final
+        `population_summary`.
+    """
+    dt = simulation.timestep.dt
+    environment = simulation.environment
+    creature_steps = 0
+    start = time.perf_counter()
+
+    def progress(done: int) -> Dict[str, Any]:
+        wall = time.perf_counter() - start
+        return {
+            "steps": done,
+            "sim_seconds": done * dt,
+            "wall_seconds": wall,
+            "steps_per_second": done / wall if wall > 0 else 0.0,
+            "creature_steps_per_second": creature_steps / wall if wall > 0 else 0.0,
+            "speedup": done * dt / wall if wall > 0 else 0.0,
+            "population": population_summary(environment),
+        }
+
+    for done in range(1, steps + 1):
+        creature_steps += environment.population.count
+        simulation.step(dt)
+        if report is not None and report_every and done % report_every == 0 and done < steps:
+            report(progress(done))
+    return progress(steps)
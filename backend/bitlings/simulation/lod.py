@@ -0,0 +1,166 @@
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .population import ACTION_DEAD
+
+# Level-of-detail tiers, from the most to the least detailed
+TIERS = ("full", "near", "far")
+# World units beyond a watched region that still count as near
+DEFAULT_NEAR_DISTANCE = 300.0
+# Ticks between two updates of a near and of a far creature
+DEFAULT_NEAR_INTERVAL = 3
+DEFAULT_FAR_INTERVAL = 10
+# Actions that move the creature, run in fine substeps during a coarse update
+MOVING_ACTIONS = ("wandering", "seeking_food")
+
+Region = Tuple[float, float, float, float]
+
+
+class LevelOfDetail:
+    """
+    Simulates creatures in less detail the further they are from what clients watch.
+
+    Each tick every creature is put in a tier by its position relative to the
+    watched regions (client viewports plus the margin they are sent, see
+    `NetworkServer.observed_regions`):
+      - full: inside a region; decided and moved every tick.
+      - near: within `near_distance` of a region; decided and moved every
+        `near_interval` ticks, one coarse update covering the time since its
+        last one.
+      - far: anywhere else; updated the same way every `far_interval` ticks.
+    A coarse update runs a moving creature (wandering, seeking food) in
+    substeps no longer than the fine tick, so it steers, avoids obstacles and
+    reaches food as it would in full detail; any other action advances its
+    timers by the whole elapsed time in one step. Perception and inference
+    for a near or far creature drop to one tick in `near_interval` or
+    `far_interval`. Updates are staggered by row so each tick runs an even
+    share of them. Passive needs are still advanced for everyone every tick
+    by the simulation loop.
+
+    Until `set_regions` is called everything is full detail, as if the whole
+    world were watched; an empty list of regions makes everyone far.
+    """
+
+    def __init__(self, environment, near_distance: float = DEFAULT_NEAR_DISTANCE,
+                 near_interval: int = DEFAULT_NEAR_INTERVAL, far_interval: int = DEFAULT_FAR_INTERVAL):
+        """
+        Args:
+            environment (Environment): The world to simulate.
+            near_distance (float): Reach of the near tier beyond a watched region.
+            near_interval (int): Ticks between updates of a near creature.
+            far_interval (int): Ticks between updates of a far creature.
+        """
+        self.environment = environment
+        self.near_distance = near_distance
+        self.intervals = {"full": 1, "near": max(1, near_interval), "far": max(1, far_interval)}
+        self.regions: Optional[List[Region]] = None
+        # Simulated time each creature was last updated at
+        self.updated_at: Dict[Any, float] = {}
+        # Creatures updating this tick, per tier, in row order
+        self.batches: Dict[str, List[Any]] = {tier: [] for tier in TIERS}
+        # Last tick's creatures per tier and seconds spent deciding and moving them
+        self.counts = {tier: 0 for tier in TIERS}
+        self.seconds = {tier: 0.0 for tier in TIERS}
+        # Population rows decided this tick, all tiers together
+        self.last_decided_rows = np.zeros(0, dtype=np.intp)
+
+    def set_regions(self, regions: Optional[Sequence[Region]]):
+        """
+        Args:
+            regions: (min_x, min_y, max_x, max_y) of every watched region, or
+                None when the whole world is watched.
+        """
+        self.regions = None if regions is None else list(regions)
+
+    def classify(self) -> np.ndarray:
+        """Return the tier index (into TIERS) of every population row."""
+        population = self.environment.population
+        count = population.count
+        if self.regions is None:
+            return np.zeros(count, dtype=np.int8)
+        x, y = population.x[:count], population.y[:count]
+        full = np.zeros(count, dtype=bool)
+        near = np.zeros(count, dtype=bool)
+        reach = self.near_distance
+        for min_x, min_y, max_x, max_y in self.regions:
+            full |= (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+            near |= ((x >= min_x - reach) & (x <= max_x + reach)
+                     & (y >= min_y - reach) & (y <= max_y + reach))
+        tiers = np.full(count, 2, dtype=np.int8)
+        tiers[near] = 1
+        tiers[full] = 0
+        return tiers
+
+    def choose_actions(self):
+        """
+        Pick this tick's creatures per tier and decide for them, one batch per tier.
+
+        Has the decider interface, so the simulation loop calls it in place of
+        `Environment.choose_actions`.
+        """
+        environment = self.environment
+        population = environment.population
+        count = population.count
+        tiers = self.classify()
+        living = population.action[:count] != ACTION_DEAD
+        rows = np.arange(count)
+        views = population.views
+        decided = []
+        for index, tier in enumerate(TIERS):
+            members = tiers == index
+            self.counts[tier] = int(np.count_nonzero(members & living))
+            due = members & living & ((rows + environment.tick) % self.intervals[tier] == 0)
+            self.batches[tier] = [views[row] for row in np.flatnonzero(due).tolist()]
+            self.seconds[tier] = 0.0
+            if self.batches[tier]:
+                start = time.perf_counter()
+                environment.choose_actions(self.batches[tier])
+                self.seconds[tier] += time.perf_counter() - start
+                decided.append(environment.last_decided_rows)
+        self.last_decided_rows = np.concatenate(decided) if decided else np.zeros(0, dtype=np.intp)
+        if len(self.updated_at) > 2 * count + 64:
+            # Forget creatures that died or left the population
+            self.updated_at = {creature: self.updated_at[creature]
+                               for creature in views if creature in self.updated_at}
+
+    def execute_actions(self, time_delta: float):
+        """
+        Move this tick's creatures, each by the time since its last update.
+
+        Args:
+            time_delta (float): This tick's length, and the longest substep of
+                a moving creature. A creature updated for the first time moves
+                by its tier's interval of ticks.
+        """
+        now = self.environment.time
+        updated_at = self.updated_at
+        for tier in TIERS:
+            batch = self.batches[tier]
+            if not batch:
+                continue
+            start = time.perf_counter()
+            first = now - self.intervals[tier] * time_delta
+            for creature in batch:
+                elapsed = now - updated_at.get(creature, first)
+                # Fine substeps while moving; the rounding slack keeps k ticks from becoming k + 1 steps
+                while elapsed > time_delta * (1 + 1e-6) and creature.current_action in MOVING_ACTIONS:
+                    creature.execute_action(time_delta)
+                    elapsed -= time_delta
+                creature.execute_action(elapsed)
+                updated_at[creature] = now
+            self.seconds[tier] += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Creatures per tier, creatures updated per tier and seconds
+            spent per tier, all for the last tick.
+        """
+        return {"tiers": dict(self.counts),
+                "updated": {tier: len(batch) for tier, batch in self.batches.items()},
+                "seconds": dict(self.seconds)}
+
+    def close(self):
+        pass
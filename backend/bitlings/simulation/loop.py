@@ -3,10 +3,16 @@ import asyncio
 import time
 import json
 import logging
-from typing import Set, Any
+from typing import Set, Any, Optional
 import websockets  # To handle potential connection errors
 
 from .environment import Environment
+from .scheduler import (FixedTimestep, RateTimer, DEFAULT_SIM_HZ, DEFAULT_BROADCAST_HZ,
+                        DEFAULT_MAX_SUBSTEPS)
+from .metrics import SimulationMetrics
+from .checkpoint import Checkpointer
+from .traces import EligibilityTraces
+from .lod import LevelOfDetail, TIERS
 
 logger = logging.getLogger(__name__)
 
@@ -14,37 +20,179 @@ logger = logging.getLogger(__name__)
 class Simulation:
     """Runs the main simulation loop and processes user actions."""
 
-    def __init__(self, environment: Environment, action_queue: asyncio.Queue, network_server):
+    def __init__(self, environment: Environment, action_queue: Optional[asyncio.Queue] = None,
+                 network_server=None,
+                 sim_hz: float = DEFAULT_SIM_HZ, broadcast_hz: float = DEFAULT_BROADCAST_HZ,
+                 max_substeps: int = DEFAULT_MAX_SUBSTEPS,
+                 metrics: Optional[SimulationMetrics] = None,
+                 checkpointer: Optional[Checkpointer] = None,
+                 decider=None, traces: Optional[EligibilityTraces] = None,
+                 lod: Optional[LevelOfDetail] = None):
+        """
+        Args:
+            environment (Environment): The world to simulate.
+            action_queue (asyncio.Queue, optional): User actions from the network
+                server. Not needed when only `step` is used (headless runs).
+            network_server (optional): Receives `broadcast_state` calls from `run`.
+            sim_hz (float): Fixed simulation steps per second.
+            broadcast_hz (float): World broadcasts per second.
+            max_substeps (int): Most steps run to catch up after a stall.
+            metrics (SimulationMetrics, optional): Receives per-phase timings,
+                counters and gauges. None disables instrumentation.
+            checkpointer (Checkpointer, optional): Takes periodic snapshots
+                between ticks and writes them in the background.
+            decider (optional): Runs the decision phase through its
+                `choose_actions()`, e.g. a `ShardedEngine`, and reports the
+                rows it decided in `last_decided_rows`. Defaults to the
+                environment's own serial `choose_actions`.
+            traces (EligibilityTraces, optional): Replaces the immediate rule
+                with delayed learning from stress drops. None keeps the
+                immediate rule.
+            lod (LevelOfDetail, optional): Updates creatures away from every
+                client viewport less often; it runs both the decision and the
+                execute phase, so it replaces `decider`. None disables it.
+
+        Raises:
+            ValueError: If both `decider` and `lod` are given.
+        """
+        if decider is not None and lod is not None:
+            raise ValueError("lod runs the decision phase itself; pass either decider or lod")
         self.environment = environment
         self.action_queue = action_queue
         self.network_server = network_server
-        self.last_tick_time = time.monotonic()
+        self.timestep = FixedTimestep(sim_hz, max_substeps)
+        self.broadcast_timer = RateTimer(broadcast_hz)
+        self.metrics = metrics
+        self.checkpointer = checkpointer
+        self.lod = lod
+        self.decider = lod or decider or environment
+        self.traces = traces
+
+    def step(self, time_delta: float):
+        """Advance the world by one step of `time_delta` seconds."""
+        metrics = self.metrics
+        start = mark = time.perf_counter() if metrics else 0.0
+
+        # 1. Update Environment State
+        self.environment.update(time_delta)
+        if metrics:
+            mark = metrics.lap("environment", mark)
+
+        # 2. Update all Bitlings
+        # Passive needs are advanced for the whole population in one pass
+        self.environment.population.update_passive(time_delta)
+        if metrics:
+            mark = metrics.lap("passive", mark)
+        # Decide what to do, with one batched network pass for everyone
+        self.decider.choose_actions()
+        population = self.environment.population
+        traces = self.traces
+        if traces is not None:
+            traces.mark(population, time_delta, self.decider.last_decided_rows)
+            stress_before = population.stress[:population.count].copy()
+        if metrics:
+            mark = metrics.lap("decide", mark)
+        # Do it; learning from finished actions is applied in one batch at the end
+        self.environment.begin_learning_batch()
+        if self.lod is not None:
+            self.lod.execute_actions(time_delta)
+        else:
+            for bitling in self.environment.bitlings:
+                bitling.execute_action(time_delta)
+        if traces is None:
+            self.environment.apply_learning_batch()
+        else:
+            # The traces reward the same stress drops; applying both would count each twice
+            self.environment.discard_learning_batch()
+            traces.reward(population, stress_before)
+        if metrics:
+            mark = metrics.lap("execute", mark)
+            metrics.end_step(mark - start, time_delta)
+            if self.lod is not None:
+                for tier in TIERS:
+                    metrics.observe(f"tier_{tier}", self.lod.seconds[tier])
 
-    async def run(self, tick_interval: float):
-        """The main simulation loop."""
-        logger.info("Simulation loop started.")
+    async def run(self):
+        """
+        The main simulation loop.
+
+        Steps the world at the fixed `sim_hz` rate, catching up with up to
+        `max_substeps` steps after a slow pass, and broadcasts at `broadcast_hz`
+        independently of the step rate.
+        """
+        logger.info(f"Simulation loop started ({1.0 / self.timestep.dt:g} Hz, "
+                    f"broadcast every {self.broadcast_timer.interval:g} s).")
+        metrics = self.metrics
+        last_time = time.monotonic()
         while True:
             current_time = time.monotonic()
-            time_delta = current_time - self.last_tick_time
-            self.last_tick_time = current_time
+            elapsed = current_time - last_time
+            last_time = current_time
+            mark = time.perf_counter() if metrics else 0.0
 
             # 1. Process user actions
             await self.process_actions()
+            if metrics:
+                metrics.lap("actions", mark)
 
-            # 2. Update Environment State
-            self.environment.update(time_delta)
+            # 2. Run as many fixed steps as the elapsed time allows, in detail
+            # only where clients are looking
+            if self.lod is not None and self.network_server is not None:
+                self.lod.set_regions(self.network_server.observed_regions())
+            dropped = self.timestep.dropped_steps
+            for _ in range(self.timestep.advance(elapsed)):
+                self.step(self.timestep.dt)
+            if self.timestep.dropped_steps > dropped:
+                logger.warning(f"Simulation falling behind; skipped "
+                               f"{self.timestep.dropped_steps - dropped} steps")
+                if metrics:
+                    metrics.count("steps_dropped", self.timestep.dropped_steps - dropped)
 
-            # 3. Update all Bitlings
-            for bitling in self.environment.bitlings:
-                bitling.update_passive(time_delta)
-                bitling.choose_action()  # Decide what to do
-                bitling.execute_action(time_delta)  # Do it
+            # 3. Checkpoint between ticks; only the capture runs on the loop
+            checkpointer = self.checkpointer
+            if checkpointer is not None and checkpointer.due(time.monotonic()):
+                mark = time.perf_counter() if metrics else 0.0
+                started = checkpointer.maybe_checkpoint(self.environment)
+                if metrics:
+                    metrics.lap("checkpoint", mark)
+                    if started is not None:
+                        metrics.count("checkpoints")
+
+            # 4. Broadcast state to connected clients at the broadcast rate
+            now = time.monotonic()
+            if self.broadcast_timer.due(now):
+                mark = time.perf_counter() if metrics else 0.0
+                await self.network_server.broadcast_state(self.environment.get_state(), self.environment)
+                if metrics:
+                    metrics.lap("broadcast", mark)
+                    metrics.count("broadcasts")
+
+            if metrics:
+                self.update_gauges()
 
-            # 4. Broadcast state to connected clients
-            await self.network_server.broadcast_state(self.environment.get_state())
+            # 5. Sleep until the next step or broadcast is due
+            elapsed_since_pass = time.monotonic() - last_time
+            mark = time.perf_counter() if metrics else 0.0
+            await asyncio.sleep(max(0.0, min(
+                self.timestep.time_to_next_step() - elapsed_since_pass,
+                self.broadcast_timer.time_until(time.monotonic()))))
+            if metrics:
+                metrics.lap("sleep", mark)
 
-            # 5. Wait for the next tick
-            await asyncio.sleep(tick_interval)
+    def update_gauges(self):
+        """Refresh the population, queue and client gauges."""
+        metrics = self.metrics
+        metrics.set_gauge("population", self.environment.population.count)
+        if self.lod is not None:
+            for tier, count in self.lod.counts.items():
+                metrics.set_gauge(f"lod_{tier}_creatures", count)
+        if self.action_queue is not None:
+            metrics.set_gauge("action_queue_depth", self.action_queue.qsize())
+        server = self.network_server
+        if server is not None and hasattr(server, "connected_clients"):
+            metrics.set_gauge("connected_clients", len(server.connected_clients))
+            metrics.set_gauge("client_frames_dropped", sum(
+                stats["frames_dropped"] for stats in server.client_stats().values()))
 
     async def process_actions(self):
         """Process all pending user actions from the queue."""
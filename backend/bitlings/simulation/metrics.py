@@ -0,0 +1,164 @@
+import time
+from bisect import bisect_left
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0)
+# Samples kept per phase for the rolling percentiles
+DEFAULT_WINDOW = 1024
+# Loop phases, in the order they run. The environment/passive/decide/execute
+# phases run once per simulation step, checkpoint (the in-loop capture) only
+# when a checkpoint is due, the others once per loop pass
+PHASES = ("actions", "environment", "passive", "decide", "execute", "checkpoint", "broadcast", "sleep")
+# Prefix of every exported Prometheus metric
+PREFIX = "bitlings"
+
+
+class RollingHistogram:
+    """
+    Duration histogram with cumulative buckets and a rolling sample window.
+
+    Bucket counts, count and sum cover everything observed (Prometheus
+    semantics); percentiles are computed over the last `window` samples so they
+    reflect current behaviour.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Args:
+            window (int): Samples kept for percentiles.
+            buckets (Tuple[float]): Sorted bucket upper bounds.
+        """
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)  # Last bucket is +Inf
+        self.samples = np.zeros(max(1, window))
+        self.position = 0
+        self.filled = 0
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        """Record one sample."""
+        self.samples[self.position] = value
+        self.position = (self.position + 1) % len(self.samples)
+        if self.filled < len(self.samples):
+            self.filled += 1
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            dict: Total count and sum, and mean/p50/p95/p99/max over the window.
+        """
+        window = self.samples[:self.filled]
+        if not self.filled:
+            return {"count": 0, "sum": 0.0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        p50, p95, p99 = np.percentile(window, (50, 95, 99))
+        return {"count": self.count, "sum": self.total, "mean": float(window.mean()),
+                "p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(window.max())}
+
+
+class SimulationMetrics:
+    """
+    Instrumentation for the simulation loop.
+
+    Holds a `RollingHistogram` per loop phase, counters for steps, tick
+    overruns (steps that took longer than their timestep) and dropped steps,
+    and gauges set by the loop (population, action queue depth, connected
+    clients). The loop only touches this object when metrics are enabled.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.window = window
+        self.buckets = buckets
+        self.phases: Dict[str, RollingHistogram] = {
+            phase: RollingHistogram(window, buckets) for phase in PHASES}
+        self.step_time = RollingHistogram(window, buckets)
+        self.counters: Dict[str, int] = {"steps": 0, "tick_overruns": 0, "steps_dropped": 0,
+                                         "broadcasts": 0, "checkpoints": 0}
+        self.gauges: Dict[str, float] = {"population": 0, "action_queue_depth": 0,
+                                         "connected_clients": 0, "client_frames_dropped": 0}
+        self.started = time.time()
+
+    def lap(self, phase: str, since: float) -> float:
+        """
+        Record the time from `since` to now against `phase`.
+
+        Returns:
+            float: The current `time.perf_counter()` value, to chain the next lap.
+        """
+        now = time.perf_counter()
+        self.observe(phase, now - since)
+        return now
+
+    def observe(self, phase: str, seconds: float):
+        """
+        Record a duration against `phase`. Phases outside PHASES, such as the
+        level-of-detail tiers, get a histogram on first use.
+        """
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = RollingHistogram(self.window, self.buckets)
+        histogram.observe(seconds)
+
+    def end_step(self, duration: float, timestep: float):
+        """Count a finished simulation step, and an overrun if it exceeded `timestep`."""
+        self.step_time.observe(duration)
+        self.counters["steps"] += 1
+        if duration > timestep:
+            self.counters["tick_overruns"] += 1
+
+    def count(self, counter: str, amount: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set_gauge(self, gauge: str, value: float):
+        self.gauges[gauge] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Phase and step summaries (seconds), counters, gauges and uptime,
+            ready to be sent as JSON.
+        """
+        return {
+            "uptime": time.time() - self.started,
+            "phases": {phase: histogram.summary() for phase, histogram in self.phases.items()},
+            "step": self.step_time.summary(),
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = [f"# HELP {PREFIX}_phase_seconds Duration of simulation loop phases.",
+                 f"# TYPE {PREFIX}_phase_seconds histogram"]
+        for phase, histogram in self.phases.items():
+            lines.extend(_histogram_lines(f"{PREFIX}_phase_seconds", histogram, f'phase="{phase}"'))
+        lines.append(f"# HELP {PREFIX}_step_seconds Duration of whole simulation steps.")
+        lines.append(f"# TYPE {PREFIX}_step_seconds histogram")
+        lines.extend(_histogram_lines(f"{PREFIX}_step_seconds", self.step_time, ""))
+        for counter, value in self.counters.items():
+            lines.append(f"# TYPE {PREFIX}_{counter}_total counter")
+            lines.append(f"{PREFIX}_{counter}_total {value}")
+        for gauge, value in self.gauges.items():
+            lines.append(f"# TYPE {PREFIX}_{gauge} gauge")
+            lines.append(f"{PREFIX}_{gauge} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, histogram: RollingHistogram, labels: str):
+    """Prometheus bucket/sum/count lines for one histogram."""
+    separator = "," if labels else ""
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.bucket_counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+        yield f'{name}_bucket{{{labels}{separator}le="{le}"}} {cumulative}'
+    suffix = f"{{{labels}}}" if labels else ""
+    yield f"{name}_sum{suffix} {histogram.total:.9g}"
+    yield f"{name}_count{suffix} {histogram.count}"
@@ -0,0 +1,145 @@
+import math
+from typing import Dict, Any, Iterable, Tuple
+
+import numpy as np
+
+# Constants for obstacle avoidance: within this distance of an obstacle's
+# surface a creature steers away from it, with AVOIDANCE_STRENGTH at the surface
+AVOIDANCE_DISTANCE_THRESHOLD = 50.0
+AVOIDANCE_STRENGTH = 1.5
+# World units between obstacle field samples
+DEFAULT_FIELD_RESOLUTION = 5.0
+
+
+class ObstacleField:
+    """
+    Static obstacles rasterized into a signed distance field and an avoidance field.
+
+    Samples lie on a grid `resolution` world units apart that covers the world.
+    Each sample holds the signed distance to the nearest obstacle surface
+    (negative inside an obstacle, truncated at `max_distance`) and the
+    avoidance steering at that point: every obstacle whose surface is within
+    AVOIDANCE_DISTANCE_THRESHOLD pushes away from its center with
+    `AVOIDANCE_STRENGTH * (1 - surface distance / threshold)`, and the pushes
+    of neighbouring obstacles add up. This is the negative gradient of a
+    repulsive potential over the obstacles' distance fields.
+
+    Adding or removing an obstacle re-rasterizes only the samples it can
+    reach. `sample` and `avoidance` are O(1) bilinear lookups.
+    """
+
+    def __init__(self, width: float, height: float, resolution: float = DEFAULT_FIELD_RESOLUTION,
+                 max_distance: float = AVOIDANCE_DISTANCE_THRESHOLD):
+        """
+        Args:
+            width, height (float): World size.
+            resolution (float): World units between samples.
+            max_distance (float): Distance the field is truncated at.
+        """
+        self.width = width
+        self.height = height
+        self.resolution = resolution
+        self.max_distance = max_distance
+        self.columns = max(2, int(math.ceil(width / resolution)) + 1)
+        self.rows = max(2, int(math.ceil(height / resolution)) + 1)
+        # Per sample: signed distance, avoidance x, avoidance y
+        self.field = np.zeros((self.rows, self.columns, 3))
+        self.field[..., 0] = max_distance
+        self.obstacles: Dict[Any, Dict[str, Any]] = {}
+        # Samples rasterized so far, to check that updates stay local
+        self.samples_rasterized = 0
+
+    @property
+    def distance(self) -> np.ndarray:
+        return self.field[..., 0]
+
+    def _reach(self, obstacle: Dict[str, Any]) -> float:
+        """Center distance beyond which `obstacle` changes no sample."""
+        return obstacle['radius'] + max(self.max_distance, AVOIDANCE_DISTANCE_THRESHOLD)
+
+    def _box(self, obstacle: Dict[str, Any]) -> Tuple[int, int, int, int]:
+        """Sample index bounds (row_start, row_stop, column_start, column_stop) `obstacle` can reach."""
+        reach = self._reach(obstacle)
+        res = self.resolution
+        return (max(0, int(math.floor((obstacle['y'] - reach) / res))),
+                min(self.rows, int(math.ceil((obstacle['y'] + reach) / res)) + 1),
+                max(0, int(math.floor((obstacle['x'] - reach) / res))),
+                min(self.columns, int(math.ceil((obstacle['x'] + reach) / res)) + 1))
+
+    def _rasterize(self, row_start: int, row_stop: int, column_start: int, column_stop: int):
+        """Recompute the samples in a block from every obstacle that reaches it."""
+        if row_start >= row_stop or column_start >= column_stop:
+            return
+        res = self.resolution
+        distance = np.full((row_stop - row_start, column_stop - column_start), float(self.max_distance))
+        force_x = np.zeros_like(distance)
+        force_y = np.zeros_like(distance)
+        for obstacle in self.obstacles.values():
+            # Only the part of the block within the obstacle's reach changes
+            top, bottom, left, right = self._box(obstacle)
+            top, bottom = max(top, row_start), min(bottom, row_stop)
+            left, right = max(left, column_start), min(right, column_stop)
+            if top >= bottom or left >= right:
+                continue
+            dx = np.arange(left, right)[None, :] * res - obstacle['x']
+            dy = np.arange(top, bottom)[:, None] * res - obstacle['y']
+            center = np.hypot(dx, dy)
+            surface = center - obstacle['radius']
+            block = (slice(top - row_start, bottom - row_start), slice(left - column_start, right - column_start))
+            np.minimum(distance[block], surface, out=distance[block])
+            # Inside the obstacle the push is as strong as at the surface
+            magnitude = AVOIDANCE_STRENGTH * (1.0 - np.maximum(surface, 0.0) / AVOIDANCE_DISTANCE_THRESHOLD)
+            magnitude[surface >= AVOIDANCE_DISTANCE_THRESHOLD] = 0.0
+            # No direction at the exact center
+            scale = np.divide(magnitude, center, out=np.zeros_like(center), where=center > 0)
+            force_x[block] += dx * scale
+            force_y[block] += dy * scale
+        block = self.field[row_start:row_stop, column_start:column_stop]
+        block[..., 0] = distance
+        block[..., 1] = force_x
+        block[..., 2] = force_y
+        self.samples_rasterized += distance.size
+
+    def add(self, obstacle: Dict[str, Any]):
+        """Add an obstacle (a dict with 'id', 'x', 'y' and 'radius')."""
+        self.obstacles[obstacle['id']] = obstacle
+        self._rasterize(*self._box(obstacle))
+
+    def remove(self, obstacle_id) -> bool:
+        """
+        Remove an obstacle.
+
+        Returns:
+            bool: True if the obstacle was in the field.
+        """
+        obstacle = self.obstacles.pop(obstacle_id, None)
+        if obstacle is None:
+            return False
+        self._rasterize(*self._box(obstacle))
+        return True
+
+    def rebuild(self, obstacles: Iterable[Dict[str, Any]]):
+        """Replace every obstacle and rasterize the whole field."""
+        self.obstacles = {obstacle['id']: obstacle for obstacle in obstacles}
+        self._rasterize(0, self.rows, 0, self.columns)
+
+    def sample(self, x: float, y: float) -> Tuple[float, float, float]:
+        """
+        Interpolate the field at (x, y); points outside the world are clamped to it.
+
+        Returns:
+            Tuple: (signed distance to the nearest surface, avoidance x, avoidance y).
+        """
+        gx = min(max(x, 0.0), self.width) / self.resolution
+        gy = min(max(y, 0.0), self.height) / self.resolution
+        column = min(int(gx), self.columns - 2)
+        row = min(int(gy), self.rows - 2)
+        tx, ty = gx - column, gy - row
+        (a, b), (c, d) = self.field[row:row + 2, column:column + 2].tolist()
+        return tuple((a[k] * (1 - tx) + b[k] * tx) * (1 - ty) + (c[k] * (1 - tx) + d[k] * tx) * ty
+                     for k in range(3))
+
+    def avoidance(self, x: float, y: float) -> Tuple[float, float]:
+        """Return the avoidance steering force at (x, y) (see the class docstring)."""
+        _, force_x, force_y = self.sample(x, y)
+        return force_x, force_y
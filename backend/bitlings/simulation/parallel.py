@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from .decision import decide_rows, apply_decisions
+from .population import ACTION_DEAD
+from .sharded import ProcessDecider
+from .wakeups import DecisionScheduler
+
+# Decision phase modes: the environment's own loop, a thread pool, worker
+# processes or only the creatures woken by events
+DECISION_MODES = ("serial", "thread", "process", "scheduled")
+
+
+class ThreadDecider:
+    """
+    Decision phase spread over a thread pool, one contiguous slice of the
+    population per thread.
+
+    Threads read the environment's spatial indexes and population columns
+    directly and write perceptions and choices into private work arrays;
+    `apply_decisions` then starts the actions serially in row order, so a run
+    gives the same results as `Environment.choose_actions`. Network inference
+    releases the GIL inside NumPy, the Python part of perception does not, so
+    this mode helps most when inference dominates.
+    """
+
+    def __init__(self, environment, workers: int):
+        """
+        Args:
+            environment (Environment): The world to decide for.
+            workers (int): Number of threads.
+        """
+        self.environment = environment
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="decide")
+        self.perception = np.zeros((0, 6))
+        self.chosen = np.zeros(0, dtype=np.int64)
+        self.chunk_sizes = [0] * self.workers
+        self.last_decided_rows = np.zeros(0, dtype=np.intp)
+
+    def choose_actions(self):
+        """Decide the next action for every living creature (see `Environment.choose_actions`)."""
+        environment = self.environment
+        population = environment.population
+        count = population.count
+        self.last_decided_rows = np.zeros(0, dtype=np.intp)
+        if count == 0:
+            return
+        if len(self.chosen) < population.capacity:
+            self.perception = np.zeros((population.capacity, 6))
+            self.chosen = np.zeros(population.capacity, dtype=np.int64)
+
+        deciding = np.flatnonzero(population.action[:count] != ACTION_DEAD)
+        chunks = np.array_split(deciding, self.workers)
+        self.chunk_sizes = [len(chunk) for chunk in chunks]
+        stack = population.networks if population.networks.allocated else None
+        futures = [self.executor.submit(decide_rows, chunk, population.x, population.y,
+                                        population.hunger, population.energy, stack,
+                                        environment.nearest_food, environment.nearest_obstacle,
+                                        self.perception, self.chosen)
+                   for chunk in chunks if chunk.size]
+        for future in futures:
+            future.result()
+        apply_decisions(environment, deciding, self.perception, self.chosen)
+        self.last_decided_rows = deciding
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Thread count and creatures per thread in the last tick.
+        """
+        return {"workers": self.workers, "chunk_sizes": list(self.chunk_sizes)}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def make_decider(environment, mode: str = "serial", workers: Optional[int] = None):
+    """
+    Build the decision phase runner for `mode`.
+
+    Args:
+        environment (Environment): The world to decide for.
+        mode (str): One of DECISION_MODES.
+        workers (int, optional): Threads or processes; defaults to the CPU count.
+            Not used by "scheduled", which decides on the calling thread.
+
+    Returns:
+        A decider for `Simulation(decider=...)` with `choose_actions`, `stats`
+        and `close`, or None for "serial" (the environment decides itself).
+
+    Raises:
+        ValueError: If `mode` is unknown.
+    """
+    if mode not in DECISION_MODES:
+        raise ValueError(f"Unknown decision mode {mode!r}; expected one of {DECISION_MODES}")
+    if mode == "serial":
+        return None
+    if mode == "scheduled":
+        return DecisionScheduler(environment)
+    workers = workers or os.cpu_count() or 1
+    if mode == "thread":
+        return ThreadDecider(environment, workers)
+    return ProcessDecider(environment, workers)
@@ -0,0 +1,110 @@
+from typing import Dict, Tuple, List, Any, Callable, Optional
+
+# (distance_to_food, food_dx, food_dy, distance_to_obstacle, obstacle_dx, obstacle_dy)
+Perception = Tuple[float, float, float, float, float, float]
+
+# (x, y) -> (nearest item or None, distance to its center)
+NearestQuery = Callable[[float, float], Tuple[Optional[Dict[str, Any]], float]]
+
+
+def scan(x: float, y: float, nearest_food: NearestQuery, nearest_obstacle: NearestQuery) -> Perception:
+    """
+    Compute what a creature at (x, y) perceives.
+
+    Finds the nearest food and obstacle through the given queries and returns
+    their distances and unit direction vectors; the obstacle distance is
+    measured to its surface. Anything not found is at infinite distance with a
+    zero direction.
+    """
+    # --- Food Perception ---
+    food_dx = 0.0
+    food_dy = 0.0
+    nearest_food_item, actual_distance_food = nearest_food(x, y)
+    if nearest_food_item is not None and actual_distance_food > 0:
+        food_dx = (nearest_food_item['x'] - x) / actual_distance_food
+        food_dy = (nearest_food_item['y'] - y) / actual_distance_food
+    # else: no food, or the creature is on top of food
+
+    # --- Obstacle Perception ---
+    final_distance_to_obstacle_surface = float('inf')
+    final_obstacle_dx_to_center = 0.0
+    final_obstacle_dy_to_center = 0.0
+
+    nearest_obstacle_item, center_distance_to_nearest_obs = nearest_obstacle(x, y)
+    if nearest_obstacle_item is not None:
+        # Calculate distance to the surface of the obstacle
+        final_distance_to_obstacle_surface = max(0, center_distance_to_nearest_obs - nearest_obstacle_item['radius'])
+
+        # Calculate direction vector to the center of the obstacle
+        if center_distance_to_nearest_obs > 0:
+            final_obstacle_dx_to_center = (nearest_obstacle_item['x'] - x) / center_distance_to_nearest_obs
+            final_obstacle_dy_to_center = (nearest_obstacle_item['y'] - y) / center_distance_to_nearest_obs
+        # else: the creature is at the center of the obstacle
+
+    return (actual_distance_food, food_dx, food_dy,
+            final_distance_to_obstacle_surface, final_obstacle_dx_to_center, final_obstacle_dy_to_center)
+
+
+class PerceptionCache:
+    """
+    Per-tick cache of what each creature perceives.
+
+    Entries belong to the current tick and are keyed by creature id. An entry is
+    reused only while the creature stays where it was and the food and obstacle
+    sets are unchanged, so both the decision and the execution phase of a tick
+    can read the same perception without scanning the world twice.
+    """
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.tick = None
+        self.entries: Dict[str, Tuple[Tuple[float, float, int, int], Perception]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def begin_tick(self, tick: int):
+        """Drop every entry from earlier ticks."""
+        if tick != self.tick:
+            self.tick = tick
+            self.entries.clear()
+
+    def _key(self, bitling) -> Tuple[float, float, int, int]:
+        return (bitling.x, bitling.y,
+                self.environment.food_version, self.environment.obstacle_version)
+
+    def get(self, bitling) -> Perception:
+        """
+        Return the creature's perception, scanning the world only on a miss.
+
+        Returns:
+            Perception: See `Bitling.perceive_environment`.
+        """
+        key = self._key(bitling)
+        entry = self.entries.get(bitling.id)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        perception = bitling.scan_environment()
+        self.entries[bitling.id] = (key, perception)
+        return perception
+
+    def store(self, bitling, perception: Perception):
+        """Record a perception computed elsewhere (e.g. by a shard worker) for this tick."""
+        self.entries[bitling.id] = (self._key(bitling), perception)
+
+    def compute_all(self, bitlings: List[Any]) -> List[Perception]:
+        """
+        Fill the cache for many creatures at once, e.g. at the start of a tick.
+
+        Returns:
+            List[Perception]: One perception per creature, in the given order.
+        """
+        return [self.get(bitling) for bitling in bitlings]
+
+    def invalidate(self, bitling=None):
+        """Forget one creature's entry, or every entry if no creature is given."""
+        if bitling is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(bitling.id, None)
@@ -0,0 +1,280 @@
+import numpy as np
+from typing import List, Any, Optional, Tuple
+
+from ..ai.inference import PopulationInference, Allocator, private_zeros
+
+# Action and emoji values are stored as small integer codes so whole-population
+# updates can work on plain NumPy arrays. Unknown names are registered on first use.
+ACTION_NAMES: List[str] = [
+    "idle", "wandering", "seeking_food", "eating", "seeking_sleep", "sleeping", "dead"
+]
+EMOJI_NAMES: List[str] = ["😊", "😫", "😴", "😟", "😃", "💀", "😋", "🤔"]
+
+# Float columns held for every creature, in storage order
+FLOAT_COLUMNS = (
+    "x", "y", "health", "hunger", "energy", "mood", "age", "stress", "action_timer"
+)
+# Integer code columns held for every creature
+CODE_COLUMNS = ("action", "emoji")
+
+
+def _code_for(table: List[str], name: str) -> int:
+    """Return the code for `name` in `table`, registering it if it is new."""
+    try:
+        return table.index(name)
+    except ValueError:
+        table.append(name)
+        return len(table) - 1
+
+
+def action_code(name: str) -> int:
+    """Return the integer code of an action name."""
+    return _code_for(ACTION_NAMES, name)
+
+
+def emoji_code(emoji: str) -> int:
+    """Return the integer code of an emoji."""
+    return _code_for(EMOJI_NAMES, emoji)
+
+
+ACTION_DEAD = action_code("dead")
+EMOJI_NEUTRAL = emoji_code("😊")
+EMOJI_HUNGRY = emoji_code("😫")
+EMOJI_TIRED = emoji_code("😴")
+EMOJI_SAD = emoji_code("😟")
+EMOJI_HAPPY = emoji_code("😃")
+EMOJI_DEAD = emoji_code("💀")
+
+
+class PopulationStore:
+    """
+    Columnar (struct-of-arrays) storage for the state of every creature.
+
+    Row `i` of each column belongs to the creature object in `views[i]`. Rows are
+    kept dense: removing a creature moves the last row into the freed slot and
+    tells the moved creature its new row through its `_row` attribute.
+
+    Creature networks are stacked in `networks`, whose rows are kept aligned
+    with the creature rows. Columns and network tensors are obtained from an
+    allocator, private arrays by default.
+    """
+
+    def __init__(self, capacity: int = 64, allocator: Allocator = private_zeros):
+        """
+        Args:
+            capacity (int): Number of rows to allocate up front. Storage grows
+                automatically when more creatures are added.
+            allocator (Allocator): Provides the storage of every column.
+        """
+        self.capacity = max(1, capacity)
+        self.count = 0
+        self.allocator = allocator
+        for name in FLOAT_COLUMNS:
+            setattr(self, name, allocator(f"creature.{name}", (self.capacity,), float))
+        for name in CODE_COLUMNS:
+            setattr(self, name, allocator(f"creature.{name}", (self.capacity,), np.int16))
+        self.views: List[Any] = []
+        self.networks = PopulationInference(capacity=self.capacity, allocator=allocator)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _columns(self):
+        """Yield every per-creature array held by the store."""
+        for name in FLOAT_COLUMNS + CODE_COLUMNS:
+            yield name, getattr(self, name)
+
+    def _grow(self, min_capacity: int):
+        """Reallocate every column with at least `min_capacity` rows."""
+        new_capacity = max(1, self.capacity)
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+        self._reallocate(new_capacity)
+
+    def _reallocate(self, capacity: int):
+        """Move every column into new storage with `capacity` rows."""
+        for name, column in list(self._columns()):
+            grown = self.allocator(f"creature.{name}", (capacity,), column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def set_allocator(self, allocator: Allocator):
+        """
+        Move every column and network tensor into storage from `allocator`,
+        which is also used for all later growth.
+        """
+        self.allocator = allocator
+        self._reallocate(max(self.capacity, self.count, 1))
+        self.networks.set_allocator(allocator)
+
+    def add(self, view: Any) -> int:
+        """
+        Append a zeroed row owned by `view` and bind the view to it.
+
+        Returns:
+            int: The row index assigned to the view.
+        """
+        if self.count >= self.capacity:
+            self._grow(self.count + 1)
+        row = self.count
+        for _, column in self._columns():
+            column[row] = 0
+        self.views.append(view)
+        self.networks.append()
+        self.count += 1
+        view._store = self
+        view._row = row
+        return row
+
+    def restore(self, columns, views: List[Any]):
+        """
+        Replace the store's contents with whole columns, e.g. loaded from a snapshot.
+
+        The arrays are adopted as they are (memory-mapped arrays stay mapped) and
+        become the store's storage until it next grows. Networks are restored
+        separately through `networks.restore`.
+
+        Args:
+            columns (dict): One array per name in FLOAT_COLUMNS and CODE_COLUMNS,
+                each with one entry per view.
+            views (List): Creature objects to bind to the rows, in row order.
+        """
+        count = len(views)
+        for name in FLOAT_COLUMNS + CODE_COLUMNS:
+            column = columns[name]
+            if column.shape != (count,):
+                raise ValueError(f"Column {name} must have shape {(count,)}, got {column.shape}")
+            dtype = float if name in FLOAT_COLUMNS else np.int16
+            setattr(self, name, column if column.dtype == dtype else column.astype(dtype))
+        self.capacity = count
+        self.count = count
+        self.views = list(views)
+        for row, view in enumerate(self.views):
+            view._store = self
+            view._row = row
+
+    def adopt(self, view: Any) -> int:
+        """
+        Move a creature's row from whichever store currently holds it into this one.
+
+        Returns:
+            int: The row index assigned to the view in this store.
+        """
+        source, source_row = view._store, view._row
+        if source is self:
+            return source_row
+        row = self.add(view)
+        for name, column in self._columns():
+            column[row] = getattr(source, name)[source_row]
+        network = getattr(view, "_network", None)
+        if network is not None:
+            self.networks.attach(row, network)
+        # add() already rebound the view, so the source must not touch it again
+        source._discard(source_row)
+        return row
+
+    def _discard(self, row: int):
+        """Drop `row` by moving the last row into it (swap-remove)."""
+        last = self.count - 1
+        if row != last:
+            for _, column in self._columns():
+                column[row] = column[last]
+            moved = self.views[last]
+            self.views[row] = moved
+            moved._row = row
+        self.views.pop()
+        self.networks._discard(row)
+        self.count -= 1
+
+    def detach(self, row: int) -> Any:
+        """
+        Remove a creature from this store, keeping its state readable.
+
+        The creature's row is copied into a private single-row store so the
+        object stays a valid (but no longer simulated) view.
+
+        Returns:
+            The detached creature object.
+        """
+        view = self.views[row]
+        PopulationStore(capacity=1).adopt(view)
+        return view
+
+    def clear(self):
+        """Detach every creature from the store."""
+        while self.count:
+            self.detach(self.count - 1)
+
+    def members(self) -> List[Any]:
+        """Return the creature objects in row order."""
+        return list(self.views)
+
+    def update_passive(self, time_delta: float, rows: Optional[slice] = None):
+        """
+        Advance needs, mood, health, emoji and stress for a range of rows at once.
+
+        This is the vectorized form of `Bitling.update_passive` and applies the
+        same rules to every selected creature.
+
+        Args:
+            time_delta (float): Elapsed simulated time in seconds.
+            rows (slice, optional): Rows to update. Defaults to the whole population.
+        """
+        sel = slice(0, self.count) if rows is None else rows
+        age = self.age[sel]
+        hunger = self.hunger[sel]
+        energy = self.energy[sel]
+        mood = self.mood[sel]
+        health = self.health[sel]
+
+        age += time_delta
+        np.minimum(hunger + 1.0 * time_delta, 100, out=hunger)
+        np.maximum(energy - 0.5 * time_delta, 0, out=energy)
+
+        # Basic mood/health effects (simple thresholds)
+        hungry = hunger > 80
+        tired = energy < 20
+        mood_loss = 2 * time_delta * (hungry.astype(float) + tired.astype(float))
+        np.maximum(mood - mood_loss, 0, out=mood)
+        starving = hunger >= 100
+        health[starving] = np.maximum(health[starving] - 1 * time_delta, 0)
+
+        # Emoji follows the same priority order as the scalar rules
+        self.emoji[sel] = np.select(
+            [hungry, tired, mood < 30, mood > 70],
+            [EMOJI_HUNGRY, EMOJI_TIRED, EMOJI_SAD, EMOJI_HAPPY],
+            default=EMOJI_NEUTRAL,
+        )
+        dead = health <= 0
+        self.emoji[sel][dead] = EMOJI_DEAD
+        self.action[sel][dead] = ACTION_DEAD
+
+        # Stress from hunger and low energy, capped between 0 and 100
+        stress = (hunger / 100) * 50 + ((100 - energy) / 100) * 50
+        np.clip(stress, 0, 100, out=self.stress[sel])
+
+    def apply_learning(self, events: List[Tuple[Any, int, float]]):
+        """
+        Apply a batch of learning events to the creatures' networks at once.
+
+        Args:
+            events (List[Tuple]): (creature, output index, reward) triples for
+                creatures in this store; see `PopulationInference.apply_learning`.
+        """
+        if not events:
+            return
+        creatures, actions, rewards = zip(*events)
+        self.networks.apply_learning([creature._row for creature in creatures], actions, rewards,
+                                     [creature.network.learning_rate for creature in creatures])
+
+    def remove_dead(self) -> List[Any]:
+        """
+        Detach every creature whose health has reached zero.
+
+        Returns:
+            List: The detached creature objects.
+        """
+        dead_rows = np.flatnonzero(self.health[:self.count] <= 0)
+        # Highest rows first so swap-remove never moves a row we still have to visit
+        return [self.detach(int(row)) for row in dead_rows[::-1]]
@@ -0,0 +1,101 @@
+from typing import Optional
+
+# Default simulation and broadcast rates, in steps/frames per second
+DEFAULT_SIM_HZ = 10.0
+DEFAULT_BROADCAST_HZ = 10.0
+# Most simulation steps run to catch up in one scheduler pass
+DEFAULT_MAX_SUBSTEPS = 5
+# Fraction of a step treated as a whole step, so float rounding of summed
+# frame times (e.g. 0.05 + 0.05 < 0.1) does not postpone a step by a frame
+STEP_EPSILON = 1e-9
+
+
+class FixedTimestep:
+    """
+    Accumulator for running the simulation at a fixed timestep.
+
+    Wall-clock time is added to the accumulator and consumed in whole steps of
+    `dt`, so every step advances the world by the same amount regardless of how
+    long the host took. After a stall, at most `max_substeps` steps run per pass;
+    any time beyond that is discarded (and counted) rather than replayed, so a
+    slow host falls behind real time instead of spiralling.
+    """
+
+    def __init__(self, hz: float = DEFAULT_SIM_HZ, max_substeps: int = DEFAULT_MAX_SUBSTEPS):
+        """
+        Args:
+            hz (float): Simulation steps per second of wall time.
+            max_substeps (int): Step budget for one `advance` call.
+        """
+        if hz <= 0:
+            raise ValueError("hz must be positive")
+        self.dt = 1.0 / hz
+        self.max_substeps = max(1, max_substeps)
+        self.accumulator = 0.0
+        self.steps = 0          # Steps granted so far
+        self.dropped_steps = 0  # Steps skipped because the budget ran out
+
+    def advance(self, elapsed: float) -> int:
+        """
+        Add `elapsed` seconds of wall time.
+
+        Returns:
+            int: How many steps of `dt` to run now.
+        """
+        self.accumulator += max(0.0, elapsed)
+        steps = min(int(self.accumulator / self.dt + STEP_EPSILON), self.max_substeps)
+        self.accumulator -= steps * self.dt
+        behind = int(self.accumulator / self.dt + STEP_EPSILON)
+        if behind:
+            # Over budget: drop the backlog, keep the fractional remainder
+            self.dropped_steps += behind
+            self.accumulator -= behind * self.dt
+        self.accumulator = max(0.0, self.accumulator)
+        self.steps += steps
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """Fraction of a step accumulated but not yet simulated (0 to 1)."""
+        return self.accumulator / self.dt
+
+    def time_to_next_step(self) -> float:
+        """Wall time until the accumulator holds another whole step."""
+        return max(0.0, self.dt - self.accumulator)
+
+
+class RateTimer:
+    """Fires at a fixed rate, independent of how often it is polled."""
+
+    def __init__(self, hz: float):
+        """
+        Args:
+            hz (float): Firings per second.
+        """
+        if hz <= 0:
+            raise ValueError("hz must be positive")
+        self.interval = 1.0 / hz
+        self.next_time: Optional[float] = None
+
+    def due(self, now: float) -> bool:
+        """
+        True if the timer should fire at `now`; schedules the next firing.
+
+        Missed firings are not made up: after a long gap the timer fires once
+        and resumes its cadence from `now`.
+        """
+        if self.next_time is None:
+            self.next_time = now + self.interval
+            return True
+        if now < self.next_time:
+            return False
+        self.next_time += self.interval
+        if self.next_time <= now:
+            self.next_time = now + self.interval
+        return True
+
+    def time_until(self, now: float) -> float:
+        """Wall time until the timer is next due."""
+        if self.next_time is None:
+            return 0.0
+        return max(0.0, self.next_time - now)
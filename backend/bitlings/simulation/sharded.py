@@ -0,0 +1,382 @@
+import logging
+import multiprocessing
+import traceback
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from ..ai.inference import PopulationInference, PARAMETERS, private_zeros
+from .decision import decide_rows, apply_decisions
+from .population import ACTION_DEAD
+from .shared import SharedArena, SharedView
+from .spatial import SpatialHash
+
+# Default region grid: columns x rows, one worker process per region
+DEFAULT_REGIONS = (2, 2)
+# World units around its region within which a region worker indexes food
+DEFAULT_FOOD_MARGIN = 200.0
+# Per-tick work arrays shared with the workers, one row per creature row
+WORK_ARRAYS = {
+    "shard.order": ((), np.int64),       # Creature rows grouped by worker
+    "shard.perception": ((6,), float),   # See perception.Perception
+    "shard.chosen": ((), np.int64),      # Index of the chosen network output
+}
+
+logger = logging.getLogger(__name__)
+
+
+class RegionGrid:
+    """Splits a width x height world into columns x rows rectangular regions."""
+
+    def __init__(self, width: float, height: float, columns: int, rows: int):
+        self.width = width
+        self.height = height
+        self.columns = max(1, int(columns))
+        self.rows = max(1, int(rows))
+
+    def __len__(self) -> int:
+        return self.columns * self.rows
+
+    def assign(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Return the region index of every (x, y) point; out-of-world points are clamped."""
+        column = np.clip((np.asarray(x) * self.columns / self.width).astype(np.int64), 0, self.columns - 1)
+        row = np.clip((np.asarray(y) * self.rows / self.height).astype(np.int64), 0, self.rows - 1)
+        return row * self.columns + column
+
+    def bounds(self, region: int) -> Tuple[float, float, float, float]:
+        """Return (min_x, min_y, max_x, max_y) of `region`."""
+        row, column = divmod(region, self.columns)
+        cell_width, cell_height = self.width / self.columns, self.height / self.rows
+        return (column * cell_width, row * cell_height, (column + 1) * cell_width, (row + 1) * cell_height)
+
+
+def _attach_stack(arrays: Dict[str, np.ndarray], sizes) -> PopulationInference:
+    """A PopulationInference whose tensors are the shared network arrays."""
+    stack = PopulationInference(capacity=1)
+    stack.input_size, stack.hidden_size, stack.output_size = sizes
+    for name in PARAMETERS:
+        setattr(stack, name, arrays[f"network.{name}"])
+    return stack
+
+
+class RegionFood:
+    """
+    Nearest-food lookups for the creatures standing in one region.
+
+    Only the food inside `bounds` (the region widened by a margin) is indexed.
+    Food outside that box is at least as far from a creature in the region as
+    the box's nearest edge, so a closer match from the local index is the
+    nearest food in the world. Other lookups fall back to an index of all the
+    food, built on the first one after each food change, which is what every
+    worker built each time before.
+    """
+
+    def __init__(self, cell_size: float, bounds: Optional[Tuple[float, float, float, float]] = None):
+        """
+        Args:
+            cell_size (float): Cell size of the spatial hashes.
+            bounds (Tuple, optional): (min_x, min_y, max_x, max_y) of the
+                indexed box, infinite on sides open to the world's edge; None
+                indexes all the food.
+        """
+        self.cell_size = cell_size
+        self.bounds = bounds
+        self.local = SpatialHash(cell_size)
+        self.world: Optional[SpatialHash] = None
+        self.x = self.y = np.zeros(0)
+
+    def update(self, x: np.ndarray, y: np.ndarray):
+        """Re-index from the food positions `x`, `y` (copied, so shared arrays can be retired)."""
+        self.x, self.y = np.array(x, dtype=float), np.array(y, dtype=float)
+        self.world = None
+        slots = np.arange(self.x.size)
+        if self.bounds is not None:
+            min_x, min_y, max_x, max_y = self.bounds
+            slots = slots[(self.x >= min_x) & (self.x <= max_x) & (self.y >= min_y) & (self.y <= max_y)]
+        self.local.clear()
+        self._index(self.local, slots)
+
+    def _index(self, index: SpatialHash, slots: np.ndarray):
+        for slot, x, y in zip(slots.tolist(), self.x[slots].tolist(), self.y[slots].tolist()):
+            index.insert(slot, x, y, {'x': x, 'y': y})
+
+    def nearest(self, x: float, y: float):
+        """Same as `SpatialHash.nearest` over all the food, for (x, y) inside the region."""
+        item, distance = self.local.nearest(x, y)
+        if self.bounds is None:
+            return item, distance
+        min_x, min_y, max_x, max_y = self.bounds
+        if distance <= min(x - min_x, max_x - x, y - min_y, max_y - y):
+            return item, distance
+        if self.world is None:
+            self.world = SpatialHash(self.cell_size)
+            self._index(self.world, np.arange(self.x.size))
+        return self.world.nearest(x, y)
+
+
+def _decision_worker(connection, cell_size: float, food_bounds: Optional[Tuple[float, float, float, float]]):
+    """
+    Worker process: perceives and decides for the creature rows it is sent.
+
+    Reads creature columns, network tensors and food positions from shared
+    memory and writes perceptions and chosen actions back to the shared work
+    arrays; nothing but small command messages goes through the pipe. With
+    `food_bounds` (see `RegionFood`) it indexes only the food around its
+    region, so a food change costs each worker its own share of the world.
+    """
+    connection.send(("ready", None))
+    view = SharedView()
+    arrays: Dict[str, np.ndarray] = {}
+    stack = None
+    food = RegionFood(cell_size, food_bounds)
+    food_version = None
+    obstacle_index = SpatialHash(cell_size)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        try:
+            if message["layout"] is not None:
+                arrays = stack = None  # Drop references so retired segments can unmap
+                arrays = view.update(message["layout"])
+                stack = _attach_stack(arrays, message["sizes"]) if message["sizes"] else None
+            if message["obstacles"] is not None:
+                obstacle_index.clear()
+                for obstacle in message["obstacles"]:
+                    obstacle_index.insert(obstacle['id'], obstacle['x'], obstacle['y'], obstacle)
+            if message["food_version"] != food_version:
+                food_version = message["food_version"]
+                count = message["food_count"]
+                food.update(arrays["world.food_x"][:count], arrays["world.food_y"][:count])
+
+            rows = arrays["shard.order"][message["start"]:message["stop"]]
+            rows = rows[arrays["creature.action"][rows] != ACTION_DEAD]
+            decide_rows(rows, arrays["creature.x"], arrays["creature.y"], arrays["creature.hunger"],
+                        arrays["creature.energy"], stack, food.nearest, obstacle_index.nearest,
+                        arrays["shard.perception"], arrays["shard.chosen"])
+            connection.send(("ok", int(rows.size)))
+        except Exception:
+            connection.send(("error", traceback.format_exc()))
+    arrays = stack = None
+    view.close()
+
+
+class ProcessDecider:
+    """
+    Decision phase spread over worker processes, one contiguous slice of the
+    population each.
+
+    The population's columns and network tensors are moved into shared memory
+    (`SharedArena`), so workers read and write them in place and the main
+    process, including the websocket server, keeps using the same arrays
+    without any merge or copy. Food positions are mirrored into shared memory
+    whenever the food set changes; obstacles are sent when they change.
+
+    Workers compute perception and batched network inference (`decide_rows`).
+    Starting the chosen actions (food claims, wander timers) and executing them
+    stay serial in the main process, in row order (`apply_decisions`), so a
+    run gives the same results as `Environment.choose_actions`.
+    """
+
+    def __init__(self, environment, workers: int):
+        """
+        Args:
+            environment (Environment): The world to decide for. Its population
+                storage is moved into shared memory.
+            workers (int): Number of worker processes to start.
+        """
+        self.environment = environment
+        self.arena = SharedArena()
+        environment.population.set_allocator(self.arena.allocate)
+        self.work_capacity = 0
+        self.food_capacity = 0
+        self.food_version = None
+        self.obstacle_version = None
+        self.sent_generation = None
+        self.chunk_sizes = [0] * max(1, workers)
+        self.last_decided_rows = np.zeros(0, dtype=np.intp)
+
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        cell_size = environment.food.index.cell_size
+        for worker in range(max(1, workers)):
+            parent, child = context.Pipe()
+            process = context.Process(target=_decision_worker, args=(child, cell_size, self.food_bounds(worker)),
+                                      name=f"bitlings-decide-{worker}", daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        for connection in self.connections:
+            connection.recv()  # Wait for the workers' imports so the first tick isn't slow
+
+    def _publish(self) -> Dict[str, Any]:
+        """Bring the shared world arrays up to date and build the common message."""
+        environment = self.environment
+        population = environment.population
+        if self.work_capacity < population.capacity:
+            for name, (shape, dtype) in WORK_ARRAYS.items():
+                self.arena.allocate(name, (population.capacity,) + shape, dtype)
+            self.work_capacity = population.capacity
+
+        food = environment.food
+        food_changed = food.version != self.food_version
+        if food_changed:
+            if self.food_capacity < food.capacity:
+                self.arena.allocate("world.food_x", (food.capacity,), float)
+                self.arena.allocate("world.food_y", (food.capacity,), float)
+                self.food_capacity = food.capacity
+            count = len(food)
+            self.arena.arrays["world.food_x"][:count] = food.x[:count]
+            self.arena.arrays["world.food_y"][:count] = food.y[:count]
+            self.food_version = food.version
+
+        obstacles = None
+        if environment.obstacle_version != self.obstacle_version:
+            obstacles = [dict(obstacle) for obstacle in environment.obstacles]
+            self.obstacle_version = environment.obstacle_version
+
+        layout = None
+        if self.arena.generation != self.sent_generation:
+            layout = dict(self.arena.layout)
+            self.sent_generation = self.arena.generation
+        networks = population.networks
+        sizes = ((networks.input_size, networks.hidden_size, networks.output_size)
+                 if networks.allocated else None)
+        return {"layout": layout, "sizes": sizes, "obstacles": obstacles,
+                "food_version": food.version, "food_count": len(food)}
+
+    def choose_actions(self):
+        """
+        Decide the next action for every living creature.
+
+        Drop-in replacement for `Environment.choose_actions`.
+
+        Raises:
+            RuntimeError: If a worker failed.
+        """
+        environment = self.environment
+        population = environment.population
+        count = population.count
+        self.last_decided_rows = np.zeros(0, dtype=np.intp)
+        if count == 0:
+            return
+        message = self._publish()
+
+        order, offsets = self.partition(count)
+        self.arena.arrays["shard.order"][:count] = order
+        self.chunk_sizes = np.diff(offsets).tolist()
+        for worker, connection in enumerate(self.connections):
+            connection.send(dict(message, start=int(offsets[worker]), stop=int(offsets[worker + 1])))
+        errors = []
+        for connection in self.connections:
+            status, detail = connection.recv()
+            if status == "error":
+                errors.append(detail)
+        if errors:
+            raise RuntimeError(f"Decision worker failed:\n{errors[0]}")
+
+        deciding = np.flatnonzero(population.action[:count] != ACTION_DEAD)
+        apply_decisions(environment, deciding, self.arena.arrays["shard.perception"],
+                        self.arena.arrays["shard.chosen"])
+        self.last_decided_rows = deciding
+
+    def food_bounds(self, worker: int) -> Optional[Tuple[float, float, float, float]]:
+        """The box of food `worker` indexes (see `RegionFood`); None for all of it."""
+        return None
+
+    def partition(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Split rows 0..count-1 between the workers.
+
+        Returns:
+            Tuple: (rows in worker order, offsets) where worker `i` handles
+            `rows[offsets[i]:offsets[i + 1]]`.
+        """
+        offsets = np.linspace(0, count, len(self.connections) + 1).astype(np.int64)
+        return np.arange(count), offsets
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Worker count and creatures per worker in the last tick.
+        """
+        return {"workers": len(self.chunk_sizes), "chunk_sizes": list(self.chunk_sizes)}
+
+    def close(self):
+        """Stop the workers and release the shared memory (the population keeps private copies)."""
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+        self.connections, self.processes = [], []
+        self.environment.population.set_allocator(private_zeros)
+        self.arena.close()
+
+
+class ShardedEngine(ProcessDecider):
+    """
+    `ProcessDecider` whose workers each own a rectangular region of the world.
+
+    Each tick creatures are assigned to the region they stand in; a creature
+    that crossed a boundary simply belongs to another worker from then on,
+    since its state never leaves shared memory. Each worker indexes the food
+    within `food_margin` of its region and looks further only for creatures
+    with no food that close.
+    """
+
+    def __init__(self, environment, regions: Tuple[int, int] = DEFAULT_REGIONS,
+                 food_margin: float = DEFAULT_FOOD_MARGIN):
+        """
+        Args:
+            environment (Environment): The world to decide for. Its population
+                storage is moved into shared memory.
+            regions (Tuple[int, int]): Region grid as (columns, rows); one
+                worker process is started per region.
+            food_margin (float): World units around its region within which a
+                worker indexes food.
+        """
+        self.grid = RegionGrid(environment.width, environment.height, *regions)
+        self.food_margin = food_margin
+        self.owner = np.zeros(0, dtype=np.int64)
+        self.migrations = 0
+        super().__init__(environment, workers=len(self.grid))
+        logger.info(f"Sharded engine started with {len(self.grid)} region workers "
+                    f"({self.grid.columns}x{self.grid.rows})")
+
+    def food_bounds(self, worker: int) -> Tuple[float, float, float, float]:
+        """Region `worker` widened by `food_margin`; sides reaching the world's edge are open."""
+        min_x, min_y, max_x, max_y = self.grid.bounds(worker)
+        margin = self.food_margin
+        return (min_x - margin if min_x - margin > 0 else -np.inf,
+                min_y - margin if min_y - margin > 0 else -np.inf,
+                max_x + margin if max_x + margin < self.grid.width else np.inf,
+                max_y + margin if max_y + margin < self.grid.height else np.inf)
+
+    def partition(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Group rows by the region their creature stands in."""
+        population = self.environment.population
+        owner = self.grid.assign(population.x[:count], population.y[:count])
+        if owner.size == self.owner.size:
+            # Rows only shift when creatures are removed, so compare like with like
+            self.migrations += int(np.count_nonzero(owner != self.owner))
+        self.owner = owner
+        order = np.argsort(owner, kind="stable")
+        return order, np.searchsorted(owner[order], np.arange(len(self.grid) + 1))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Worker count, creatures per region in the last tick and the
+            number of region changes seen so far.
+        """
+        return {"workers": len(self.grid), "shard_sizes": list(self.chunk_sizes),
+                "migrations": self.migrations}
@@ -0,0 +1,156 @@
+import os
+import uuid
+import weakref
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Layout entry of one shared array: (segment name, shape, dtype string)
+Segment = Tuple[str, Tuple[int, ...], str]
+# A segment that left the layout and the buffer its arrays were built on
+Retired = Tuple[shared_memory.SharedMemory, weakref.ref]
+
+
+class SharedArena:
+    """
+    Named NumPy arrays backed by `multiprocessing.shared_memory` segments.
+
+    `allocate` has the signature of a storage allocator (see
+    `PopulationStore.set_allocator`), so population columns and network
+    tensors can live here. Every allocation gets a fresh segment; re-allocating
+    a name (when storage grows) retires the old segment: it is unlinked at
+    once and closed by a later allocation once its arrays have been dropped.
+    `layout` describes the current segments so other processes can map the
+    same arrays with `SharedView`, and `generation` changes whenever the
+    layout does.
+    """
+
+    def __init__(self):
+        self.prefix = f"bl-{os.getpid()}-{uuid.uuid4().hex[:6]}"  # Short: macOS caps names at 31 chars
+        self.segments: Dict[str, shared_memory.SharedMemory] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.layout: Dict[str, Segment] = {}
+        self.retired: List[Retired] = []
+        self.generation = 0
+        self._counter = 0
+
+    def allocate(self, name: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """
+        Create a zeroed shared array called `name`, replacing any previous one.
+
+        Returns:
+            np.ndarray: The array, backed by a new shared memory segment.
+        """
+        self.retired = _close_unused(self.retired)
+        dtype = np.dtype(dtype)
+        shape = tuple(int(n) for n in shape)
+        self._counter += 1
+        nbytes = max(1, int(np.prod(shape, dtype=np.int64)) * dtype.itemsize)
+        segment = shared_memory.SharedMemory(name=f"{self.prefix}-{self._counter}", create=True, size=nbytes)
+        array = _array(segment, shape, dtype)
+        array.fill(0)
+        self._retire(name)
+        self.segments[name] = segment
+        self.arrays[name] = array
+        self.layout[name] = (segment.name, shape, dtype.str)
+        self.generation += 1
+        return array
+
+    def _retire(self, name: str):
+        """Unlink the segment currently holding `name`; it is closed once its arrays are dropped."""
+        segment = self.segments.pop(name, None)
+        array = self.arrays.pop(name, None)
+        if segment is not None:
+            segment.unlink()
+            self.retired.append((segment, weakref.ref(array.base)))
+
+    def close(self):
+        """
+        Unlink and close every segment.
+
+        Every array handed out must have been dropped first (move the
+        population to private storage with `set_allocator`).
+
+        Raises:
+            BufferError: If an array over one of the segments is still alive;
+                the segments not closed yet stay in `retired`.
+        """
+        for name in list(self.segments):
+            self._retire(name)
+        self.layout.clear()
+        while self.retired:
+            self.retired[-1][0].close()
+            self.retired.pop()
+
+
+class SharedView:
+    """
+    The arrays of a `SharedArena`, mapped into another process.
+
+    Call `update` with the arena's layout whenever its generation changes;
+    segments that have not changed stay mapped, and segments that left the
+    layout are closed by a later update once their arrays have been dropped.
+    """
+
+    def __init__(self):
+        self.segments: Dict[str, shared_memory.SharedMemory] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.buffers: Dict[str, weakref.ref] = {}  # Segment name -> buffer of its array
+        self.retired: List[Retired] = []
+
+    def update(self, layout: Dict[str, Segment]) -> Dict[str, np.ndarray]:
+        """Map every segment in `layout` that is not mapped yet."""
+        arrays: Dict[str, np.ndarray] = {}
+        segments: Dict[str, shared_memory.SharedMemory] = {}
+        buffers: Dict[str, weakref.ref] = {}
+        for name, (segment_name, shape, dtype) in layout.items():
+            segment = self.segments.get(segment_name)
+            if segment is None:
+                segment = shared_memory.SharedMemory(name=segment_name)
+                arrays[name] = _array(segment, shape, np.dtype(dtype))
+                buffers[segment_name] = weakref.ref(arrays[name].base)
+            else:
+                arrays[name] = self.arrays[name]
+                buffers[segment_name] = self.buffers[segment_name]
+            segments[segment_name] = segment
+        for segment_name, segment in self.segments.items():
+            if segment_name not in segments:
+                self.retired.append((segment, self.buffers[segment_name]))
+        self.arrays, self.segments, self.buffers = arrays, segments, buffers
+        self.retired = _close_unused(self.retired)
+        return arrays
+
+    def close(self):
+        """
+        Close every mapped segment. Every array returned by `update` must have been dropped first.
+
+        Raises:
+            BufferError: If an array over one of the segments is still alive.
+        """
+        retired = self.retired + [(segment, self.buffers[name]) for name, segment in self.segments.items()]
+        self.arrays, self.segments, self.buffers, self.retired = {}, {}, {}, []
+        for segment, _ in retired:
+            segment.close()
+
+
+def _array(segment: shared_memory.SharedMemory, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+    """
+    An array over `segment`. Built with `np.frombuffer`, which keeps the buffer
+    exported for as long as the array (or any view of it) lives, so closing
+    the segment under a live array fails with BufferError. Every view shares
+    the flat buffer array as its `base`, which is what a retired segment waits on.
+    """
+    count = int(np.prod(shape, dtype=np.int64))
+    return np.frombuffer(segment.buf, dtype=dtype, count=count).reshape(shape)
+
+
+def _close_unused(retired: List[Retired]) -> List[Retired]:
+    """Close the retired segments whose arrays have all been dropped; return the others."""
+    in_use = []
+    for segment, buffer in retired:
+        if buffer() is None:
+            segment.close()
+        else:
+            in_use.append((segment, buffer))
+    return in_use
@@ -0,0 +1,275 @@
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from ..ai.inference import PARAMETERS, TRACES
+from ..ai.network import BitlingNetwork
+from ..creature.bitling import Bitling
+from .environment import Environment
+from .population import FLOAT_COLUMNS, CODE_COLUMNS, ACTION_NAMES, EMOJI_NAMES, action_code, emoji_code
+
+# Snapshot layout version. Bump it when the layout changes and keep a loader
+# for every older version in LOADERS so existing snapshots stay loadable.
+SNAPSHOT_VERSION = 2
+MANIFEST = "manifest.json"
+
+# Per-creature attributes that live on the Bitling object rather than in the
+# population store, saved as extra columns: name -> (attribute, kind)
+CREATURE_EXTRAS = {
+    "move_speed": ("move_speed", "float"),
+    "wander_dx": ("wander_target_dx", "float"),
+    "wander_dy": ("wander_target_dy", "float"),
+    "target_food_id": ("target_food_item_id", "string"),
+    "eating_food_id": ("eating_food_id", "string"),
+    "learning_action": ("action_chosen_by_network_for_learning", "action"),
+}
+
+
+class Snapshot:
+    """
+    A consistent, self-contained copy of an Environment's state.
+
+    Holds a JSON-serializable manifest and a set of named NumPy arrays: one
+    column per creature attribute, one contiguous stacked tensor per network
+    parameter (all creatures' weights in a single array), and food columns.
+    Capturing copies every array, so the environment can keep running while the
+    snapshot is written.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.manifest = manifest
+        self.arrays = arrays
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+
+def _strings(values: List[Optional[str]]) -> np.ndarray:
+    """Pack strings (None as empty) into a fixed-width UTF-8 byte array."""
+    encoded = [b"" if value is None else str(value).encode("utf-8") for value in values]
+    width = max([len(value) for value in encoded] + [1])
+    return np.array(encoded, dtype=f"S{width}")
+
+
+def _unstrings(array: np.ndarray) -> List[Optional[str]]:
+    """Inverse of `_strings`; empty entries come back as None."""
+    return [value.decode("utf-8") if value else None for value in array.tolist()]
+
+
+def capture_snapshot(environment: Environment) -> Snapshot:
+    """
+    Copy everything needed to restore `environment` into a Snapshot.
+
+    Cost is a few array copies plus one pass over creatures and food for the
+    attributes kept on Python objects; call it between ticks.
+    """
+    population = environment.population
+    count = population.count
+    views = population.members()
+    arrays: Dict[str, np.ndarray] = {}
+
+    # --- Creatures: store columns, then object attributes ---
+    arrays["creature.id"] = _strings([view.id for view in views])
+    for name in FLOAT_COLUMNS + CODE_COLUMNS:
+        arrays[f"creature.{name}"] = getattr(population, name)[:count].copy()
+    target = [view.target_food_pos for view in views]
+    arrays["creature.target_x"] = np.array([np.nan if t is None else t[0] for t in target], dtype=float)
+    arrays["creature.target_y"] = np.array([np.nan if t is None else t[1] for t in target], dtype=float)
+    for column, (attribute, kind) in CREATURE_EXTRAS.items():
+        values = [getattr(view, attribute) for view in views]
+        if kind == "float":
+            arrays[f"creature.{column}"] = np.array(values, dtype=float)
+        elif kind == "string":
+            arrays[f"creature.{column}"] = _strings(values)
+        else:
+            arrays[f"creature.{column}"] = np.array(
+                [-1 if value is None else action_code(value) for value in values], dtype=np.int16)
+
+    # --- Networks: one contiguous array per stacked parameter ---
+    networks = population.networks
+    sizes = None
+    if networks.allocated:
+        sizes = [networks.input_size, networks.hidden_size, networks.output_size]
+        for name in PARAMETERS:
+            arrays[f"network.{name}"] = np.ascontiguousarray(getattr(networks, name)[:count])
+    arrays["network.learning_rate"] = np.array(
+        [view.network.learning_rate for view in views], dtype=float)
+
+    # --- Food ---
+    food = environment.food
+    items = list(food)
+    food_emojis: List[str] = []
+    arrays["food.id"] = _strings([item["id"] for item in items])
+    arrays["food.x"] = np.array([item["x"] for item in items], dtype=float)
+    arrays["food.y"] = np.array([item["y"] for item in items], dtype=float)
+    emoji_codes = []
+    for item in items:
+        emoji = item.get("emoji", "🍎")
+        if emoji not in food_emojis:
+            food_emojis.append(emoji)
+        emoji_codes.append(food_emojis.index(emoji))
+    arrays["food.emoji"] = np.array(emoji_codes, dtype=np.int16)
+    arrays["food.claimant"] = _strings([food.claimant_of(item["id"]) for item in items])
+
+    manifest = {
+        "format": "bitlings-snapshot",
+        "version": SNAPSHOT_VERSION,
+        "created": time.time(),
+        "width": environment.width,
+        "height": environment.height,
+        "tick": environment.tick,
+        "time": environment.time,
+        "creatures": count,
+        "food": len(items),
+        "network_sizes": sizes,
+        "tables": {"actions": list(ACTION_NAMES), "emojis": list(EMOJI_NAMES), "food_emojis": food_emojis},
+        "obstacles": [dict(obstacle) for obstacle in environment.obstacles],
+        "arrays": sorted(arrays),
+    }
+    return Snapshot(manifest, arrays)
+
+
+def write_snapshot(snapshot: Snapshot, path: str, fsync: bool = False) -> str:
+    """
+    Write a Snapshot to the directory `path` as a manifest plus one .npy file
+    per array.
+
+    Args:
+        snapshot (Snapshot): What to write.
+        path (str): Target directory; created if needed.
+        fsync (bool): Flush every file to disk before returning.
+
+    Returns:
+        str: `path`.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name, array in snapshot.arrays.items():
+        with open(os.path.join(path, f"{name}.npy"), "wb") as f:
+            np.save(f, array, allow_pickle=False)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+    # The manifest goes last: a directory without one is an incomplete snapshot
+    with open(os.path.join(path, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(snapshot.manifest, f, ensure_ascii=False)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    return path
+
+
+def save_snapshot(environment: Environment, path: str) -> str:
+    """Capture `environment` and write it to the directory `path`."""
+    return write_snapshot(capture_snapshot(environment), path)
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Read and check the manifest of the snapshot in `path`."""
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != "bitlings-snapshot":
+        raise ValueError(f"{path} is not a Bitlings snapshot")
+    if manifest.get("version") not in LOADERS:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')} in {path}")
+    return manifest
+
+
+def load_snapshot(path: str, mmap: bool = False) -> Environment:
+    """
+    Rebuild an Environment from the snapshot in `path`.
+
+    Args:
+        path (str): Snapshot directory written by `write_snapshot`.
+        mmap (bool): Memory-map the creature columns and network tensors
+            (copy-on-write) instead of reading them, so loading a large world
+            costs little more than building its Python objects. Pages are read
+            as the simulation touches them.
+
+    Raises:
+        ValueError: If `path` is not a snapshot or its version is unknown.
+    """
+    manifest = read_manifest(path)
+    return LOADERS[manifest["version"]](path, manifest, mmap)
+
+
+def _remap(codes: np.ndarray, saved: List[str], current: List[str], register) -> np.ndarray:
+    """Translate codes from the saved name table to the running one."""
+    if saved == current[:len(saved)]:
+        return codes
+    table = np.array([register(name) for name in saved], dtype=np.int16)
+    return table[codes]
+
+
+def _load_v2(path: str, manifest: Dict[str, Any], mmap: bool) -> Environment:
+    def array(name, mapped=False):
+        return np.load(os.path.join(path, f"{name}.npy"), allow_pickle=False,
+                       mmap_mode="c" if mapped and mmap else None)
+
+    environment = Environment(manifest["width"], manifest["height"],
+                              initial_creatures=0, initial_food=0)
+    environment.tick = manifest["tick"]
+    environment.time = manifest.get("time", 0.0)
+    environment.obstacles = manifest["obstacles"]
+    tables = manifest["tables"]
+
+    # --- Creatures ---
+    ids = _unstrings(array("creature.id"))
+    views = [Bitling.restored(bitling_id, environment) for bitling_id in ids]
+    columns = {name: array(f"creature.{name}", mapped=True) for name in FLOAT_COLUMNS}
+    columns["action"] = _remap(array("creature.action", mapped=True), tables["actions"],
+                               ACTION_NAMES, action_code)
+    columns["emoji"] = _remap(array("creature.emoji", mapped=True), tables["emojis"],
+                              EMOJI_NAMES, emoji_code)
+    population = environment.population
+    population.restore(columns, views)
+
+    target_x, target_y = array("creature.target_x"), array("creature.target_y")
+    extras = {}
+    for column, (attribute, kind) in CREATURE_EXTRAS.items():
+        values = array(f"creature.{column}")
+        if kind == "float":
+            extras[attribute] = values.tolist()
+        elif kind == "string":
+            extras[attribute] = _unstrings(values)
+        else:
+            extras[attribute] = [None if code < 0 else tables["actions"][code] for code in values.tolist()]
+    for i, view in enumerate(views):
+        if not np.isnan(target_x[i]):
+            view.target_food_pos = (float(target_x[i]), float(target_y[i]))
+        for attribute, values in extras.items():
+            setattr(view, attribute, values[i])
+
+    # --- Networks ---
+    learning_rates = array("network.learning_rate").tolist()
+    sizes = manifest["network_sizes"]
+    if sizes is not None:
+        networks = population.networks
+        tensors = {name: array(f"network.{name}", mapped=True) for name in PARAMETERS
+                   if manifest["version"] >= 2 or name not in TRACES}
+        for name in TRACES:
+            # Version 1 predates eligibility traces; start them empty
+            tensors.setdefault(name, np.zeros_like(tensors[name.replace("trace_", "weights_")]))
+        networks.restore(tuple(sizes), tensors, [None] * len(views))
+        for row, view in enumerate(views):
+            view._network = BitlingNetwork.view(networks, row, learning_rates[row])
+
+    # --- Food ---
+    food_ids = _unstrings(array("food.id"))
+    food_x, food_y = array("food.x").tolist(), array("food.y").tolist()
+    food_emojis = tables["food_emojis"]
+    emoji_codes = array("food.emoji").tolist()
+    for i, food_id in enumerate(food_ids):
+        environment.food.add({"id": food_id, "x": food_x[i], "y": food_y[i],
+                              "emoji": food_emojis[emoji_codes[i]]})
+    for food_id, claimant in zip(food_ids, _unstrings(array("food.claimant"))):
+        if claimant is not None:
+            environment.food.claim(food_id, claimant)
+    return environment
+
+
+# Loader for every snapshot version that can still be read
+LOADERS = {1: _load_v2, 2: _load_v2}
@@ -0,0 +1,235 @@
+import math
+from typing import Dict, Tuple, List, Any, Optional, Callable
+
+# Default edge length of a grid cell, in world units
+DEFAULT_CELL_SIZE = 50.0
+
+Cell = Tuple[int, int]
+
+
+class SpatialHash:
+    """
+    Uniform grid spatial index for point entities.
+
+    Items are bucketed by the grid cell containing their position. Nearest and
+    radius queries only visit cells around the query point, searching outward
+    ring by ring, so their cost depends on local density rather than on the total
+    number of items.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        """
+        Args:
+            cell_size (float): Edge length of a grid cell in world units.
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Cell, Dict[Any, Tuple[float, float, Any]]] = {}
+        self.entries: Dict[Any, Tuple[float, float, Cell]] = {}
+        # Grow-only bounds of every cell that has held an item, to stop ring searches
+        self._min_cell: Optional[Cell] = None
+        self._max_cell: Optional[Cell] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self.entries
+
+    def cell_of(self, x: float, y: float) -> Cell:
+        """Return the grid cell containing (x, y)."""
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, key, x: float, y: float, item: Any = None):
+        """
+        Add an item, or move it if `key` is already indexed.
+
+        Args:
+            key: Unique identifier of the item (e.g. its id).
+            x (float): X position.
+            y (float): Y position.
+            item: Payload returned by queries. Defaults to `key`.
+        """
+        if key in self.entries:
+            self.remove(key)
+        cell = self.cell_of(x, y)
+        self.cells.setdefault(cell, {})[key] = (x, y, key if item is None else item)
+        self.entries[key] = (x, y, cell)
+        if self._min_cell is None:
+            self._min_cell = self._max_cell = cell
+        else:
+            self._min_cell = (min(self._min_cell[0], cell[0]), min(self._min_cell[1], cell[1]))
+            self._max_cell = (max(self._max_cell[0], cell[0]), max(self._max_cell[1], cell[1]))
+
+    def remove(self, key) -> bool:
+        """
+        Remove an item.
+
+        Returns:
+            bool: True if the item was indexed.
+        """
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        cell = entry[2]
+        bucket = self.cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self.cells[cell]
+        return True
+
+    def move(self, key, x: float, y: float):
+        """Update the position of an indexed item, keeping its payload."""
+        cell = self.entries[key][2]
+        payload = self.cells[cell][key][2]
+        if self.cell_of(x, y) == cell:
+            self.cells[cell][key] = (x, y, payload)
+            self.entries[key] = (x, y, cell)
+        else:
+            self.insert(key, x, y, payload)
+
+    def clear(self):
+        """Remove every item."""
+        self.cells.clear()
+        self.entries.clear()
+        self._min_cell = self._max_cell = None
+
+    def _ring(self, center: Cell, k: int):
+        """Yield the occupied cells at Chebyshev distance `k` from `center`."""
+        cx, cy = center
+        if k == 0:
+            if center in self.cells:
+                yield center
+            return
+        for dx in range(-k, k + 1):
+            for cell in ((cx + dx, cy - k), (cx + dx, cy + k)):
+                if cell in self.cells:
+                    yield cell
+        for dy in range(-k + 1, k):
+            for cell in ((cx - k, cy + dy), (cx + k, cy + dy)):
+                if cell in self.cells:
+                    yield cell
+
+    def _max_ring(self, center: Cell) -> int:
+        """Largest ring around `center` that can still contain items."""
+        if self._min_cell is None:
+            return -1
+        return max(center[0] - self._min_cell[0], self._max_cell[0] - center[0],
+                   center[1] - self._min_cell[1], self._max_cell[1] - center[1])
+
+    def _edge_distance(self, x: float, y: float, center: Cell) -> float:
+        """Distance from (x, y) to the nearest edge of its own cell."""
+        left = x - center[0] * self.cell_size
+        top = y - center[1] * self.cell_size
+        return max(0.0, min(left, self.cell_size - left, top, self.cell_size - top))
+
+    def nearest(self, x: float, y: float, max_distance: float = float('inf'),
+                predicate: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, float]:
+        """
+        Find the item closest to (x, y).
+
+        Rings of cells are searched outward from the query cell until no unvisited
+        cell can hold anything closer than the best match so far.
+
+        Args:
+            x (float): Query X position.
+            y (float): Query Y position.
+            max_distance (float): Ignore items farther than this.
+            predicate (Callable, optional): Only items for which this returns True
+                are considered.
+
+        Returns:
+            Tuple: (item, distance), or (None, inf) if nothing matched.
+        """
+        best_item, best_dist_sq = None, float('inf')
+        limit_sq = max_distance * max_distance
+        center = self.cell_of(x, y)
+        edge = self._edge_distance(x, y, center)
+        max_ring = self._max_ring(center)
+
+        k = 0
+        while k <= max_ring:
+            # Everything outside rings 0..k-1 is at least this far away
+            lower_bound = max(0.0, (k - 1) * self.cell_size + edge) if k else 0.0
+            if lower_bound * lower_bound > min(best_dist_sq, limit_sq):
+                break
+            if 8 * k > len(self.cells):
+                # The ring is larger than the occupied set: visit the rest directly
+                cells = [cell for cell in self.cells
+                         if max(abs(cell[0] - center[0]), abs(cell[1] - center[1])) >= k]
+                k = max_ring
+            else:
+                cells = self._ring(center, k)
+            for cell in cells:
+                for item_x, item_y, item in self.cells[cell].values():
+                    dist_sq = (item_x - x) ** 2 + (item_y - y) ** 2
+                    if dist_sq < best_dist_sq and dist_sq <= limit_sq:
+                        if predicate is None or predicate(item):
+                            best_item, best_dist_sq = item, dist_sq
+            k += 1
+
+        if best_item is None:
+            return None, float('inf')
+        return best_item, math.sqrt(best_dist_sq)
+
+    def query_radius(self, x: float, y: float, radius: float) -> List[Tuple[Any, float]]:
+        """
+        Return every item within `radius` of (x, y).
+
+        Returns:
+            List[Tuple]: (item, distance) pairs, nearest first.
+        """
+        center = self.cell_of(x, y)
+        reach = self._max_ring(center)
+        if not math.isinf(radius):
+            reach = min(int(math.ceil(radius / self.cell_size)), reach)
+        radius_sq = radius * radius
+        if (2 * reach + 1) ** 2 > len(self.cells):
+            # Fewer occupied cells than cells in range: filter the occupied set
+            rings = [[cell for cell in self.cells
+                      if max(abs(cell[0] - center[0]), abs(cell[1] - center[1])) <= reach]]
+        else:
+            rings = (self._ring(center, k) for k in range(reach + 1))
+        found = []
+        for ring in rings:
+            for cell in ring:
+                for item_x, item_y, item in self.cells[cell].values():
+                    dist_sq = (item_x - x) ** 2 + (item_y - y) ** 2
+                    if dist_sq <= radius_sq:
+                        found.append((item, math.sqrt(dist_sq)))
+        found.sort(key=lambda pair: pair[1])
+        return found
+
+    def query_rect(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List[Any]:
+        """
+        Return every item whose position lies inside the axis-aligned rectangle.
+
+        Only the cells overlapping the rectangle are visited (or the occupied
+        cells, if there are fewer of those), so the cost follows the area queried
+        rather than the number of items indexed.
+
+        Returns:
+            List: The matching items, in no particular order.
+        """
+        if min_x > max_x or min_y > max_y or not self.cells:
+            return []
+        low = self.cell_of(min_x, min_y)
+        high = self.cell_of(max_x, max_y)
+        # Clamp to the cells that have ever held items
+        low = (max(low[0], self._min_cell[0]), max(low[1], self._min_cell[1]))
+        high = (min(high[0], self._max_cell[0]), min(high[1], self._max_cell[1]))
+        if low[0] > high[0] or low[1] > high[1]:
+            return []
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) > len(self.cells):
+            cells = [cell for cell in self.cells
+                     if low[0] <= cell[0] <= high[0] and low[1] <= cell[1] <= high[1]]
+        else:
+            cells = [(cx, cy) for cx in range(low[0], high[0] + 1)
+                     for cy in range(low[1], high[1] + 1) if (cx, cy) in self.cells]
+        found = []
+        for cell in cells:
+            for item_x, item_y, item in self.cells[cell].values():
+                if min_x <= item_x <= max_x and min_y <= item_y <= max_y:
+                    found.append(item)
+        return found
@@ -0,0 +1,130 @@
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+
+from .population import ACTION_DEAD
+
+# Seconds for an eligibility trace to fall to half its value
+DEFAULT_HALF_LIFE = 2.0
+# Stress drop (0-100 scale) worth a reward of 1.0. A meal lowers hunger by 50
+# and so stress by 25 (stress is half of hunger), which makes one meal worth
+# one immediate Hebbian update, the update the traces replace
+STRESS_REWARD_SCALE = 25.0
+# Smallest stress drop counted as a reward, so rounding noise is ignored
+MIN_STRESS_DROP = 0.5
+
+
+class EligibilityTraces:
+    """
+    Delayed reinforcement through decaying eligibility traces.
+
+    Every network row carries one trace per weight matrix in its
+    `PopulationInference` stack (`trace_input_hidden`, `trace_hidden_output`),
+    so memory is fixed at the size of the weights and grows, shrinks, shares
+    and snapshots with them. `mark` blends the Hebbian co-activity of the
+    creatures that just decided into their traces, weighted by the time since
+    they last decided, in one vectorized pass: a trace is a time-weighted
+    average of recent activity, the size of a single decision's whatever the
+    tick rate and half-life. `reward` turns drops in stress into a reward and
+    reinforces whatever the traces still hold (decayed to the present), so an
+    action that relieves stress seconds later (walking to food, then eating)
+    is credited too. Neither costs more with a longer half-life: older
+    activity is only ever a smaller share of the same arrays.
+
+    Traces replace the immediate rule: the simulation loop drops the
+    reinforcements of finished actions while traces are on, since those
+    actions' stress drops are rewarded here.
+    """
+
+    def __init__(self, half_life: float = DEFAULT_HALF_LIFE,
+                 reward_scale: float = STRESS_REWARD_SCALE, min_drop: float = MIN_STRESS_DROP):
+        """
+        Args:
+            half_life (float): Seconds for a trace to decay to half; 0 keeps
+                only the current tick's activity.
+            reward_scale (float): Stress drop worth a reward of 1.0.
+            min_drop (float): Smallest stress drop that counts as a reward.
+        """
+        self.half_life = half_life
+        self.reward_scale = reward_scale
+        self.min_drop = min_drop
+        self.rewards = 0
+        # Simulated seconds summed over `mark` calls, and when each creature's
+        # traces were last marked (they are stored as of that moment)
+        self.time = 0.0
+        self.marked_at: Dict[Any, float] = {}
+
+    def decay(self, time_delta):
+        """Return the factor traces keep over `time_delta` seconds (a number or an array)."""
+        if self.half_life <= 0:
+            # Only activity from this very moment is kept
+            factor = np.where(np.asarray(time_delta, dtype=float) > 0, 0.0, 1.0)
+        else:
+            factor = 0.5 ** (np.asarray(time_delta, dtype=float) / self.half_life)
+        return factor if np.ndim(factor) else float(factor)
+
+    def _since_marked(self, population, rows: np.ndarray, default: float) -> np.ndarray:
+        """Seconds since each row's traces were marked; `default` for rows never marked."""
+        views, marked_at, now = population.views, self.marked_at, self.time
+        return np.array([now - marked_at.get(views[row], now - default) for row in rows.tolist()])
+
+    def mark(self, population, time_delta: float, rows: Optional[Sequence[int]] = None):
+        """
+        Record the choices of the creatures that decided this tick.
+
+        Call once per tick after the decision phase, while the networks'
+        activations are the ones the actions were chosen from. A creature that
+        did not decide (busy with an action, or updated less often) keeps its
+        traces untouched until its next decision.
+
+        Args:
+            population (PopulationStore): The population.
+            time_delta (float): Length of the tick.
+            rows (Sequence[int], optional): Rows decided this tick (a decider's
+                `last_decided_rows`). Defaults to every living creature.
+        """
+        self.time += time_delta
+        networks = population.networks
+        count = population.count
+        if count == 0 or not networks.allocated:
+            return
+        if rows is None:
+            rows = np.flatnonzero(population.action[:count] != ACTION_DEAD)
+        rows = np.asarray(rows, dtype=np.intp)
+        if rows.size == 0:
+            return
+        # A first mark has nothing to average with and takes the activity as is
+        decay = self.decay(self._since_marked(population, rows, np.inf))
+        networks.update_traces(rows, networks.chosen_actions(rows), decay)
+        views = population.views
+        for row in rows.tolist():
+            self.marked_at[views[row]] = self.time
+        if len(self.marked_at) > 2 * count + 64:
+            # Forget creatures that died or left the population
+            self.marked_at = {view: self.marked_at[view] for view in views if view in self.marked_at}
+
+    def reward(self, population, stress_before: np.ndarray) -> int:
+        """
+        Reinforce the traces of every creature whose stress dropped.
+
+        Args:
+            population (PopulationStore): The population, after the execute phase.
+            stress_before (np.ndarray): The stress column of the first
+                `len(stress_before)` rows before the execute phase.
+
+        Returns:
+            int: Number of creatures rewarded.
+        """
+        networks = population.networks
+        if not networks.allocated:
+            return 0
+        drop = stress_before - population.stress[:len(stress_before)]
+        rows = np.flatnonzero(drop >= self.min_drop)
+        if rows.size == 0:
+            return 0
+        views = population.views
+        learning_rates = [views[row].network.learning_rate for row in rows.tolist()]
+        # Traces are stored as of their last mark; decay them to now
+        decay = self.decay(self._since_marked(population, rows, 0.0))
+        networks.apply_trace_learning(rows, drop[rows] / self.reward_scale * decay, learning_rates)
+        self.rewards += int(rows.size)
+        return int(rows.size)
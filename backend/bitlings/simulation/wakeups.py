@@ -0,0 +1,155 @@
+import heapq
+import itertools
+from typing import Dict, Any, List, Set, Tuple
+
+import numpy as np
+
+from .population import ACTION_DEAD, action_code
+
+ACTION_IDLE = action_code("idle")
+ACTION_WANDERING = action_code("wandering")
+
+# Simulated seconds before a creature that chose to stay idle thinks again
+DEFAULT_IDLE_INTERVAL = 0.5
+# Longest a creature goes without a decision, whatever it is doing; long enough
+# that no timed action (sleep lasts up to 10 s) is cut short
+DEFAULT_MAX_WAIT = 30.0
+# Food appearing within this distance wakes idle and wandering creatures
+DEFAULT_STIMULUS_RADIUS = 150.0
+
+
+class DecisionScheduler:
+    """
+    Decision phase that only runs the creatures that need a decision.
+
+    Instead of re-deciding everyone every tick, each creature is woken when
+      - its action finishes: execute_action drops every finished action
+        (wander or meal over, sleep done, food target lost) back to "idle",
+        which a creature this scheduler left busy can only reach that way
+        (new creatures start idle, so they are decided on their first tick);
+      - its timer expires: a priority queue of wake-up times in simulated
+        seconds (`Environment.time`) wakes creatures that chose to stay idle
+        after `idle_interval`, and everyone after at most `max_wait`;
+      - a stimulus appears: food added within `stimulus_radius` wakes idle
+        and wandering creatures around it.
+    Everyone else keeps doing what they are doing, so eating, sleeping and
+    seeking run to completion instead of being re-chosen every tick. The
+    woken creatures are decided in one batch by `Environment.choose_actions`,
+    in row order.
+
+    Use it through `Simulation(decider=...)`; it has the decider interface
+    (`choose_actions`, `stats`, `close`).
+    """
+
+    def __init__(self, environment, idle_interval: float = DEFAULT_IDLE_INTERVAL,
+                 max_wait: float = DEFAULT_MAX_WAIT, stimulus_radius: float = DEFAULT_STIMULUS_RADIUS):
+        """
+        Args:
+            environment (Environment): The world to decide for.
+            idle_interval (float): Seconds an idle creature waits before deciding again.
+            max_wait (float): Most seconds between two decisions of a creature.
+            stimulus_radius (float): Distance within which new food wakes creatures.
+        """
+        self.environment = environment
+        self.idle_interval = idle_interval
+        self.max_wait = max_wait
+        self.stimulus_radius = stimulus_radius
+        # (wake time, tie breaker, creature); entries superseded in `wake_at` are skipped
+        self.queue: List[Tuple[float, int, Any]] = []
+        self._sequence = itertools.count()
+        self.wake_at: Dict[Any, float] = {}
+        # Creatures the last decision left idle; any other idle creature has finished an action
+        self.resting: Set[Any] = set()
+        # Food present at the last check; only food added after it is a stimulus
+        self.food_ids: Set[str] = set(environment.food.slots)
+        self.food_version = environment.food.version
+        # Decisions made, in total and by what woke the creature, plus the last tick's count
+        self.decisions = 0
+        self.woken = {"finished": 0, "timer": 0, "stimulus": 0}
+        self.last_decided = 0
+        self.last_decided_rows = np.zeros(0, dtype=np.intp)
+
+    def schedule(self, creature, wake_time: float):
+        """Wake `creature` at `wake_time` (simulated seconds), replacing any earlier wake-up."""
+        self.wake_at[creature] = wake_time
+        heapq.heappush(self.queue, (wake_time, next(self._sequence), creature))
+
+    def choose_actions(self):
+        """Decide for the creatures that are due this tick (see the class docstring)."""
+        environment = self.environment
+        population = environment.population
+        now = environment.time
+        due: Dict[Any, str] = {}
+
+        count = population.count
+        if count:
+            views = population.views
+            for row in np.flatnonzero(population.action[:count] == ACTION_IDLE).tolist():
+                if views[row] not in self.resting:
+                    due[views[row]] = "finished"
+            for creature in self._stimulated(population):
+                due.setdefault(creature, "stimulus")
+
+        queue, wake_at = self.queue, self.wake_at
+        while queue and queue[0][0] <= now:
+            wake_time, _, creature = heapq.heappop(queue)
+            if wake_at.get(creature) != wake_time:
+                continue  # Rescheduled since
+            del wake_at[creature]
+            if creature._store is population and population.action[creature._row] != ACTION_DEAD:
+                due.setdefault(creature, "timer")
+            else:
+                self.resting.discard(creature)
+
+        self.last_decided = len(due)
+        self.last_decided_rows = np.zeros(0, dtype=np.intp)
+        if not due:
+            return
+        for reason in due.values():
+            self.woken[reason] += 1
+        self.decisions += len(due)
+        deciding = sorted(due, key=lambda creature: creature._row)
+        environment.choose_actions(deciding)
+        self.last_decided_rows = environment.last_decided_rows
+        for creature in deciding:
+            if creature.current_action == "idle":
+                self.resting.add(creature)
+                self.schedule(creature, now + self.idle_interval)
+            else:
+                self.resting.discard(creature)
+                self.schedule(creature, now + self.max_wait)
+
+    def _stimulated(self, population) -> List[Any]:
+        """Return the idle and wandering creatures near food added since the last tick."""
+        food = self.environment.food
+        if food.version == self.food_version:
+            return []
+        self.food_version = food.version
+        current = set(food.slots)
+        added = [food.get(food_id) for food_id in current - self.food_ids]
+        self.food_ids = current
+        if not added:
+            return []
+        count = population.count
+        action = population.action[:count]
+        candidates = np.flatnonzero((action == ACTION_IDLE) | (action == ACTION_WANDERING))
+        if candidates.size == 0:
+            return []
+        x, y = population.x[candidates], population.y[candidates]
+        near = np.zeros(candidates.size, dtype=bool)
+        for item in added:
+            near |= np.hypot(x - item['x'], y - item['y']) <= self.stimulus_radius
+        views = population.views
+        return [views[row] for row in candidates[near].tolist()]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Decisions made in total and in the last tick, what woke the
+            creatures, and the number of queued wake-ups.
+        """
+        return {"decisions": self.decisions, "last_decided": self.last_decided,
+                "woken": dict(self.woken), "queued": len(self.wake_at)}
+
+    def close(self):
+        pass
@@ -0,0 +1,142 @@
+"""
+Run a Bitlings world headless: no websocket server, no sleeping.
+
+Advances an Environment a number of ticks (or simulated seconds) as fast as
+the CPU allows and prints throughput and population statistics.
+
+    python headless.py --seconds 3600 --creatures 200 --food 400 --seed 1
+"""
+import argparse
+import json
+import logging
+import math
+import random
+
+import numpy as np
+
+from bitlings.simulation.environment import Environment
+from bitlings.simulation.loop import Simulation
+from bitlings.simulation.headless import fast_forward
+from bitlings.simulation.scheduler import DEFAULT_SIM_HZ
+from bitlings.simulation.sharded import ShardedEngine
+from bitlings.simulation.parallel import make_decider, DECISION_MODES
+from bitlings.simulation.traces import EligibilityTraces, DEFAULT_HALF_LIFE
+from bitlings.simulation.lod import LevelOfDetail
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    length = parser.add_mutually_exclusive_group(required=True)
+    length.add_argument("--ticks", type=int, help="Number of simulation steps to run")
+    length.add_argument("--seconds", type=float, help="Simulated seconds to run")
+    parser.add_argument("--hz", type=float, default=DEFAULT_SIM_HZ, help="Simulation steps per simulated second")
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=1000)
+    parser.add_argument("--creatures", type=int, default=5)
+    parser.add_argument("--food", type=int, default=10)
+    parser.add_argument("--seed", type=int, help="Seed for reproducible runs")
+    decision = parser.add_mutually_exclusive_group()
+    decision.add_argument("--decide", choices=DECISION_MODES, default="serial",
+                          help="Run the decision phase serially, on threads, on worker processes "
+                               "or only for creatures woken by events")
+    decision.add_argument("--shards", type=_regions, metavar="COLSxROWS",
+                          help="Decide in one worker process per world region, e.g. 2x2")
+    decision.add_argument("--viewport", type=_region, action="append", metavar="X,Y,W,H",
+                          help="Simulate in full detail only inside this rectangle (repeatable); "
+                               "creatures further away are updated less often")
+    parser.add_argument("--workers", type=int, help="Threads or processes for --decide (default: CPU count)")
+    parser.add_argument("--traces", type=float, metavar="HALF_LIFE", nargs="?", const=DEFAULT_HALF_LIFE,
+                        help="Learn from stress drops through eligibility traces instead of on the spot "
+                             f"(half-life in seconds, default {DEFAULT_HALF_LIFE:g})")
+    parser.add_argument("--report-every", type=int, default=0, help="Print progress every N ticks")
+    parser.add_argument("--json", action="store_true", help="Print the final result as JSON")
+    return parser.parse_args(argv)
+
+
+def _regions(value):
+    try:
+        columns, rows = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected COLSxROWS, got {value!r}")
+    if columns < 1 or rows < 1:
+        raise argparse.ArgumentTypeError("region counts must be positive")
+    return columns, rows
+
+
+def _region(value):
+    try:
+        x, y, width, height = (float(part) for part in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected X,Y,W,H, got {value!r}")
+    if width < 0 or height < 0:
+        raise argparse.ArgumentTypeError("viewport size must not be negative")
+    return x, y, x + width, y + height
+
+
+def format_result(result):
+    population = result["population"]
+    lines = [
+        f"ticks {result['steps']}  simulated {result['sim_seconds']:.1f}s  wall {result['wall_seconds']:.2f}s",
+        f"  {result['steps_per_second']:.1f} ticks/s  "
+        f"{result['creature_steps_per_second']:.0f} creature-ticks/s  "
+        f"{result['speedup']:.1f}x realtime",
+        f"  creatures {population['alive']}/{population['creatures']} alive  food {population['food']}  "
+        f"health {population['mean_health']:.1f}  hunger {population['mean_hunger']:.1f}  "
+        f"energy {population['mean_energy']:.1f}  stress {population['mean_stress']:.2f}",
+        f"  actions {population['actions']}",
+    ]
+    decider = result.get("decider")
+    if decider is not None and "shard_sizes" in decider:
+        lines.append(f"  shards {decider['workers']} workers  creatures per region {decider['shard_sizes']}  "
+                     f"migrations {decider['migrations']}")
+    elif decider is not None and "tiers" in decider:
+        seconds = {tier: round(value, 4) for tier, value in decider["seconds"].items()}
+        lines.append(f"  level of detail: creatures {decider['tiers']}  seconds in the last tick {seconds}")
+    elif decider is not None and "woken" in decider:
+        lines.append(f"  decisions {decider['decisions']}  woken by {decider['woken']}")
+    elif decider is not None:
+        lines.append(f"  decision workers {decider['workers']}  creatures per worker {decider['chunk_sizes']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    environment = Environment(width=args.width, height=args.height,
+                              initial_creatures=args.creatures, initial_food=args.food)
+    lod = None
+    if args.viewport:
+        lod = engine = LevelOfDetail(environment)
+        lod.set_regions(args.viewport)
+    elif args.shards:
+        engine = ShardedEngine(environment, args.shards)
+    else:
+        engine = make_decider(environment, args.decide, args.workers)
+    traces = EligibilityTraces(args.traces) if args.traces is not None else None
+    simulation = Simulation(environment, sim_hz=args.hz, decider=None if lod else engine,
+                            traces=traces, lod=lod)
+    steps = args.ticks if args.ticks is not None else math.ceil(args.seconds * args.hz)
+
+    try:
+        result = fast_forward(simulation, steps, args.report_every,
+                              report=lambda progress: print(format_result(progress), flush=True))
+    finally:
+        if engine is not None:
+            engine.close()
+    if engine is not None:
+        result["decider"] = engine.stats()
+    if traces is not None:
+        result["trace_rewards"] = traces.rewards
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(format_result(result))
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
@@ -5,36 +5,97 @@ import websockets
 from bitlings.simulation.environment import Environment
 from bitlings.simulation.loop import Simulation
 from bitlings.network.server import NetworkServer
+from bitlings.network.metrics_http import MetricsHTTPServer
+from bitlings.simulation.metrics import SimulationMetrics
+from bitlings.simulation.checkpoint import Checkpointer, latest_checkpoint
+from bitlings.simulation.snapshot import load_snapshot
+from bitlings.simulation.sharded import ShardedEngine
+from bitlings.simulation.parallel import make_decider
+from bitlings.simulation.traces import EligibilityTraces
+from bitlings.simulation.lod import LevelOfDetail
 
 logging.basicConfig(level=logging.INFO)
 
+# Fixed simulation rate and the (independent) rate world updates are sent at
+SIM_HZ = 10.0
+BROADCAST_HZ = 10.0
+# Loop instrumentation, served over the websocket and as Prometheus text
+METRICS_ENABLED = True
+METRICS_PORT = 9100
+# Periodic background checkpoints; the newest one is resumed on startup
+CHECKPOINT_DIR = "checkpoints"
+CHECKPOINT_INTERVAL = 60.0
+CHECKPOINT_KEEP = 3
+# Decision phase: "serial", "thread" or "process", with DECISION_WORKERS workers
+# (None: one per CPU), or "scheduled" to decide only when an action finishes,
+# a timer expires or food appears nearby. SHARD_REGIONS = (columns, rows)
+# instead runs one process per world region.
+DECISION_MODE = "serial"
+DECISION_WORKERS = None
+SHARD_REGIONS = None
+# Delayed learning from stress drops through eligibility traces; None disables,
+# otherwise the trace half-life in seconds
+TRACE_HALF_LIFE = None
+# Simulate creatures away from every client viewport in less detail; runs the
+# decision phase itself, so DECISION_MODE and SHARD_REGIONS are then ignored
+LEVEL_OF_DETAIL = False
+
 
 async def main():
-    # 1. Create the environment
-    environment = Environment(width=1000, height=1000)
+    # 1. Create the environment, resuming from the newest checkpoint if any
+    checkpointer = Checkpointer(CHECKPOINT_DIR, CHECKPOINT_INTERVAL, CHECKPOINT_KEEP)
+    resume = latest_checkpoint(CHECKPOINT_DIR)
+    if resume is not None:
+        environment = load_snapshot(resume, mmap=True)
+        logging.info(f"Resumed from {resume} at tick {environment.tick}")
+    else:
+        environment = Environment(width=1000, height=1000)
 
     # 2. Create the action queue
     action_queue = asyncio.Queue()
 
     # 3. Create the network server
-    network_server = NetworkServer(action_queue)
+    metrics = SimulationMetrics() if METRICS_ENABLED else None
+    network_server = NetworkServer(action_queue, metrics=metrics)
 
     # 4. Create the simulation
-    simulation = Simulation(environment, action_queue, network_server)
+    lod = LevelOfDetail(environment) if LEVEL_OF_DETAIL else None
+    if lod is not None:
+        engine = None
+    elif SHARD_REGIONS:
+        engine = ShardedEngine(environment, SHARD_REGIONS)
+    else:
+        engine = make_decider(environment, DECISION_MODE, DECISION_WORKERS)
+    simulation = Simulation(environment, action_queue, network_server,
+                            sim_hz=SIM_HZ, broadcast_hz=BROADCAST_HZ, metrics=metrics,
+                            checkpointer=checkpointer, decider=engine, lod=lod,
+                            traces=EligibilityTraces(TRACE_HALF_LIFE) if TRACE_HALF_LIFE else None)
 
-    # 5. Start the websocket server
+    # 5. Start the websocket server (and the metrics endpoint)
     ws_server = await websockets.serve(network_server.handler, "0.0.0.0", 8765)
     logging.info("WebSocket server started on ws://0.0.0.0:8765")
+    metrics_server = None
+    if metrics is not None:
+        metrics_server = MetricsHTTPServer(metrics)
+        await metrics_server.start("0.0.0.0", METRICS_PORT)
 
     # 6. Start the simulation loop
-    simulation_task = asyncio.create_task(simulation.run(tick_interval=0.1))
+    simulation_task = asyncio.create_task(simulation.run())
 
     # 7. Run forever
     try:
         await simulation_task
     finally:
+        await network_server.close()
+        if metrics_server is not None:
+            await metrics_server.close()
         ws_server.close()
         await ws_server.wait_closed()
+        # Take a final checkpoint and wait for it (and any running write)
+        checkpointer.checkpoint(environment)
+        checkpointer.close(wait=True)
+        if engine is not None:
+            engine.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
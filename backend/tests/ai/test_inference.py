@@ -0,0 +1,163 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.ai.network import BitlingNetwork
+from backend.bitlings.ai.inference import PopulationInference
+
+
+class TestPopulationInference(unittest.TestCase):
+
+    def setUp(self):
+        """Stack a few independently initialized networks."""
+        np.random.seed(7)
+        self.stack = PopulationInference(capacity=2)
+        self.networks = [BitlingNetwork() for _ in range(6)]
+        for network in self.networks:
+            self.stack.attach(self.stack.append(), network)
+        self.inputs = [
+            (100, 0, 10, 0.6, -0.8),
+            (0, 100, float('inf'), 0.0, 0.0),
+            (50, 75, 1000, 0.1, 0.2),
+            (150, -20, 50, -1.2, 1.2),
+            (80, 20, 5, 1.0, 0.0),
+            (10, 90, 300, 0.0, -1.0),
+        ]
+
+    def test_networks_are_views_over_stack(self):
+        """Stacked tensors hold each network's parameters in its own row."""
+        self.assertGreaterEqual(self.stack.capacity, 6)
+        for row, network in enumerate(self.networks):
+            self.assertIs(network._stack, self.stack)
+            np.testing.assert_array_equal(self.stack.weights_input_hidden[row],
+                                          network.weights_input_hidden)
+
+    def test_batched_path_matches_per_network_path(self):
+        """Batched set-inputs, settle and argmax give the per-network results."""
+        rows = np.arange(len(self.networks))
+        columns = np.array(self.inputs, dtype=float).T
+        self.stack.set_inputs(rows, *columns)
+        batched_inputs = self.stack.input_activations[rows].copy()
+        self.stack.settle(rows)
+        batched_outputs = self.stack.output_activations[rows].copy()
+        batched_actions = self.stack.chosen_actions(rows)
+
+        for row, (network, inputs) in enumerate(zip(self.networks, self.inputs)):
+            network.set_inputs(*inputs)
+            np.testing.assert_allclose(batched_inputs[row], network.input_activations)
+            network.settle()
+            np.testing.assert_allclose(batched_outputs[row], network.output_activations)
+            self.assertEqual(network.output_names[batched_actions[row]],
+                             network.get_chosen_action())
+
+    def test_batched_recurrent_settle_matches_per_network(self):
+        """Recurrent rows iterate to the same fixed point and record per-row statistics."""
+        rows = np.arange(len(self.networks))
+        for network in self.networks[::2]:
+            network.feedback_strength = 0.8
+        columns = np.array(self.inputs, dtype=float).T
+        self.stack.set_inputs(rows, *columns)
+        self.stack.settle(rows, iterations=100, tolerance=1e-10)
+        batched_outputs = self.stack.output_activations[rows].copy()
+        batched_iterations = self.stack.settle_iterations[rows].copy()
+
+        for row, (network, inputs) in enumerate(zip(self.networks, self.inputs)):
+            network.hidden_activations = np.zeros(network.hidden_size)
+            network.output_activations = np.zeros(network.output_size)
+            network.set_inputs(*inputs)
+            network.settle(iterations=100, tolerance=1e-10)
+            np.testing.assert_allclose(batched_outputs[row], network.output_activations, atol=1e-9)
+            self.assertTrue(network.last_settle_converged)
+            self.assertEqual(batched_iterations[row], network.last_settle_iterations)
+
+        stats = self.stack.settle_stats()
+        self.assertEqual(stats["networks"], len(self.networks))
+        self.assertEqual(stats["converged_fraction"], 1.0)
+        self.assertGreater(stats["max_iterations"], 1)
+
+    def test_learning_writes_to_moved_row(self):
+        """After a swap-remove, learning updates land in the network's new row."""
+        moved = self.networks[-1]
+        self.stack._discard(1)
+        self.assertEqual(moved._row, 1)
+
+        moved.input_activations = np.ones(moved.input_size)
+        moved.hidden_activations = np.full(moved.hidden_size, 0.5)
+        before = self.stack.weights_hidden_output[1, :, 0].copy()
+        moved.apply_learning(chosen_action_index=0, was_successful=True)
+        np.testing.assert_allclose(self.stack.weights_hidden_output[1, :, 0],
+                                   before + moved.learning_rate * 0.5)
+
+    def test_batched_learning_matches_per_network_learning(self):
+        """One batched update equals applying each event to its network in turn."""
+        rows = np.arange(len(self.networks))
+        hunger, energy, distance, dx, dy = (np.array(column, dtype=float) for column in zip(*self.inputs))
+        self.stack.set_inputs(rows, hunger, energy, distance, dx, dy)
+        self.stack.settle(rows)
+        self.networks[2].learning_rate = 0.2
+        names = ("weights_input_hidden", "weights_hidden_output")
+        original = {name: getattr(self.stack, name).copy() for name in names}
+
+        # Row 0 learns twice; row 3's event has no reward
+        events = [(0, 1, 1.0), (2, 4, 1.0), (3, 0, 0.0), (5, 2, 1.0), (0, 3, 1.0)]
+        for row, action, reward in events:
+            self.networks[row].apply_learning(action, reward > 0)
+        sequential = {name: getattr(self.stack, name).copy() for name in names}
+
+        for name in names:
+            getattr(self.stack, name)[...] = original[name]
+        event_rows, actions, rewards = zip(*events)
+        self.stack.apply_learning(event_rows, actions, rewards,
+                                  [self.networks[row].learning_rate for row in event_rows])
+        for name in names:
+            np.testing.assert_array_equal(getattr(self.stack, name), sequential[name])
+        np.testing.assert_array_equal(self.stack.weights_input_hidden[3], original["weights_input_hidden"][3])
+
+    def test_traces_without_decay_match_immediate_learning(self):
+        """With no memory, reinforcing the trace is the Hebbian rule for the chosen action."""
+        rows = np.arange(len(self.networks))
+        hunger, energy, distance, dx, dy = (np.array(column, dtype=float) for column in zip(*self.inputs))
+        self.stack.set_inputs(rows, hunger, energy, distance, dx, dy)
+        self.stack.settle(rows)
+        actions = self.stack.chosen_actions(rows)
+        names = ("weights_input_hidden", "weights_hidden_output")
+        original = {name: getattr(self.stack, name).copy() for name in names}
+        rates = [network.learning_rate for network in self.networks]
+        self.stack.apply_learning(rows, actions, np.ones(len(rows)), rates)
+        immediate = {name: getattr(self.stack, name).copy() for name in names}
+
+        for name in names:
+            getattr(self.stack, name)[...] = original[name]
+        self.stack.trace_hidden_output[rows] = 5.0  # Stale activity, forgotten with decay 0
+        self.stack.update_traces(rows, actions, decay=0.0)
+        self.stack.apply_trace_learning(rows, np.ones(len(rows)), rates)
+        for name in names:
+            np.testing.assert_allclose(getattr(self.stack, name), immediate[name])
+
+    def test_traces_decay_and_average(self):
+        """Each update scales the old trace by the decay and adds the rest of the new activity."""
+        row = np.array([0])
+        self.stack.hidden_activations[0] = 0.5
+        self.stack.input_activations[0] = 1.0
+        self.stack.update_traces(row, [2], decay=0.5)
+        self.stack.update_traces(row, [2], decay=0.5)
+        np.testing.assert_allclose(self.stack.trace_hidden_output[0, :, 2], 0.375)
+        np.testing.assert_allclose(self.stack.trace_input_hidden[0], 0.375)
+        self.assertFalse(self.stack.trace_hidden_output[0, :, :2].any())
+        # Steady activity settles at its own value, whatever the decay
+        for _ in range(200):
+            self.stack.update_traces(row, [2], decay=0.97)
+        np.testing.assert_allclose(self.stack.trace_hidden_output[0, :, 2], 0.5, rtol=1e-3)
+
+    def test_rejects_mismatched_sizes(self):
+        """Networks with different layer sizes cannot share a stack."""
+        with self.assertRaises(ValueError):
+            self.stack.attach(self.stack.append(), BitlingNetwork(hidden_size=6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -111,6 +111,24 @@ class TestBitlingNetwork(unittest.TestCase):
         # np.testing.assert_array_almost_equal(self.network.hidden_activations, expected_hidden_activations, decimal=5)
 
 
+    def test_settle_early_exit(self):
+        """Feedforward settling stops after one pass; feedback settling iterates to convergence."""
+        self.network.set_inputs(hunger=80, energy=30, distance_to_food=120, food_dx=0.6, food_dy=0.8)
+        self.network.settle(iterations=10)
+        self.assertEqual(self.network.last_settle_iterations, 1)
+        self.assertTrue(self.network.last_settle_converged)
+        single_pass_output = self.network.output_activations.copy()
+        self.network._feedforward_step()
+        np.testing.assert_array_almost_equal(self.network.output_activations, single_pass_output)
+
+        self.network.feedback_strength = 0.5
+        self.network.settle(iterations=50, tolerance=1e-9)
+        self.assertGreater(self.network.last_settle_iterations, 1)
+        self.assertTrue(self.network.last_settle_converged)
+
+        self.network.settle(iterations=2, tolerance=0.0)
+        self.assertEqual(self.network.last_settle_iterations, 2)
+
     def test_get_chosen_action(self):
         """Test action selection based on output activations."""
         # Output names: ["seeking_food", "eating", "seeking_sleep", "wandering", "idle"]
@@ -163,6 +181,24 @@ class TestBitlingNetwork(unittest.TestCase):
         self.assertEqual(self.network.weights_input_hidden[0, 0], initial_weight_ih_00_before_fail)
         self.assertEqual(self.network.weights_hidden_output[0, chosen_action_index], initial_weight_ho_00_before_fail)
 
+    def test_apply_learning_matches_elementwise_rule(self):
+        """The outer-product update equals the per-weight Hebbian rule, including the activity mask."""
+        self.network.input_activations = np.array([1.0, 0.5, 0.1, 0.2, -0.2])
+        self.network.hidden_activations = np.array([0.5, 0.05, 0.4, 0.7])  # Unit 1 is below the threshold
+        weights_input_hidden = self.network.weights_input_hidden.copy()
+        weights_hidden_output = self.network.weights_hidden_output.copy()
+        rate = self.network.learning_rate
+        for j in range(self.network.hidden_size):
+            weights_hidden_output[j, 2] += rate * self.network.hidden_activations[j]
+            for i in range(self.network.input_size):
+                if self.network.hidden_activations[j] > 0.1:
+                    weights_input_hidden[i, j] += rate * self.network.input_activations[i] * \
+                        self.network.hidden_activations[j]
+
+        self.network.apply_learning(chosen_action_index=2, was_successful=True)
+        np.testing.assert_array_equal(self.network.weights_input_hidden, weights_input_hidden)
+        np.testing.assert_array_equal(self.network.weights_hidden_output, weights_hidden_output)
+
     def test_get_action_probabilities(self):
         """Test softmax probability calculations."""
         self.network.output_activations = np.array([0.1, 0.2, 0.8, 0.3, 0.1])
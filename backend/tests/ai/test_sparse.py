@@ -0,0 +1,119 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.ai.network import BitlingNetwork
+from backend.bitlings.ai.sparse import SparseWeights, Connectivity, SPARSE_BELOW
+from backend.bitlings.ai.topology import DynamicNetwork
+
+
+class TestSparseWeights(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.dense = rng.uniform(-1, 1, (6, 9)) * (rng.random((6, 9)) < 0.3)
+        self.matrix = SparseWeights.from_dense(self.dense)
+
+    def test_round_trip_and_products_match_dense(self):
+        np.testing.assert_array_equal(self.matrix.to_dense(), self.dense)
+        self.assertEqual(self.matrix.nnz, np.count_nonzero(self.dense))
+        x, y = np.arange(6, dtype=float), np.linspace(-1, 1, 9)
+        np.testing.assert_allclose(self.matrix.matvec(x), x @ self.dense)
+        np.testing.assert_allclose(self.matrix.rmatvec(y), self.dense @ y)
+
+    def test_insert_sets_or_creates_connections(self):
+        self.matrix.insert([0, 5, 5], [0, 8, 8], [2.0, 1.0, 3.0])
+        self.dense[0, 0], self.dense[5, 8] = 2.0, 3.0
+        np.testing.assert_array_equal(self.matrix.to_dense(), self.dense)
+        self.assertEqual(self.matrix.get(5, 8), 3.0)
+        self.assertTrue((np.diff(self.matrix._keys) > 0).all())
+        with self.assertRaises(IndexError):
+            self.matrix.insert(6, 0, 1.0)
+
+    def test_prune_and_remove(self):
+        removed = self.matrix.prune(0.5)
+        self.assertEqual(removed, np.count_nonzero((self.dense != 0) & (np.abs(self.dense) < 0.5)))
+        self.dense[np.abs(self.dense) < 0.5] = 0
+        np.testing.assert_array_equal(self.matrix.to_dense(), self.dense)
+        source, target = self.matrix.source[0], self.matrix.target[0]
+        self.assertEqual(self.matrix.remove([source, 0], [target, 0]), 1)
+        self.assertEqual(self.matrix.get(source, target), 0.0)
+
+    def test_grow_keeps_connections_and_costs_nothing(self):
+        nbytes = self.matrix.nbytes
+        self.matrix.grow(rows=100, columns=1000)
+        self.assertEqual(self.matrix.shape, (106, 1009))
+        self.assertEqual(self.matrix.nbytes, nbytes)
+        self.matrix.insert(105, 1008, 4.0)
+        expected = np.zeros((106, 1009))
+        expected[:6, :9] = self.dense
+        expected[105, 1008] = 4.0
+        np.testing.assert_array_equal(self.matrix.to_dense(), expected)
+
+
+class TestConnectivity(unittest.TestCase):
+
+    def test_switches_storage_with_density(self):
+        weights = Connectivity(np.arange(1, 101).reshape(10, 10) / 100)
+        self.assertFalse(weights.is_sparse)
+        self.assertEqual(weights.prune(0.97), 96)
+        self.assertLess(weights.density, SPARSE_BELOW)
+        self.assertTrue(weights.is_sparse)
+        before = weights.to_dense()
+        weights.insert(np.arange(10).repeat(6), np.tile(np.arange(6), 10), 1.0)
+        self.assertFalse(weights.is_sparse)
+        expected = before
+        expected[:, :6] = 1.0
+        np.testing.assert_array_equal(weights.to_dense(), expected)
+
+    def test_learning_leaves_pruned_connections_alone(self):
+        dense = np.ones((4, 3))
+        mask = np.ones((4, 3), dtype=bool)
+        mask[0, 0] = False
+        for weights in (Connectivity(dense, mask), Connectivity(SparseWeights.from_dense(dense, mask))):
+            weights.add_outer(np.ones(4), np.ones(3))
+            self.assertEqual(weights.to_dense()[0, 0], 0.0)
+            self.assertEqual(weights.to_dense()[1, 1], 2.0)
+
+
+class TestDynamicNetwork(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(11)
+        self.network = BitlingNetwork()
+        self.network.feedback_strength = 0.3
+        self.dynamic = DynamicNetwork.from_network(self.network)
+        for network in (self.network, self.dynamic):
+            network.set_inputs(70.0, 30.0, 120.0, 0.6, -0.8)
+
+    def test_matches_bitling_network(self):
+        for network in (self.network, self.dynamic):
+            network.settle()
+            network.apply_learning(2, True)
+            network.settle()
+        np.testing.assert_allclose(self.dynamic.output_activations, self.network.output_activations)
+        np.testing.assert_allclose(self.dynamic.weights_input_hidden.to_dense(),
+                                   self.network.weights_input_hidden)
+        self.assertEqual(self.dynamic.get_chosen_action(), self.network.get_chosen_action())
+
+    def test_growth_and_pruning_follow_connections(self):
+        new = self.dynamic.add_hidden_units(500)
+        self.assertEqual(self.dynamic.hidden_size, 504)
+        self.assertTrue(self.dynamic.weights_input_hidden.is_sparse)
+        self.dynamic.connect("input_hidden", 0, new[0], 0.5)
+        self.dynamic.connect("hidden_output", new[0], 4, 0.5)
+        self.assertEqual(self.dynamic.connections, 20 + 20 + 2)
+        self.assertLess(self.dynamic.nbytes, 2 * 504 * 5 * 8)
+        self.dynamic.settle()
+        self.assertEqual(self.dynamic.hidden_activations.shape, (504,))
+        self.assertGreater(self.dynamic.prune(0.2), 0)
+        with self.assertRaises(ValueError):
+            self.dynamic.connect("input_output", 0, 0, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
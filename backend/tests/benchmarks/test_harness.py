@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.benchmarks.harness import Case, time_case, run_cases, compare, save_results, load_results
+
+
+def _document(**medians):
+    return {"version": 1, "meta": {},
+            "results": {name: {"median_ms": value} for name, value in medians.items()}}
+
+
+class TestHarness(unittest.TestCase):
+
+    def test_time_case_runs_setup_once(self):
+        calls = {"setup": 0, "run": 0}
+
+        def setup():
+            calls["setup"] += 1
+
+            def run():
+                calls["run"] += 1
+            return run
+
+        timing = time_case(Case("counting", setup, repeat=4, number=5))
+        self.assertEqual(calls, {"setup": 1, "run": 1 + 4 * 5})
+        self.assertEqual(timing["samples"], 4)
+        self.assertLessEqual(timing["best_ms"], timing["median_ms"])
+
+    def test_compare_flags_regressions(self):
+        baseline = _document(a=10.0, b=10.0, c=10.0, gone=1.0)
+        current = _document(a=13.0, b=7.0, c=11.0, added=2.0)
+        statuses = {row[0]: row[3] for row in compare(baseline, current, threshold=0.2)}
+        self.assertEqual(statuses, {"a": "regression", "b": "improvement", "c": "ok",
+                                    "gone": "missing", "added": "new"})
+
+    def test_results_round_trip(self):
+        document = run_cases([Case("noop", lambda: (lambda: None), repeat=3)])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            save_results(document, path)
+            self.assertEqual(load_results(path)["results"], document["results"])
+
+
+if __name__ == '__main__':
+    unittest.main()
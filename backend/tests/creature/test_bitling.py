@@ -219,6 +219,13 @@ class TestBitling(unittest.TestCase):
         self.assertAlmostEqual(dx_o, 1.0, msg="Direction dx to obs2 center")   # Direction to obs2 center (10.0/10.0)
         self.assertAlmostEqual(dy_o, 0.0, msg="Direction dy to obs2 center")
 
+    def test_begin_wandering_sets_timer(self):
+        """Choosing to wander sets a wander duration, so the wander lasts past the next tick."""
+        self.bitling.begin_action("wandering", float('inf'))
+        self.assertGreater(self.bitling.action_timer, 0)
+        self.bitling.execute_action(time_delta=0.1)
+        self.assertEqual(self.bitling.current_action, "wandering")
+
     def test_obstacle_avoidance_movement(self):
         """Test that the Bitling attempts to avoid obstacles when moving."""
         self.bitling.x, self.bitling.y = 50, 50
@@ -0,0 +1,61 @@
+import json
+import unittest
+import sys
+import os
+import uuid
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.network import binary
+from backend.bitlings.network.delta import DeltaEncoder
+
+
+def _creature(x, y, **fields):
+    creature = {"id": str(uuid.uuid4()), "x": x, "y": y, "emoji": "😊", "action": "idle",
+                "health": 100, "hunger": 20, "energy": 80, "mood": 50, "stress": 0}
+    creature.update(fields)
+    return creature
+
+
+class TestBinaryFrames(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = DeltaEncoder(keyframe_interval=10)
+        self.a = _creature(10.25, 20.5)
+        self.b = _creature(30.0, 40.0, emoji="😴", action="sleeping")
+        self.food = [{"id": "f1", "x": 5, "y": 5, "emoji": "🍎"}]
+
+    def _world(self, *creatures):
+        return {"bitlings": [dict(c) for c in creatures], "food": list(self.food), "obstacles": []}
+
+    def test_keyframe_round_trip(self):
+        message = self.encoder.encode(self._world(self.a, self.b))
+        decoded = binary.decode_frame(binary.encode_frame(message))
+        self.assertEqual(decoded["type"], "world_update")
+        self.assertEqual(decoded["seq"], message["seq"])
+        self.assertEqual(decoded["payload"]["food"], self.food)
+        self.assertEqual(decoded["payload"]["bitlings"], message["payload"]["bitlings"])
+
+    def test_delta_round_trip(self):
+        self.encoder.encode(self._world(self.a, self.b))
+        moved = dict(self.a, x=50.0, action="wandering")
+        message = self.encoder.encode(self._world(moved))
+        decoded = binary.decode_frame(binary.encode_frame(message))
+        self.assertEqual(decoded["type"], "world_delta")
+        self.assertEqual((decoded["seq"], decoded["base_seq"]), (message["seq"], message["base_seq"]))
+        section = decoded["payload"]["bitlings"]
+        self.assertEqual(section["changed"], [moved])
+        self.assertEqual(section["removed"], [self.b["id"]])
+
+    def test_frame_is_smaller_than_json(self):
+        message = self.encoder.encode(self._world(*[_creature(i, i) for i in range(50)]))
+        self.assertLess(len(binary.encode_frame(message)), len(json.dumps(message).encode("utf-8")) / 2)
+
+    def test_non_uuid_ids_fall_back_to_json(self):
+        message = self.encoder.encode(self._world(dict(self.a, id="not-a-uuid")))
+        self.assertIsNone(binary.encode_frame(message))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.network.delta import DeltaEncoder
+
+
+def _world(bitlings, food=()):
+    return {"bitlings": [dict(b) for b in bitlings], "food": [dict(f) for f in food], "obstacles": []}
+
+
+def _apply(world, message):
+    """Reference client: apply a keyframe or delta to a dict-of-dicts world."""
+    if message["type"] == "world_update":
+        return {name: {e["id"]: e for e in entities} for name, entities in message["payload"].items()}
+    for name, delta in message["payload"].items():
+        for entity_id in delta["removed"]:
+            del world[name][entity_id]
+        for entity in delta["added"] + delta["changed"]:
+            world[name][entity["id"]] = entity
+    return world
+
+
+class TestDeltaEncoder(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = DeltaEncoder(keyframe_interval=5, position_threshold=0.5)
+        self.a = {"id": "a", "x": 10.0, "y": 10.0, "emoji": "😊", "action": "idle"}
+        self.b = {"id": "b", "x": 20.0, "y": 20.0, "emoji": "😊", "action": "idle"}
+
+    def test_first_frame_is_keyframe(self):
+        message = self.encoder.encode(_world([self.a, self.b]))
+        self.assertEqual(message["type"], "world_update")
+        self.assertTrue(message["keyframe"])
+        self.assertEqual(message["seq"], 1)
+        self.assertEqual(len(message["payload"]["bitlings"]), 2)
+
+    def test_delta_contains_only_changes(self):
+        """Unchanged and sub-threshold entities are omitted; adds, changes and removals are sent."""
+        self.encoder.encode(_world([self.a, self.b], [{"id": "f", "x": 1, "y": 1, "emoji": "🍎"}]))
+        moved_a = dict(self.a, x=10.3)  # below threshold
+        acting_b = dict(self.b, action="wandering")
+        c = {"id": "c", "x": 5.0, "y": 5.0, "emoji": "😊", "action": "idle"}
+        message = self.encoder.encode(_world([moved_a, acting_b, c]))
+
+        self.assertEqual(message["type"], "world_delta")
+        self.assertEqual((message["seq"], message["base_seq"]), (2, 1))
+        bitlings = message["payload"]["bitlings"]
+        self.assertEqual([e["id"] for e in bitlings["added"]], ["c"])
+        self.assertEqual([e["id"] for e in bitlings["changed"]], ["b"])
+        self.assertEqual(message["payload"]["food"]["removed"], ["f"])
+
+        # Small moves accumulate until they cross the threshold
+        message = self.encoder.encode(_world([dict(self.a, x=10.6), acting_b, c]))
+        self.assertEqual([e["id"] for e in message["payload"]["bitlings"]["changed"]], ["a"])
+
+    def test_stream_reconstructs_world_and_resync_keyframe_matches(self):
+        """A client applying the stream ends up with the encoder's view, and keyframes agree with it."""
+        client = None
+        for step in range(11):
+            a = dict(self.a, x=10.0 + step)
+            message = self.encoder.encode(_world([a, self.b] if step % 3 else [a]))
+            client = _apply(client, message)
+        self.assertEqual(message["type"], "world_update", "Every fifth frame after the first is a keyframe")
+        resync = self.encoder.keyframe()
+        self.assertEqual(_apply(None, resync), client)
+        self.assertEqual(resync["seq"], self.encoder.seq)
+
+    def test_reset_forces_keyframe(self):
+        self.encoder.encode(_world([self.a]))
+        self.encoder.reset()
+        self.assertEqual(self.encoder.encode(_world([self.a]))["type"], "world_update")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import unittest
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.network.server import NetworkServer
+
+
+class FakeClient:
+    """Records sent messages; a blocked client holds every send until released."""
+
+    def __init__(self, name, blocked=False):
+        self.remote_address = (name, 0)
+        self.sent = []
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+
+    async def send(self, message):
+        await self.gate.wait()
+        self.sent.append(json.loads(message))
+
+
+def _world(step):
+    return {"bitlings": [{"id": "a", "x": 10.0 * step, "y": 0.0, "emoji": "😊"}],
+            "food": [], "obstacles": []}
+
+
+class TestFanout(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = NetworkServer(asyncio.Queue(), keyframe_interval=100)
+        self.fast = FakeClient("fast")
+        self.slow = FakeClient("slow", blocked=True)
+        self.server.connected_clients.update([self.fast, self.slow])
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_broadcast_never_waits_on_slow_client(self):
+        for step in range(5):
+            await asyncio.wait_for(self.server.broadcast_state(_world(step)), timeout=1)
+            await self.server.writers[self.fast].drain()
+        self.assertEqual([m["seq"] for m in self.fast.sent], [1, 2, 3, 4, 5])
+        self.assertEqual(self.slow.sent, [])
+
+    async def test_slow_client_skips_to_latest_as_keyframe(self):
+        for step in range(5):
+            await self.server.broadcast_state(_world(step))
+            await asyncio.sleep(0)
+        self.slow.gate.set()
+        await self.server.drain()
+        # The first frame was in flight; frames 2-4 were replaced by frame 5,
+        # which arrives as a keyframe so the client's sequence has no gap
+        self.assertEqual([m["seq"] for m in self.slow.sent], [1, 5])
+        self.assertEqual(self.slow.sent[1]["type"], "world_update")
+        self.assertEqual(self.slow.sent[1]["payload"]["bitlings"][0]["x"], 40.0)
+
+        stats = self.server.client_stats()
+        self.assertEqual(stats["('slow', 0)"]["frames_dropped"], 3)
+        self.assertEqual(stats["('slow', 0)"]["frames_sent"], 2)
+        self.assertEqual(stats["('fast', 0)"]["frames_dropped"], 0)
+        self.assertGreater(stats["('slow', 0)"]["queue_latency_max"], 0.0)
+
+    async def test_frames_are_encoded_once(self):
+        calls = []
+        original = self.server.serialize_frame
+
+        def counting(client, message, encoded):
+            calls.append("json" in encoded)
+            return original(client, message, encoded)
+
+        for writer_client in (self.fast, self.slow):
+            self.server.writer_for(writer_client).serialize = counting
+        self.slow.gate.set()
+        await self.server.broadcast_state(_world(0))
+        await self.server.drain()
+        # The second client found the first client's encoding in the shared cache
+        self.assertEqual(sorted(calls), [False, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
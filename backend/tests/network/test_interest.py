@@ -0,0 +1,126 @@
+import asyncio
+import json
+import random
+import unittest
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.network.interest import InterestIndex, Viewport
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.network.server import NetworkServer
+
+
+class FakeClient:
+    """Stands in for a websocket connection and records what it was sent."""
+
+    remote_address = ("test", 0)
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def _world():
+    bitlings = [{"id": f"b{i}", "x": 100.0 * i, "y": 50.0, "emoji": "😊"} for i in range(20)]
+    food = [{"id": "f1", "x": 120.0, "y": 60.0, "emoji": "🍎"},
+            {"id": "f2", "x": 1900.0, "y": 60.0, "emoji": "🍎"}]
+    return {"bitlings": bitlings, "food": food, "obstacles": []}
+
+
+class TestInterestIndex(unittest.TestCase):
+
+    def test_visible_keeps_viewport_plus_margin(self):
+        index = InterestIndex(_world())
+        visible = index.visible(Viewport(0, 0, 300, 200), margin=50)
+        self.assertEqual(sorted(b["id"] for b in visible["bitlings"]), ["b0", "b1", "b2", "b3"])
+        self.assertEqual([f["id"] for f in visible["food"]], ["f1"])
+        self.assertEqual(visible["obstacles"], [])
+
+    def test_environment_indexes_match_a_state_index(self):
+        random.seed(6)
+        environment = Environment(width=1000, height=800, initial_creatures=60, initial_food=40)
+        state = environment.get_state()
+        ids = lambda visible: {name: sorted(entity["id"] for entity in entities)
+                               for name, entities in visible.items()}
+        for viewport in (Viewport(0, 0, 300, 200), Viewport(400, 300, 500, 500), Viewport(-50, 0, 2000, 2000)):
+            self.assertEqual(ids(InterestIndex(state, environment).visible(viewport, margin=30)),
+                             ids(InterestIndex(state).visible(viewport, margin=30)))
+
+    def test_viewport_from_payload_rejects_malformed(self):
+        self.assertEqual(Viewport.from_payload({"x": 1, "y": 2, "width": 3, "height": 4}),
+                         Viewport(1, 2, 3, 4))
+        self.assertIsNone(Viewport.from_payload({"x": 1, "y": 2}))
+        self.assertIsNone(Viewport.from_payload({"x": "a", "y": 2, "width": 3, "height": 4}))
+        self.assertIsNone(Viewport.from_payload({"x": 1, "y": 2, "width": -3, "height": 4}))
+
+
+class TestViewportBroadcast(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.server = NetworkServer(asyncio.Queue(), viewport_margin=0)
+        self.viewer = FakeClient()
+        self.watcher = FakeClient()
+        self.server.connected_clients.update([self.viewer, self.watcher])
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def _send(self, client, message):
+        await self.server.handle_message(client, json.dumps(message))
+        await self.server.drain()
+
+    async def _broadcast(self, state):
+        await self.server.broadcast_state(state)
+        await self.server.drain()
+
+    def _last(self, client):
+        return json.loads(client.sent[-1])
+
+    async def test_viewport_client_gets_filtered_stream(self):
+        await self._send(self.viewer, {"type": "viewport",
+                                       "payload": {"x": 0, "y": 0, "width": 250, "height": 100}})
+        await self._broadcast(_world())
+        viewer, watcher = self._last(self.viewer), self._last(self.watcher)
+        self.assertEqual(len(watcher["payload"]["bitlings"]), 20)
+        self.assertEqual(sorted(b["id"] for b in viewer["payload"]["bitlings"]), ["b0", "b1", "b2"])
+
+    async def test_scrolling_adds_and_removes_entities(self):
+        await self._send(self.viewer, {"type": "viewport",
+                                       "payload": {"x": 0, "y": 0, "width": 150, "height": 100}})
+        await self._broadcast(_world())
+        await self._send(self.viewer, {"type": "viewport",
+                                       "payload": {"x": 1850, "y": 0, "width": 150, "height": 100}})
+        await self._broadcast(_world())
+        delta = self._last(self.viewer)
+        self.assertEqual(delta["type"], "world_delta")
+        self.assertEqual(sorted(delta["payload"]["bitlings"]["removed"]), ["b0", "b1"])
+        self.assertEqual(sorted(b["id"] for b in delta["payload"]["bitlings"]["added"]), ["b19"])
+        self.assertEqual([f["id"] for f in delta["payload"]["food"]["added"]], ["f2"])
+
+    async def test_clearing_viewport_returns_to_shared_stream(self):
+        await self._send(self.viewer, {"type": "viewport",
+                                       "payload": {"x": 0, "y": 0, "width": 150, "height": 100}})
+        await self._broadcast(_world())
+        await self._send(self.viewer, {"type": "viewport", "payload": None})
+        keyframe = self._last(self.viewer)
+        self.assertEqual(keyframe["type"], "world_update")
+        self.assertEqual(len(keyframe["payload"]["bitlings"]), 20)
+        self.assertNotIn(self.viewer, self.server.client_streams)
+
+    async def test_observed_regions(self):
+        self.assertEqual(NetworkServer(asyncio.Queue()).observed_regions(), [])
+        await self._send(self.viewer, {"type": "viewport",
+                                       "payload": {"x": 10, "y": 20, "width": 150, "height": 100}})
+        self.assertIsNone(self.server.observed_regions())  # The watcher sees everything
+        await self._send(self.watcher, {"type": "viewport",
+                                        "payload": {"x": 0, "y": 0, "width": 50, "height": 50}})
+        self.assertEqual(sorted(self.server.observed_regions()), [(0, 0, 50, 50), (10, 20, 160, 120)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+import sys
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.simulation.metrics import SimulationMetrics
+from backend.bitlings.simulation.snapshot import load_snapshot
+from backend.bitlings.simulation.checkpoint import (Checkpointer, list_checkpoints, latest_checkpoint,
+                                                    PREFIX, TEMP_SUFFIX)
+
+
+class TestCheckpointer(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(9)
+        np.random.seed(9)
+        self.environment = Environment(width=300, height=300, initial_creatures=10, initial_food=8)
+        self.simulation = Simulation(self.environment)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_checkpoint_is_complete_and_loadable(self):
+        checkpointer = Checkpointer(self.directory, interval=60, keep=3)
+        path = checkpointer.checkpoint(self.environment).result()
+        checkpointer.close()
+
+        self.assertEqual(latest_checkpoint(self.directory), path)
+        self.assertFalse(any(name.endswith(TEMP_SUFFIX) for name in os.listdir(self.directory)))
+        self.assertEqual(load_snapshot(path).get_state(), self.environment.get_state())
+        self.assertEqual(checkpointer.written, 1)
+        self.assertGreater(checkpointer.last_bytes, 0)
+
+    def test_capture_is_consistent_while_simulation_continues(self):
+        checkpointer = Checkpointer(self.directory)
+        expected = self.environment.get_state()
+        future = checkpointer.checkpoint(self.environment)
+        for _ in range(5):
+            self.simulation.step(0.1)
+        restored = load_snapshot(future.result())
+        checkpointer.close()
+        self.assertEqual(restored.get_state(), expected)
+
+    def test_rotation_keeps_newest(self):
+        checkpointer = Checkpointer(self.directory, keep=2)
+        paths = []
+        for _ in range(4):
+            self.simulation.step(0.1)
+            paths.append(checkpointer.checkpoint(self.environment).result())
+        checkpointer.close()
+        self.assertEqual(list_checkpoints(self.directory), paths[-2:])
+
+    def test_interval_and_skip_while_busy(self):
+        checkpointer = Checkpointer(self.directory, interval=10)
+        release = threading.Event()
+        checkpointer.executor.submit(release.wait)  # Occupy the writer
+
+        first = checkpointer.maybe_checkpoint(self.environment, now=100.0)
+        self.assertIsNotNone(first)
+        self.assertIsNone(checkpointer.maybe_checkpoint(self.environment, now=105.0))  # Not due
+        self.assertIsNone(checkpointer.maybe_checkpoint(self.environment, now=111.0))  # Busy
+        self.assertEqual(checkpointer.skipped, 1)
+
+        release.set()
+        first.result()
+        self.assertIsNotNone(checkpointer.maybe_checkpoint(self.environment, now=122.0))
+        checkpointer.close()
+        self.assertEqual(len(list_checkpoints(self.directory)), 2)
+
+    def test_restart_removes_partial_and_continues_sequence(self):
+        checkpointer = Checkpointer(self.directory)
+        path = checkpointer.checkpoint(self.environment).result()
+        checkpointer.close()
+        partial = os.path.join(self.directory, f"{PREFIX}00000002{TEMP_SUFFIX}")
+        os.makedirs(partial)
+
+        restarted = Checkpointer(self.directory)
+        self.assertFalse(os.path.exists(partial))
+        second = restarted.checkpoint(self.environment).result()
+        restarted.close()
+        self.assertEqual(list_checkpoints(self.directory), [path, second])
+
+
+class SilentServer:
+
+    async def broadcast_state(self, state, environment=None):
+        pass
+
+
+class TestSimulationCheckpoints(unittest.IsolatedAsyncioTestCase):
+
+    async def test_loop_checkpoints_between_ticks(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        environment = Environment(width=200, height=200)
+        metrics = SimulationMetrics()
+        checkpointer = Checkpointer(directory, interval=0.1)
+        simulation = Simulation(environment, asyncio.Queue(), SilentServer(), sim_hz=50,
+                                broadcast_hz=50, metrics=metrics, checkpointer=checkpointer)
+        task = asyncio.create_task(simulation.run())
+        await asyncio.sleep(0.35)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        checkpointer.close()
+        self.assertGreaterEqual(metrics.counters["checkpoints"], 2)
+        self.assertEqual(checkpointer.written, metrics.counters["checkpoints"])
+        self.assertEqual(metrics.phases["checkpoint"].count, metrics.counters["checkpoints"]
+                         + checkpointer.skipped)
+
+
+if __name__ == '__main__':
+    unittest.main()
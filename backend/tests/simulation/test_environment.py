@@ -5,6 +5,8 @@ import os
 # Adjust the Python path to include the 'backend' directory
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
+import numpy as np
+
 from backend.bitlings.simulation.environment import Environment
 
 class TestEnvironment(unittest.TestCase):
@@ -59,5 +61,25 @@ class TestEnvironment(unittest.TestCase):
                 break
         self.assertTrue(found_test_obstacle, "Test obstacle not found in state or details mismatch.")
 
+    def test_learning_batch_defers_and_matches_immediate_learning(self):
+        """Reinforcements queued in a batch land only when applied, with the same result."""
+        first, second = self.environment.bitlings[:2]
+        for bitling in (first, second):
+            bitling.network.input_activations = np.array([0.4, 0.9, 0.2, 0.5, -0.5])
+            bitling.network.hidden_activations = np.array([0.8, 0.3, 0.05, 0.6])
+        before = first.network.weights_input_hidden.copy()
+        self.environment.reinforce(first, 3, True)  # No batch open: applied immediately
+        expected = first.network.weights_input_hidden.copy()
+        first.network.weights_input_hidden = before
+
+        self.environment.begin_learning_batch()
+        self.environment.reinforce(first, 3, True)
+        self.environment.reinforce(second, 1, False)
+        np.testing.assert_array_equal(first.network.weights_input_hidden, before)
+        self.assertEqual(self.environment.apply_learning_batch(), 1)
+        self.assertIsNone(self.environment.learning_events)
+        np.testing.assert_array_equal(first.network.weights_input_hidden, expected)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,88 @@
+import random
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.creature.bitling import Bitling
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.flow import FlowField
+
+
+def _empty_world(width=200, height=200):
+    environment = Environment(width=width, height=height, initial_creatures=0, initial_food=0)
+    environment.obstacles = []
+    return environment
+
+
+def _add_wall(environment, x, y_from, y_to, radius=8):
+    for y in range(y_from, y_to + 1, radius):
+        environment.add_obstacle(x=x, y=y, radius=radius)
+
+
+class TestFlowField(unittest.TestCase):
+
+    def test_distances_route_around_obstacles(self):
+        environment = _empty_world()
+        _add_wall(environment, 100, 40, 160)
+        environment.add_food({'id': 'food', 'x': 145, 'y': 105})
+        distance = environment.flow.distance()
+        self.assertEqual(distance[10, 14], 0.0)
+        # Straight across the wall is 9 cells; the path has to go around it
+        self.assertGreater(distance[10, 5], 9 * environment.flow.cell_size * 1.2)
+        self.assertEqual(distance[10, 10], float('inf'))  # Inside the wall
+
+    def test_incremental_updates_match_a_rebuild(self):
+        random.seed(2)
+        environment = _empty_world(300, 200)
+        _add_wall(environment, 150, 30, 170)
+        for i in range(12):
+            environment.add_food({'id': f'f{i}', 'x': random.uniform(0, 300), 'y': random.uniform(0, 200)})
+        flow = environment.flow
+        flow.sync()
+        for step in range(20):
+            if step % 3 == 0:
+                environment.add_food({'id': f'n{step}', 'x': random.uniform(0, 300), 'y': random.uniform(0, 200)})
+            else:
+                environment.remove_food(random.choice(environment.food_sources)['id'])
+            settled = flow.cells_settled
+            incremental = flow.distance()
+            self.assertLess(flow.cells_settled - settled, flow.rows * flow.columns)
+            fresh = FlowField(environment, flow.cell_size).distance()
+            np.testing.assert_allclose(incremental, fresh)
+
+    def test_steer_follows_only_fields_leading_to_the_target(self):
+        environment = _empty_world()
+        environment.add_food({'id': 'near', 'x': 55, 'y': 55})
+        environment.add_food({'id': 'far', 'x': 185, 'y': 185})
+        dx, dy = environment.food_flow(20, 20, (55, 55))
+        self.assertGreater(dx, 0)
+        self.assertGreater(dy, 0)
+        self.assertIsNone(environment.food_flow(20, 20, (185, 185)))
+        self.assertIsNone(environment.food_flow(52, 52, (55, 55)))  # Same cell: steer straight
+
+
+class TestSeekingAroundObstacles(unittest.TestCase):
+
+    def test_seeker_reaches_food_behind_a_wall(self):
+        environment = _empty_world()
+        _add_wall(environment, 100, 40, 160)
+        environment.add_food({'id': 'food', 'x': 150, 'y': 100})
+        bitling = Bitling(x=50, y=100, environment=environment)
+        environment.add_bitling(bitling)
+        bitling.current_action = "seeking_food"
+        bitling.target_food_pos = (150, 100)
+        bitling.target_food_item_id = 'food'
+        for _ in range(400):
+            bitling.execute_action(0.1)
+            if bitling.current_action != "seeking_food":
+                break
+        self.assertEqual(bitling.current_action, "eating")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.creature.bitling import Bitling
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.food import FoodStore
+
+
+class TestFoodStore(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a store with three food items on a line."""
+        self.store = FoodStore(cell_size=10, capacity=2)
+        for i, x in enumerate([10, 20, 30]):
+            self.store.add({'id': f'f{i}', 'x': x, 'y': 0, 'emoji': '🍎'})
+
+    def test_swap_remove_keeps_slots_consistent(self):
+        """Removing from the middle moves the last item into the freed slot."""
+        self.assertTrue(self.store.remove('f0'))
+        self.assertFalse(self.store.remove('f0'))
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.slots['f2'], 0)
+        self.assertEqual(self.store.x[0], 30)
+        self.assertEqual(self.store.get('f2')['x'], 30)
+        self.assertEqual(sorted(f['id'] for f in self.store), ['f1', 'f2'])
+        self.assertEqual(self.store.nearest(9, 0)[0]['id'], 'f1')
+
+    def test_claims_spread_seekers(self):
+        """Each claimant gets the nearest item nobody else has reserved."""
+        first, _ = self.store.claim_nearest(0, 0, 'a')
+        second, _ = self.store.claim_nearest(0, 0, 'b')
+        self.assertEqual(first['id'], 'f0')
+        self.assertEqual(second['id'], 'f1')
+        # Re-claiming keeps the same item for the same claimant
+        self.assertEqual(self.store.claim_nearest(0, 0, 'a')[0]['id'], 'f0')
+        self.assertFalse(self.store.claim('f0', 'b'))
+
+        self.store.release('a')
+        self.assertIsNone(self.store.claimant_of('f0'))
+        self.store.claim('f2', 'c')
+        self.store.remove('f2')
+        self.assertNotIn('c', self.store.claimed_by)
+
+    def test_environment_serializes_same_items(self):
+        """get_state still returns the food dicts, and seekers target distinct items."""
+        environment = Environment(width=100, height=100)
+        environment.bitlings = []
+        environment.food_sources = [
+            {'id': 'near', 'x': 52, 'y': 50, 'emoji': '🍎'},
+            {'id': 'far', 'x': 80, 'y': 50, 'emoji': '🍏'},
+        ]
+        self.assertEqual(sorted(f['id'] for f in environment.get_state()['food']), ['far', 'near'])
+
+        seekers = [Bitling(x=50, y=50, environment=environment) for _ in range(2)]
+        for seeker in seekers:
+            environment.add_bitling(seeker)
+            seeker.begin_action("seeking_food", distance=2.0)
+        self.assertEqual([s.target_food_item_id for s in seekers], ['near', 'far'])
+
+        seekers[0].begin_action("idle", distance=2.0)
+        self.assertIsNone(environment.food.claimant_of('near'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import random
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.simulation.headless import fast_forward, population_summary
+
+
+def _simulation(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    environment = Environment(width=300, height=300, initial_creatures=12, initial_food=20)
+    return Simulation(environment, sim_hz=10)
+
+
+class TestHeadless(unittest.TestCase):
+
+    def test_fast_forward_runs_fixed_steps(self):
+        simulation = _simulation(1)
+        reports = []
+        result = fast_forward(simulation, 30, report_every=10, report=reports.append)
+        self.assertEqual(simulation.environment.tick, 30)
+        self.assertEqual(result["steps"], 30)
+        self.assertAlmostEqual(result["sim_seconds"], 3.0)
+        self.assertEqual([r["steps"] for r in reports], [10, 20])
+        self.assertGreater(result["steps_per_second"], 0)
+
+    def test_seeded_runs_are_reproducible(self):
+        first = fast_forward(_simulation(7), 25)["population"]
+        second = fast_forward(_simulation(7), 25)["population"]
+        self.assertEqual(first, second)
+
+    def test_population_summary(self):
+        environment = _simulation(3).environment
+        environment.bitlings[0].current_action = "dead"
+        summary = population_summary(environment)
+        self.assertEqual((summary["creatures"], summary["alive"], summary["food"]), (12, 11, 20))
+        self.assertEqual(summary["actions"]["dead"], 1)
+        self.assertEqual(summary["mean_health"], 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
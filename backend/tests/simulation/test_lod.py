@@ -0,0 +1,108 @@
+import random
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.creature.bitling import Bitling
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.simulation.lod import LevelOfDetail
+from backend.bitlings.simulation.metrics import SimulationMetrics
+
+
+class TestLevelOfDetail(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(5)
+        np.random.seed(5)
+        self.environment = Environment(width=1000, height=1000, initial_creatures=0, initial_food=0)
+        self.environment.obstacles = []
+        self.full = Bitling(x=50, y=50, environment=self.environment)
+        self.near = Bitling(x=300, y=50, environment=self.environment)
+        self.far = Bitling(x=900, y=900, environment=self.environment)
+        for bitling in (self.full, self.near, self.far):
+            self.environment.add_bitling(bitling)
+        self.lod = LevelOfDetail(self.environment, near_distance=300, near_interval=3, far_interval=10)
+        self.lod.set_regions([(0, 0, 100, 100)])
+        # Record the time step each creature is moved by
+        self.steps = {bitling: [] for bitling in self.environment.bitlings}
+        for bitling in self.environment.bitlings:
+            bitling.execute_action = lambda time_delta, b=bitling: self.steps[b].append(round(time_delta, 6))
+
+    def test_tiers_follow_the_watched_regions(self):
+        self.assertEqual(self.lod.classify().tolist(), [0, 1, 2])
+        self.lod.set_regions(None)
+        self.assertEqual(self.lod.classify().tolist(), [0, 0, 0])
+        self.lod.set_regions([])
+        self.assertEqual(self.lod.classify().tolist(), [2, 2, 2])
+
+    def _keep_actions(self, action):
+        """Put every creature on `action` and stop decisions from changing it."""
+        for bitling in self.environment.bitlings:
+            bitling.current_action = action
+        self.environment.choose_actions = lambda creatures=None: None
+
+    def test_coarse_steps_cover_the_same_time(self):
+        self._keep_actions("idle")
+        simulation = Simulation(self.environment, lod=self.lod)
+        for _ in range(30):
+            simulation.step(0.1)
+        self.assertEqual(self.steps[self.full], [0.1] * 30)
+        # Every update covers the ticks since the last one, the first a whole interval
+        self.assertEqual(self.steps[self.near], [0.3] * 10)
+        self.assertEqual(self.steps[self.far], [1.0] * 3)
+
+    def test_moving_creatures_take_fine_substeps(self):
+        self._keep_actions("wandering")
+        simulation = Simulation(self.environment, lod=self.lod)
+        for _ in range(30):
+            simulation.step(0.1)
+        for bitling in (self.full, self.near, self.far):
+            self.assertEqual(self.steps[bitling], [0.1] * 30)
+
+    def test_far_creatures_walk_to_food_before_eating(self):
+        del self.far.execute_action  # Back to the real one
+        self._keep_actions("seeking_food")
+        # An obstacle between the creature and food 40 units away: one coarse
+        # update (a second) is too short to walk around it
+        self.environment.obstacles = [{'id': 'rock', 'x': 920, 'y': 900, 'radius': 10, 'emoji': "🪨"}]
+        self.environment.add_food({'id': 'apple', 'x': 940, 'y': 900})
+        self.far.target_food_pos = (940, 900)
+        self.far.target_food_item_id = 'apple'
+        simulation = Simulation(self.environment, lod=self.lod)
+        for _ in range(10):
+            simulation.step(0.1)
+        self.assertEqual(self.steps[self.far], [])
+        self.assertEqual(self.far.current_action, "seeking_food")
+        self.assertGreater(np.hypot(self.far.x - 940, self.far.y - 900), 5)
+
+    def test_reports_the_rows_it_decided(self):
+        simulation = Simulation(self.environment, lod=self.lod)
+        simulation.step(0.1)  # Tick 1: only the full-detail creature is due
+        self.assertEqual(self.lod.last_decided_rows.tolist(), [0])
+        simulation.step(0.1)  # Tick 2: the near creature (row 1) is due too
+        self.assertEqual(self.lod.last_decided_rows.tolist(), [0, 1])
+
+    def test_metrics_report_tiers(self):
+        metrics = SimulationMetrics()
+        simulation = Simulation(self.environment, metrics=metrics, lod=self.lod)
+        simulation.step(0.1)
+        simulation.update_gauges()
+        self.assertEqual(metrics.gauges["lod_full_creatures"], 1)
+        self.assertEqual(metrics.gauges["lod_near_creatures"], 1)
+        self.assertEqual(metrics.gauges["lod_far_creatures"], 1)
+        self.assertEqual(metrics.phases["tier_far"].count, 1)
+        self.assertIn('bitlings_phase_seconds_count{phase="tier_full"} 1', metrics.render_prometheus())
+
+    def test_lod_replaces_the_decider(self):
+        with self.assertRaises(ValueError):
+            Simulation(self.environment, decider=self.environment, lod=self.lod)
+
+
+if __name__ == '__main__':
+    unittest.main()
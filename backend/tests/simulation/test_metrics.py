@@ -0,0 +1,113 @@
+import asyncio
+import json
+import random
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.simulation.metrics import RollingHistogram, SimulationMetrics
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.network.metrics_http import MetricsHTTPServer
+from backend.bitlings.network.server import NetworkServer
+
+
+class TestRollingHistogram(unittest.TestCase):
+
+    def test_buckets_cover_everything_percentiles_cover_window(self):
+        histogram = RollingHistogram(window=4, buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0, 0.2, 0.3, 0.4):
+            histogram.observe(value)
+        self.assertEqual(histogram.bucket_counts, [1, 4, 1])
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 6)
+        self.assertAlmostEqual(summary["sum"], 6.45)
+        # Only the last four samples (5.0, 0.2, 0.3, 0.4) are in the window
+        self.assertEqual(summary["max"], 5.0)
+        self.assertAlmostEqual(summary["p50"], 0.35)
+
+
+class TestSimulationMetrics(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        np.random.seed(0)
+        self.environment = Environment(width=200, height=200)
+
+    def test_step_records_phases_and_overruns(self):
+        metrics = SimulationMetrics()
+        simulation = Simulation(self.environment, metrics=metrics)
+        simulation.step(0.1)
+        simulation.step(0.0)  # Any real work overruns a zero timestep
+        for phase in ("environment", "passive", "decide", "execute"):
+            self.assertEqual(metrics.phases[phase].count, 2)
+        self.assertEqual(metrics.counters["steps"], 2)
+        self.assertGreaterEqual(metrics.counters["tick_overruns"], 1)
+
+    def test_prometheus_text(self):
+        metrics = SimulationMetrics()
+        Simulation(self.environment, metrics=metrics).step(0.1)
+        metrics.set_gauge("population", 5)
+        text = metrics.render_prometheus()
+        self.assertIn('bitlings_phase_seconds_bucket{phase="decide",le="+Inf"} 1', text)
+        self.assertIn('bitlings_phase_seconds_count{phase="execute"} 1', text)
+        self.assertIn("bitlings_steps_total 1", text)
+        self.assertIn("bitlings_population 5", text)
+
+    def test_disabled_metrics_record_nothing(self):
+        simulation = Simulation(self.environment)
+        simulation.step(0.1)
+        self.assertIsNone(simulation.metrics)
+
+
+class FakeClient:
+    remote_address = ("test", 0)
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+class TestMetricsEndpoints(unittest.IsolatedAsyncioTestCase):
+
+    async def test_http_endpoint_serves_prometheus_text(self):
+        metrics = SimulationMetrics()
+        metrics.count("steps", 3)
+        endpoint = MetricsHTTPServer(metrics)
+        server = await endpoint.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            responses = []
+            for path in ("/metrics", "/other"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+                await writer.drain()
+                responses.append((await reader.read()).decode())
+                writer.close()
+        finally:
+            await endpoint.close()
+        self.assertTrue(responses[0].startswith("HTTP/1.1 200 OK"))
+        self.assertIn("bitlings_steps_total 3", responses[0])
+        self.assertTrue(responses[1].startswith("HTTP/1.1 404"))
+
+    async def test_websocket_metrics_message(self):
+        client = FakeClient()
+        server = NetworkServer(asyncio.Queue(), metrics=SimulationMetrics())
+        await server.handle_message(client, json.dumps({"type": "metrics"}))
+        disabled = NetworkServer(asyncio.Queue())
+        await disabled.handle_message(client, json.dumps({"type": "metrics"}))
+        self.assertEqual(client.sent[0]["type"], "metrics")
+        self.assertTrue(client.sent[0]["payload"]["enabled"])
+        self.assertIn("decide", client.sent[0]["payload"]["phases"])
+        self.assertEqual(client.sent[1]["payload"], {"enabled": False})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import math
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.obstacles import (ObstacleField, AVOIDANCE_DISTANCE_THRESHOLD,
+                                                   AVOIDANCE_STRENGTH)
+
+
+def _push(x, y, obstacle):
+    """Avoidance force of a single obstacle at (x, y), as the per-obstacle rule defines it."""
+    dx, dy = x - obstacle['x'], y - obstacle['y']
+    center = math.hypot(dx, dy)
+    surface = max(0.0, center - obstacle['radius'])
+    if surface >= AVOIDANCE_DISTANCE_THRESHOLD or center == 0:
+        return 0.0, 0.0
+    magnitude = AVOIDANCE_STRENGTH * (1.0 - surface / AVOIDANCE_DISTANCE_THRESHOLD)
+    return dx / center * magnitude, dy / center * magnitude
+
+
+class TestObstacleField(unittest.TestCase):
+
+    def setUp(self):
+        self.field = ObstacleField(400, 300, resolution=5.0)
+        self.left = {'id': 'left', 'x': 100.0, 'y': 150.0, 'radius': 20.0}
+        self.right = {'id': 'right', 'x': 160.0, 'y': 150.0, 'radius': 10.0}
+
+    def test_samples_match_distance_and_push(self):
+        self.field.add(self.left)
+        distance, force_x, force_y = self.field.sample(125.0, 160.0)  # A grid point
+        self.assertAlmostEqual(distance, math.hypot(25, 10) - 20)
+        expected = _push(125.0, 160.0, self.left)
+        self.assertAlmostEqual(force_x, expected[0])
+        self.assertAlmostEqual(force_y, expected[1])
+        self.assertAlmostEqual(self.field.sample(100.0, 150.0)[0], -20.0)
+        self.assertEqual(self.field.sample(300.0, 50.0), (self.field.max_distance, 0.0, 0.0))
+        # Between samples the values are interpolated
+        off_grid = self.field.avoidance(126.3, 161.7)
+        expected = _push(126.3, 161.7, self.left)
+        self.assertAlmostEqual(off_grid[0], expected[0], delta=0.05)
+        self.assertAlmostEqual(off_grid[1], expected[1], delta=0.05)
+
+    def test_nearby_obstacles_add_up(self):
+        self.field.add(self.left)
+        self.field.add(self.right)
+        force_x, force_y = self.field.avoidance(130.0, 155.0)
+        pushes = [_push(130.0, 155.0, obstacle) for obstacle in (self.left, self.right)]
+        self.assertAlmostEqual(force_x, pushes[0][0] + pushes[1][0])
+        self.assertAlmostEqual(force_y, pushes[0][1] + pushes[1][1])
+        self.assertAlmostEqual(self.field.sample(130.0, 150.0)[0], 10.0)  # Nearest surface wins
+
+    def test_updates_stay_local_and_match_a_rebuild(self):
+        self.field.add(self.left)
+        before = self.field.samples_rasterized
+        self.field.add(self.right)
+        self.assertLess(self.field.samples_rasterized - before, self.field.field[..., 0].size / 4)
+        self.assertTrue(self.field.remove('left'))
+        self.assertFalse(self.field.remove('left'))
+        rebuilt = ObstacleField(400, 300, resolution=5.0)
+        rebuilt.rebuild([self.right])
+        np.testing.assert_allclose(self.field.field, rebuilt.field)
+
+
+class TestEnvironmentObstacles(unittest.TestCase):
+
+    def test_environment_keeps_field_in_sync(self):
+        environment = Environment(width=200, height=200, initial_creatures=0, initial_food=0,
+                                  obstacle_resolution=4.0)
+        environment.obstacles = []
+        environment.add_obstacle(x=100, y=100, radius=10)
+        obstacle = environment.obstacles[0]
+        self.assertGreater(environment.obstacle_avoidance(120, 100)[0], 0)
+        version = environment.obstacle_version
+        self.assertTrue(environment.remove_obstacle(obstacle['id']))
+        self.assertGreater(environment.obstacle_version, version)
+        self.assertEqual(environment.obstacles, [])
+        self.assertEqual(environment.nearest_obstacle(100, 100), (None, float('inf')))
+        self.assertEqual(environment.obstacle_avoidance(120, 100), (0.0, 0.0))
+        self.assertFalse(environment.remove_obstacle(obstacle['id']))
+
+
+if __name__ == '__main__':
+    unittest.main()
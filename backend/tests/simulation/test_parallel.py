@@ -0,0 +1,56 @@
+import random
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.simulation.parallel import make_decider, ThreadDecider
+from backend.bitlings.simulation.sharded import ProcessDecider
+from backend.tests.simulation.worlds import seeded_world, comparable
+
+
+def _world(seed):
+    return seeded_world(seed, creatures=50, food=30)
+
+
+class TestParallelDecision(unittest.TestCase):
+
+    def _assert_matches_serial(self, mode, workers):
+        serial = Simulation(_world(6))
+        environment = _world(6)
+        decider = make_decider(environment, mode, workers)
+        parallel = Simulation(environment, decider=decider)
+        try:
+            for tick in range(12):
+                for simulation in (serial, parallel):
+                    random.seed(tick)
+                    np.random.seed(tick)
+                    simulation.step(0.1)
+                self.assertEqual(comparable(environment), comparable(serial.environment))
+            stats = decider.stats()
+        finally:
+            decider.close()
+        self.assertEqual(stats["workers"], workers)
+        self.assertEqual(sum(stats["chunk_sizes"]), environment.population.count)
+        return decider
+
+    def test_thread_mode_matches_serial(self):
+        self.assertIsInstance(self._assert_matches_serial("thread", 3), ThreadDecider)
+
+    def test_process_mode_matches_serial(self):
+        self.assertIsInstance(self._assert_matches_serial("process", 2), ProcessDecider)
+
+    def test_mode_selection(self):
+        environment = _world(1)
+        self.assertIsNone(make_decider(environment, "serial"))
+        with self.assertRaises(ValueError):
+            make_decider(environment, "gpu")
+
+
+if __name__ == '__main__':
+    unittest.main()
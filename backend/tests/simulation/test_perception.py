@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.creature.bitling import Bitling
+from backend.bitlings.simulation.environment import Environment
+
+
+class TestPerceptionCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a single Bitling next to one food item and no obstacles."""
+        self.environment = Environment(width=100, height=100)
+        self.environment.bitlings = []
+        self.environment.obstacles = []
+        self.environment.food_sources = [{'id': 'food1', 'x': 60, 'y': 50, 'emoji': '🍎'}]
+        self.bitling = Bitling(x=50, y=50, environment=self.environment)
+        self.environment.add_bitling(self.bitling)
+        self.cache = self.environment.perception
+
+    def test_repeated_perception_hits_cache(self):
+        """Perceiving twice in one tick scans the world once."""
+        first = self.bitling.perceive_environment()
+        second = self.bitling.perceive_environment()
+        self.assertEqual(first, second)
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+
+    def test_invalidated_by_movement_food_and_tick(self):
+        """Moving, eating food and starting a new tick each force a rescan."""
+        self.bitling.perceive_environment()
+        self.bitling.x = 55
+        self.assertAlmostEqual(self.bitling.perceive_environment()[0], 5.0)
+
+        self.environment.remove_food('food1')
+        self.assertEqual(self.bitling.perceive_environment()[0], float('inf'))
+
+        self.environment.update(0.1)
+        self.bitling.perceive_environment()
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_compute_all_fills_cache(self):
+        """Bulk computation at the start of a tick serves later lookups."""
+        others = [Bitling(x=10 * i, y=10, environment=self.environment) for i in range(3)]
+        for other in others:
+            self.environment.add_bitling(other)
+        results = self.cache.compute_all(self.environment.bitlings)
+        self.assertEqual(len(results), 4)
+        misses = self.cache.misses
+        for bitling in self.environment.bitlings:
+            bitling.perceive_environment()
+        self.assertEqual(self.cache.misses, misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
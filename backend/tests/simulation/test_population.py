@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.creature.bitling import Bitling
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.population import PopulationStore
+
+
+class TestPopulationStore(unittest.TestCase):
+
+    def setUp(self):
+        """Set up an environment with a known population."""
+        self.environment = Environment(width=100, height=100)
+        self.environment.bitlings = []
+        self.environment.food_sources = []
+        self.environment.obstacles = []
+
+    def _add(self, x, y, hunger, energy, mood=50, health=100):
+        bitling = Bitling(x=x, y=y, environment=self.environment)
+        bitling.hunger = hunger
+        bitling.energy = energy
+        bitling.mood = mood
+        bitling.health = health
+        self.environment.add_bitling(bitling)
+        return bitling
+
+    def test_bitling_is_view_over_store_row(self):
+        """Attribute writes on a Bitling land in the environment's columns."""
+        bitling = self._add(10, 20, hunger=30, energy=70)
+        population = self.environment.population
+        self.assertIs(bitling._store, population)
+        self.assertEqual(population.x[bitling._row], 10)
+        bitling.x = 42.5
+        self.assertEqual(population.x[bitling._row], 42.5)
+        bitling.current_action = "sleeping"
+        self.assertEqual(bitling.current_action, "sleeping")
+        self.assertEqual(self.environment.bitlings, [bitling])
+
+    def test_vectorized_update_matches_scalar_update(self):
+        """The population-wide update applies the same rules as Bitling.update_passive."""
+        cases = [(0, 100, 50), (85, 100, 50), (50, 10, 20), (100, 0, 80), (40, 60, 75)]
+        in_world = [self._add(50, 50, h, e, m) for h, e, m in cases]
+        solo = []
+        for h, e, m in cases:
+            bitling = Bitling(x=50, y=50, environment=self.environment)
+            bitling.hunger, bitling.energy, bitling.mood, bitling.health = h, e, m, 100
+            solo.append(bitling)
+
+        self.environment.population.update_passive(0.5)
+        for bitling in solo:
+            bitling.update_passive(0.5)
+
+        for a, b in zip(in_world, solo):
+            self.assertAlmostEqual(a.hunger, b.hunger)
+            self.assertAlmostEqual(a.energy, b.energy)
+            self.assertAlmostEqual(a.mood, b.mood)
+            self.assertAlmostEqual(a.stress, b.stress)
+            self.assertEqual(a.emoji, b.emoji)
+
+    def test_remove_dead_keeps_rows_consistent(self):
+        """Swap-removing dead creatures rebinds the moved rows and keeps views readable."""
+        alive_a = self._add(1, 1, 10, 90)
+        dead = self._add(2, 2, 10, 90, health=0)
+        alive_b = self._add(3, 3, 10, 90)
+
+        self.environment.update(0.1)
+
+        self.assertCountEqual(self.environment.bitlings, [alive_a, alive_b])
+        self.assertEqual(alive_b.x, 3)
+        self.assertEqual(alive_a.x, 1)
+        self.assertEqual(dead.x, 2, "Detached creature should keep its last state")
+        self.assertIsNot(dead._store, self.environment.population)
+
+    def test_store_grows(self):
+        """Adding past capacity reallocates columns without losing data."""
+        store = PopulationStore(capacity=2)
+        bitlings = [Bitling(x=i, y=0, environment=self.environment) for i in range(5)]
+        for bitling in bitlings:
+            store.adopt(bitling)
+        self.assertGreaterEqual(store.capacity, 5)
+        np.testing.assert_array_equal(store.x[:5], [0, 1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
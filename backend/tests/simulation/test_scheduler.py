@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.simulation.scheduler import FixedTimestep, RateTimer
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.loop import Simulation
+
+
+class TestFixedTimestep(unittest.TestCase):
+
+    def test_accumulates_partial_steps(self):
+        timestep = FixedTimestep(hz=10)
+        self.assertEqual(timestep.advance(0.05), 0)
+        self.assertEqual(timestep.advance(0.06), 1)
+        self.assertAlmostEqual(timestep.alpha, 0.1)
+        self.assertEqual(timestep.advance(0.25), 2)
+        self.assertAlmostEqual(timestep.time_to_next_step(), 0.04)
+
+    def test_substeps_are_bounded_and_backlog_dropped(self):
+        timestep = FixedTimestep(hz=10, max_substeps=3)
+        self.assertEqual(timestep.advance(1.05), 3)
+        self.assertEqual(timestep.dropped_steps, 7)
+        self.assertAlmostEqual(timestep.alpha, 0.5)
+        self.assertEqual(timestep.advance(0.05), 1)
+
+    def test_same_step_count_on_fast_and_slow_hosts(self):
+        fast, slow = FixedTimestep(hz=20), FixedTimestep(hz=20)
+        fast_steps = sum(fast.advance(0.01) for _ in range(200))
+        slow_steps = sum(slow.advance(0.2) for _ in range(10))
+        self.assertEqual(fast_steps, slow_steps)
+
+
+class TestRateTimer(unittest.TestCase):
+
+    def test_fires_at_rate_without_making_up_missed_firings(self):
+        timer = RateTimer(hz=4)
+        fired = [t for t in (0.0, 0.1, 0.25, 0.3, 0.5, 0.6) if timer.due(t)]
+        self.assertEqual(fired, [0.0, 0.25, 0.5])
+        self.assertTrue(timer.due(5.0))
+        self.assertFalse(timer.due(5.1))
+        self.assertAlmostEqual(timer.time_until(5.1), 0.15)
+
+
+class RecordingServer:
+
+    def __init__(self):
+        self.broadcasts = 0
+
+    async def broadcast_state(self, state, environment=None):
+        self.broadcasts += 1
+
+
+class TestSimulationRun(unittest.IsolatedAsyncioTestCase):
+
+    async def test_steps_and_broadcasts_run_at_independent_rates(self):
+        environment = Environment(width=200, height=200)
+        server = RecordingServer()
+        simulation = Simulation(environment, asyncio.Queue(), server, sim_hz=100, broadcast_hz=10)
+        deltas = []
+        simulation.step = deltas.append
+        task = asyncio.create_task(simulation.run())
+        await asyncio.sleep(0.35)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertTrue(all(dt == 0.01 for dt in deltas))
+        self.assertGreater(len(deltas), 10 * server.broadcasts / 2)
+        self.assertTrue(3 <= server.broadcasts <= 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import random
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.ai.inference import private_zeros
+from backend.bitlings.creature.bitling import Bitling
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.simulation.shared import SharedArena, SharedView
+from backend.bitlings.simulation.sharded import RegionFood, RegionGrid, ShardedEngine
+from backend.bitlings.simulation.spatial import SpatialHash
+from backend.tests.simulation.worlds import seeded_world, comparable
+
+
+def _world(seed):
+    return seeded_world(seed, creatures=60, food=40)
+
+
+class TestRegionGrid(unittest.TestCase):
+
+    def test_assign_and_bounds(self):
+        grid = RegionGrid(400, 300, 2, 3)
+        self.assertEqual(len(grid), 6)
+        regions = grid.assign(np.array([0, 399, 250, -5, 1000]), np.array([0, 0, 299, 150, 150]))
+        self.assertEqual(regions.tolist(), [0, 1, 5, 2, 3])
+        self.assertEqual(grid.bounds(5), (200, 200, 400, 300))
+
+
+class TestRegionFood(unittest.TestCase):
+
+    def test_matches_the_whole_world_inside_the_region(self):
+        rng = np.random.default_rng(2)
+        x, y = rng.uniform(0, 1000, 40), rng.uniform(0, 1000, 40)
+        world = SpatialHash(50)
+        for slot, (food_x, food_y) in enumerate(zip(x.tolist(), y.tolist())):
+            world.insert(slot, food_x, food_y, {'x': food_x, 'y': food_y})
+        food = RegionFood(50, (-np.inf, -np.inf, 600, 600))  # Region (0, 0, 500, 500), margin 100
+        food.update(x, y)
+        self.assertLess(len(food.local), 40)
+        for query_x, query_y in rng.uniform(0, 500, (200, 2)).tolist():
+            self.assertEqual(food.nearest(query_x, query_y), world.nearest(query_x, query_y))
+
+    def test_far_food_is_found_through_the_whole_world(self):
+        food = RegionFood(50, (-np.inf, -np.inf, 600, 600))
+        food.update(np.array([900.0]), np.array([900.0]))
+        self.assertEqual(len(food.local), 0)
+        item, distance = food.nearest(0, 0)
+        self.assertEqual(item, {'x': 900.0, 'y': 900.0})
+        self.assertAlmostEqual(distance, 900 * np.sqrt(2))
+
+
+class TestSharedArena(unittest.TestCase):
+
+    def test_view_maps_the_same_memory(self):
+        arena = SharedArena()
+        self.addCleanup(arena.close)
+        column = arena.allocate("creature.x", (4,), float)
+        column[:] = [1, 2, 3, 4]
+        view = SharedView()
+        self.addCleanup(view.close)
+        mapped = view.update(arena.layout)["creature.x"]
+        self.assertEqual(mapped.tolist(), [1, 2, 3, 4])
+        mapped[0] = 9
+        self.assertEqual(column[0], 9)
+
+        generation = arena.generation
+        arena.allocate("creature.x", (8,), float)
+        self.assertGreater(arena.generation, generation)
+        self.assertEqual(view.update(arena.layout)["creature.x"].shape, (8,))
+
+    def test_retired_segments_close_once_dropped(self):
+        arena = SharedArena()
+        self.addCleanup(arena.close)
+        column = arena.allocate("creature.x", (4,), float)
+        arena.allocate("creature.x", (8,), float)
+        arena.allocate("creature.y", (8,), float)
+        self.assertEqual(len(arena.retired), 1)  # `column` still uses it
+        del column
+        arena.allocate("creature.y", (8,), float)
+        self.assertEqual(len(arena.retired), 1)  # Only the creature.y just replaced
+        self.assertIsNone(arena.retired[0][1]())
+
+    def test_close_fails_under_a_live_array(self):
+        arena = SharedArena()
+        column = arena.allocate("creature.x", (4,), float)
+        with self.assertRaises(BufferError):
+            arena.close()
+        del column
+        arena.close()
+        self.assertEqual(arena.retired, [])
+
+    def test_population_moves_into_and_grows_in_arena(self):
+        arena = SharedArena()
+        self.addCleanup(arena.close)
+        environment = _world(1)
+        population = environment.population
+        before = comparable(environment)
+        population.set_allocator(arena.allocate)
+        self.addCleanup(population.set_allocator, private_zeros)  # Runs before arena.close
+        self.assertIs(population.x, arena.arrays["creature.x"])
+        self.assertIs(population.networks.weights_input_hidden, arena.arrays["network.weights_input_hidden"])
+        self.assertEqual(comparable(environment), before)
+
+        for _ in range(population.capacity - population.count + 1):
+            environment.add_bitling(Bitling(x=1, y=1, environment=environment))
+        self.assertIs(population.x, arena.arrays["creature.x"])
+        self.assertEqual(arena.arrays["creature.x"].shape, (population.capacity,))
+
+
+class TestShardedEngine(unittest.TestCase):
+
+    def test_matches_serial_decisions(self):
+        serial = Simulation(_world(4))
+        environment = _world(4)
+        engine = ShardedEngine(environment, regions=(2, 2))
+        sharded = Simulation(environment, decider=engine)
+        try:
+            for tick in range(15):
+                for simulation in (serial, sharded):
+                    random.seed(tick)
+                    np.random.seed(tick)
+                    simulation.step(0.1)
+                self.assertEqual(comparable(environment), comparable(serial.environment))
+            stats = engine.stats()
+            self.assertEqual(stats["workers"], 4)
+            self.assertEqual(sum(stats["shard_sizes"]), environment.population.count)
+        finally:
+            engine.close()
+        # The population keeps working on private storage afterwards
+        self.assertEqual(len(engine.arena.segments), 0)
+        Simulation(environment).step(0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
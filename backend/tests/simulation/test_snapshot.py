@@ -0,0 +1,117 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import sys
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.creature.bitling import Bitling
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.simulation.snapshot import (save_snapshot, load_snapshot, capture_snapshot,
+                                                  MANIFEST)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(5)
+        np.random.seed(5)
+        self.environment = Environment(width=400, height=300, initial_creatures=20, initial_food=15)
+        simulation = Simulation(self.environment)
+        for _ in range(10):
+            simulation.step(0.1)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "world")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _assert_same_world(self, restored):
+        self.assertEqual(restored.get_state(), self.environment.get_state())
+        self.assertEqual((restored.width, restored.height, restored.tick),
+                         (self.environment.width, self.environment.height, self.environment.tick))
+        for original, copy in zip(self.environment.bitlings, restored.bitlings):
+            np.testing.assert_array_equal(copy.network.weights_input_hidden,
+                                          original.network.weights_input_hidden)
+            np.testing.assert_array_equal(copy.network.bias_output, original.network.bias_output)
+            self.assertEqual(copy.target_food_item_id, original.target_food_item_id)
+            self.assertEqual(copy.target_food_pos, original.target_food_pos)
+            self.assertEqual(copy.action_chosen_by_network_for_learning,
+                             original.action_chosen_by_network_for_learning)
+        self.assertEqual(restored.food.claims, self.environment.food.claims)
+
+    def test_round_trip(self):
+        save_snapshot(self.environment, self.path)
+        self._assert_same_world(load_snapshot(self.path))
+
+    def test_memory_mapped_world_keeps_running(self):
+        save_snapshot(self.environment, self.path)
+        restored = load_snapshot(self.path, mmap=True)
+        self._assert_same_world(restored)
+        simulation = Simulation(restored)
+        simulation.step(0.1)
+        restored.add_bitling(Bitling(x=10, y=10, environment=restored))
+        simulation.step(0.1)
+        self.assertEqual(restored.population.count, len(restored.bitlings))
+        # Copy-on-write: the snapshot on disk is unchanged
+        self._assert_same_world(load_snapshot(self.path))
+
+    def test_weights_are_stored_as_contiguous_arrays(self):
+        snapshot = capture_snapshot(self.environment)
+        weights = snapshot.arrays["network.weights_input_hidden"]
+        self.assertEqual(weights.shape, (20, 5, 4))
+        self.assertTrue(weights.flags["C_CONTIGUOUS"])
+        self.assertNotIn("bitlings", snapshot.manifest)
+
+    def test_codes_follow_saved_tables(self):
+        save_snapshot(self.environment, self.path)
+        manifest_path = os.path.join(self.path, MANIFEST)
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        # Pretend the snapshot was written with "idle" and "wandering" swapped
+        actions = manifest["tables"]["actions"]
+        actions[0], actions[1] = actions[1], actions[0]
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        restored = load_snapshot(self.path)
+        swap = {"idle": "wandering", "wandering": "idle"}
+        self.assertEqual([b.current_action for b in restored.bitlings],
+                         [swap.get(b.current_action, b.current_action) for b in self.environment.bitlings])
+
+    def test_version_1_loads_without_traces(self):
+        """Snapshots written before eligibility traces existed load with empty traces."""
+        save_snapshot(self.environment, self.path)
+        manifest_path = os.path.join(self.path, MANIFEST)
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["version"] = 1
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        for name in ("trace_input_hidden", "trace_hidden_output"):
+            os.remove(os.path.join(self.path, f"network.{name}.npy"))
+        restored = load_snapshot(self.path)
+        self._assert_same_world(restored)
+        self.assertFalse(restored.population.networks.trace_input_hidden.any())
+        Simulation(restored).step(0.1)
+
+    def test_unknown_version_is_rejected(self):
+        save_snapshot(self.environment, self.path)
+        manifest_path = os.path.join(self.path, MANIFEST)
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["version"] = 999
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        with self.assertRaises(ValueError):
+            load_snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import math
+import random
+import sys
+import os
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.simulation.spatial import SpatialHash
+from backend.bitlings.simulation.environment import Environment
+
+
+class TestSpatialHash(unittest.TestCase):
+
+    def setUp(self):
+        """Index a reproducible scatter of points."""
+        rng = random.Random(3)
+        self.index = SpatialHash(cell_size=25)
+        self.points = {}
+        for i in range(300):
+            x, y = rng.uniform(-200, 800), rng.uniform(0, 600)
+            self.points[i] = (x, y)
+            self.index.insert(i, x, y)
+        self.queries = [(rng.uniform(-300, 900), rng.uniform(-100, 700)) for _ in range(50)]
+
+    def _brute_nearest(self, x, y, predicate=lambda key: True):
+        candidates = [(math.hypot(px - x, py - y), key)
+                      for key, (px, py) in self.points.items() if predicate(key)]
+        return min(candidates) if candidates else (float('inf'), None)
+
+    def test_nearest_matches_brute_force(self):
+        """Ring search returns the same nearest item as a full scan."""
+        for x, y in self.queries:
+            item, distance = self.index.nearest(x, y)
+            expected_distance, _ = self._brute_nearest(x, y)
+            self.assertAlmostEqual(distance, expected_distance)
+            self.assertAlmostEqual(math.hypot(self.points[item][0] - x, self.points[item][1] - y), distance)
+
+    def test_nearest_with_predicate_and_removal(self):
+        """Filtered queries and removals are honoured."""
+        for key in range(0, 300, 3):
+            self.index.remove(key)
+            del self.points[key]
+        is_even = lambda key: key % 2 == 0
+        for x, y in self.queries:
+            item, distance = self.index.nearest(x, y, predicate=is_even)
+            expected_distance, _ = self._brute_nearest(x, y, is_even)
+            self.assertAlmostEqual(distance, expected_distance)
+            self.assertTrue(is_even(item))
+
+    def test_query_radius_matches_brute_force(self):
+        """Radius queries return exactly the points inside the circle, nearest first."""
+        for x, y in self.queries[:10]:
+            found = self.index.query_radius(x, y, 80)
+            expected = sorted(key for key, (px, py) in self.points.items()
+                              if math.hypot(px - x, py - y) <= 80)
+            self.assertEqual(sorted(item for item, _ in found), expected)
+            distances = [distance for _, distance in found]
+            self.assertEqual(distances, sorted(distances))
+
+    def test_query_rect_matches_brute_force(self):
+        """Rectangle queries return exactly the points inside the rectangle."""
+        for x, y in self.queries[:10]:
+            for width, height in ((120, 60), (2000, 2000), (0, 0)):
+                found = self.index.query_rect(x, y, x + width, y + height)
+                expected = sorted(key for key, (px, py) in self.points.items()
+                                  if x <= px <= x + width and y <= py <= y + height)
+                self.assertEqual(sorted(found), expected)
+        self.assertEqual(self.index.query_rect(5000, 5000, 6000, 6000), [])
+
+    def test_move_and_empty_index(self):
+        """Moving updates the cell; an empty index finds nothing."""
+        self.index.move(0, 1000, 1000)
+        item, distance = self.index.nearest(1001, 1000)
+        self.assertEqual(item, 0)
+        self.assertAlmostEqual(distance, 1.0)
+        self.assertEqual(SpatialHash().nearest(0, 0), (None, float('inf')))
+
+
+class TestEnvironmentIndexes(unittest.TestCase):
+
+    def test_indexes_follow_food_and_obstacles(self):
+        """add_food, remove_food, add_obstacle and list assignment keep the indexes in sync."""
+        environment = Environment(width=100, height=100, cell_size=10)
+        environment.food_sources = []
+        environment.add_food({'id': 'a', 'x': 10, 'y': 10, 'emoji': '🍎'})
+        environment.add_food({'id': 'b', 'x': 90, 'y': 90, 'emoji': '🍎'})
+        food, distance = environment.nearest_food(12, 10)
+        self.assertEqual(food['id'], 'a')
+        self.assertAlmostEqual(distance, 2.0)
+
+        self.assertTrue(environment.remove_food('a'))
+        self.assertEqual(environment.nearest_food(12, 10)[0]['id'], 'b')
+        self.assertEqual([f['id'] for f in environment.food_sources], ['b'])
+
+        environment.obstacles = []
+        environment.add_obstacle(x=50, y=50, radius=5)
+        obstacle, distance = environment.nearest_obstacle(50, 60)
+        self.assertAlmostEqual(distance, 10.0)
+        self.assertEqual(len(environment.obstacles_within(50, 60, 9)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
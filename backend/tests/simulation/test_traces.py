@@ -0,0 +1,131 @@
+import random
+import types
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.simulation.traces import EligibilityTraces
+
+
+class TestEligibilityTraces(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(3)
+        np.random.seed(3)
+        self.environment = Environment(width=400, height=300, initial_creatures=30, initial_food=20)
+        self.population = self.environment.population
+        self.networks = self.population.networks
+
+    def test_decay_follows_half_life(self):
+        traces = EligibilityTraces(half_life=2.0)
+        self.assertAlmostEqual(traces.decay(2.0), 0.5)
+        self.assertAlmostEqual(traces.decay(0.1) ** 20, 0.5)
+        self.assertEqual(EligibilityTraces(half_life=0).decay(0.1), 0.0)
+
+    def test_stress_drop_reinforces_traces(self):
+        traces = EligibilityTraces()
+        Simulation(self.environment).step(0.1)
+        traces.mark(self.population, 0.1)
+        self.assertTrue(self.networks.trace_hidden_output[0].any())
+
+        count = self.population.count
+        stress_before = self.population.stress[:count].copy()
+        self.population.stress[1] = stress_before[1] - 25.0  # Row 1 just ate
+        weights = self.networks.weights_hidden_output.copy()
+        self.assertEqual(traces.reward(self.population, stress_before), 1)
+
+        learning_rate = self.population.views[1].network.learning_rate
+        np.testing.assert_allclose(self.networks.weights_hidden_output[1],
+                                   weights[1] + learning_rate * self.networks.trace_hidden_output[1])
+        np.testing.assert_array_equal(self.networks.weights_hidden_output[0], weights[0])
+
+    def test_only_decided_rows_are_marked(self):
+        traces = EligibilityTraces(half_life=2.0)
+        Simulation(self.environment).step(0.1)
+        traces.mark(self.population, 0.1, rows=[0])
+        self.assertTrue(self.networks.trace_hidden_output[0].any())
+        self.assertFalse(self.networks.trace_hidden_output[1].any())
+        first = self.networks.trace_hidden_output[0].copy()
+
+        # Nineteen ticks without a decision leave the trace alone...
+        for _ in range(19):
+            traces.mark(self.population, 0.1, rows=[])
+        np.testing.assert_array_equal(self.networks.trace_hidden_output[0], first)
+        # ...and the next mark decays it by the two seconds since the last one
+        action = self.networks.chosen_actions([0])[0]
+        traces.mark(self.population, 0.1, rows=[0])
+        expected = first * 0.5
+        expected[:, action] += 0.5 * self.networks.hidden_activations[0]
+        np.testing.assert_allclose(self.networks.trace_hidden_output[0], expected)
+
+    def test_first_mark_takes_the_activity_as_is(self):
+        traces = EligibilityTraces(half_life=2.0)
+        Simulation(self.environment).step(0.1)
+        action = self.networks.chosen_actions([0])[0]
+        traces.mark(self.population, 0.1, rows=[0])
+        expected = np.zeros_like(self.networks.trace_hidden_output[0])
+        expected[:, action] = self.networks.hidden_activations[0]
+        np.testing.assert_allclose(self.networks.trace_hidden_output[0], expected)
+
+    def test_one_meal_is_bounded_at_any_tick_rate(self):
+        changes = []
+        for sim_hz in (10, 50):
+            random.seed(3)
+            np.random.seed(3)
+            environment = Environment(width=400, height=300, initial_creatures=30, initial_food=20)
+            simulation = Simulation(environment, traces=EligibilityTraces(half_life=2.0))
+            for _ in range(2 * sim_hz):
+                simulation.step(1.0 / sim_hz)
+            # Row 0 finishes a meal this tick, with nobody deciding in between
+            simulation.decider = types.SimpleNamespace(choose_actions=lambda: None,
+                                                       last_decided_rows=np.zeros(0, dtype=np.intp))
+            bitling = environment.population.views[0]
+            bitling.current_action, bitling.action_timer = "eating", 0.0
+            bitling.action_chosen_by_network_for_learning = "eating"
+            bitling.hunger, bitling.energy = 80.0, 100.0
+            networks = environment.population.networks
+            before = networks.weights_hidden_output[0].copy(), networks.weights_input_hidden[0].copy()
+            simulation.step(1.0 / sim_hz)
+            change = max(np.abs(networks.weights_hidden_output[0] - before[0]).max(),
+                         np.abs(networks.weights_input_hidden[0] - before[1]).max())
+            # Activities are at most 1 and a meal is worth a reward of 1: one
+            # learning-rate step, as the immediate rule would take
+            self.assertGreater(change, 0)
+            self.assertLessEqual(change, bitling.network.learning_rate)
+            changes.append(change)
+        self.assertLess(max(changes) / min(changes), 2.0)
+
+    def test_reward_decays_traces_to_now(self):
+        traces = EligibilityTraces(half_life=1.0)
+        Simulation(self.environment).step(0.1)
+        traces.mark(self.population, 0.1, rows=[1])
+        for _ in range(10):
+            traces.mark(self.population, 0.1, rows=[])
+        count = self.population.count
+        stress_before = self.population.stress[:count].copy()
+        self.population.stress[1] = stress_before[1] - 25.0
+        weights = self.networks.weights_hidden_output.copy()
+        traces.reward(self.population, stress_before)
+        learning_rate = self.population.views[1].network.learning_rate
+        np.testing.assert_allclose(self.networks.weights_hidden_output[1],
+                                   weights[1] + learning_rate * 0.5 * self.networks.trace_hidden_output[1])
+
+    def test_memory_is_fixed_per_creature(self):
+        simulation = Simulation(self.environment, traces=EligibilityTraces(half_life=30.0))
+        shape = self.networks.trace_input_hidden.shape
+        for _ in range(50):
+            simulation.step(0.1)
+        self.assertEqual(self.networks.trace_input_hidden.shape, shape)
+        self.assertEqual(self.networks.trace_input_hidden.nbytes, self.networks.weights_input_hidden.nbytes)
+        self.assertEqual(self.networks.trace_hidden_output.nbytes, self.networks.weights_hidden_output.nbytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
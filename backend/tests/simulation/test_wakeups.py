@@ -0,0 +1,96 @@
+import random
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adjust the Python path to include the 'backend' directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.bitlings.creature.bitling import Bitling
+from backend.bitlings.simulation.environment import Environment
+from backend.bitlings.simulation.loop import Simulation
+from backend.bitlings.simulation.parallel import make_decider
+from backend.bitlings.simulation.wakeups import DecisionScheduler
+
+
+class TestDecisionScheduler(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(4)
+        np.random.seed(4)
+        self.environment = Environment(width=1000, height=1000, initial_creatures=0, initial_food=0)
+        self.environment.obstacles = []
+        self.near = Bitling(x=100, y=100, environment=self.environment)
+        self.far = Bitling(x=900, y=900, environment=self.environment)
+        for bitling in (self.near, self.far):
+            self.environment.add_bitling(bitling)
+        self.scheduler = DecisionScheduler(self.environment, idle_interval=0.5, stimulus_radius=100)
+        self.simulation = Simulation(self.environment, decider=self.scheduler)
+        # Record who is decided each tick
+        self.decided = []
+        choose_actions = self.environment.choose_actions
+        def record(creatures=None):
+            self.decided.append(list(creatures))
+            choose_actions(creatures)
+        self.environment.choose_actions = record
+
+    def _rest(self, bitling):
+        """Leave `bitling` idle by decision, as if the network chose "idle"."""
+        bitling.current_action = "idle"
+        self.scheduler.resting.add(bitling)
+        self.scheduler.schedule(bitling, self.environment.time + self.scheduler.idle_interval)
+
+    def test_new_creatures_decide_on_their_first_tick(self):
+        self.simulation.step(0.1)
+        self.assertEqual(self.decided, [[self.near, self.far]])
+        self.assertEqual(self.scheduler.stats()["woken"]["finished"], 2)
+
+    def test_timed_actions_run_to_completion(self):
+        for bitling in (self.near, self.far):
+            bitling.current_action = "eating"
+            bitling.action_timer = 2.0
+            self.scheduler.schedule(bitling, self.scheduler.max_wait)
+        for _ in range(19):
+            self.simulation.step(0.1)
+            self.assertEqual(self.near.current_action, "eating")
+        self.assertEqual(self.decided, [])
+        self.simulation.step(0.1)  # The meal ends in this tick's execute phase
+        self.simulation.step(0.1)
+        self.assertEqual(self.decided, [[self.near, self.far]])
+
+    def test_idle_creatures_wait_for_their_timer(self):
+        self._rest(self.near)
+        self._rest(self.far)
+        for _ in range(4):
+            self.simulation.step(0.1)
+        self.assertEqual(self.decided, [])
+        self.simulation.step(0.1)
+        self.assertEqual(self.decided, [[self.near, self.far]])
+        self.assertEqual(self.scheduler.woken["timer"], 2)
+
+    def test_food_wakes_creatures_nearby(self):
+        self._rest(self.near)
+        self._rest(self.far)
+        self.environment.add_food({'id': 'apple', 'x': 150, 'y': 120})
+        self.simulation.step(0.1)
+        self.assertEqual(self.decided, [[self.near]])
+        self.assertEqual(self.scheduler.woken["stimulus"], 1)
+
+    def test_dead_creatures_leave_the_queue(self):
+        self._rest(self.near)
+        self._rest(self.far)
+        self.far.health = 0
+        for _ in range(5):
+            self.simulation.step(0.1)
+        self.assertEqual(self.decided, [[self.near]])
+        self.assertNotIn(self.far, self.scheduler.resting)
+        self.assertNotIn(self.far, self.scheduler.wake_at)
+
+    def test_scheduled_mode(self):
+        self.assertIsInstance(make_decider(self.environment, "scheduled"), DecisionScheduler)
+
+
+if __name__ == '__main__':
+    unittest.main()
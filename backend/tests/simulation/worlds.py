@@ -0,0 +1,20 @@
+"""Seeded worlds shared by the tests that compare decision modes against the serial loop."""
+import random
+
+import numpy as np
+
+from backend.bitlings.simulation.environment import Environment
+
+
+def seeded_world(seed: int, creatures: int, food: int) -> Environment:
+    """A 400x300 world populated after seeding both random generators with `seed`."""
+    random.seed(seed)
+    np.random.seed(seed)
+    return Environment(width=400, height=300, initial_creatures=creatures, initial_food=food)
+
+
+def comparable(environment):
+    """World state without the random UUIDs."""
+    state = environment.get_state()
+    creatures = [{k: v for k, v in creature.items() if k != "id"} for creature in state["bitlings"]]
+    return creatures, [(food["x"], food["y"]) for food in state["food"]]
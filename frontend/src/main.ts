@@ -1,11 +1,12 @@
 import * as PIXI from 'pixi.js';
-import { websocketClient } from "./network/websocketClient"
+import { websocketClient, WireEncoding } from "./network/websocketClient"
 import { Renderer } from "./rendering/renderer"
 import { SimulationState } from "./simulation/state"
 import { setupUI } from "./ui/hud"
 
 // --- Configuration ---
 const BACKEND_URL = 'ws://localhost:8765'; // Adjust if needed
+const WIRE_ENCODING: WireEncoding = 'json'; // 'binary' for compact world updates
 
 // --- Initialization ---
 console.log('Bitlings frontend initializing...');
@@ -32,10 +33,15 @@ renderer.start(); // Start the rendering loop
 console.log('Renderer Initialized');
 
 // 4. Initialize WebSocket Client
-const ws = new websocketClient(BACKEND_URL, simulationState);
+const ws = new websocketClient(BACKEND_URL, simulationState, WIRE_ENCODING);
+ws.setViewport(renderer.getViewport());
 ws.connect();
 console.log('WebSocket Client Initializing');
 
+// Keep the server's view of what we show up to date, so it only sends nearby entities
+// (deferred a frame: Pixi applies resizeTo on the next animation frame)
+window.addEventListener('resize', () => requestAnimationFrame(() => ws.setViewport(renderer.getViewport())));
+
 // 5. Setup UI Interactions
 // Pass necessary references (websocket, renderer, state) to the UI setup
 setupUI(ws, renderer, simulationState);
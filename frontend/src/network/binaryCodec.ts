@@ -0,0 +1,88 @@
+// src/network/binaryCodec.ts
+// Decoder for the backend's binary world frames (see backend bitlings/network/binary.py).
+//
+// Layout, all little-endian:
+//   header   u8 version, u8 kind (0 keyframe, 1 delta), u32 seq, u32 base_seq, u32 count
+//   columns  count x 16-byte UUID ids, count x f32 x, count x f32 y,
+//            then one u8 column each for BYTE_COLUMNS
+//   trailer  u32 length + UTF-8 JSON (food, obstacles, removed creature ids)
+
+export interface CodeDictionary {
+    emojis: string[];
+    actions: string[];
+}
+
+const FRAME_VERSION = 1;
+const KIND_KEYFRAME = 0;
+const HEADER_SIZE = 14;
+const BYTE_COLUMNS = ['emoji', 'action', 'health', 'hunger', 'energy', 'mood', 'stress'] as const;
+
+const textDecoder = new TextDecoder();
+
+function uuidFromBytes(bytes: Uint8Array, offset: number): string {
+    let hex = '';
+    for (let i = 0; i < 16; i++) {
+        hex += bytes[offset + i].toString(16).padStart(2, '0');
+    }
+    return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+}
+
+/**
+ * Decode a binary frame into the same message shape the JSON encoding uses,
+ * so the rest of the client does not care which encoding was negotiated.
+ */
+export function decodeBinaryFrame(buffer: ArrayBuffer, dictionary: CodeDictionary): any {
+    const view = new DataView(buffer);
+    const bytes = new Uint8Array(buffer);
+    const version = view.getUint8(0);
+    if (version !== FRAME_VERSION) {
+        throw new Error(`Unsupported binary frame version ${version}`);
+    }
+    const kind = view.getUint8(1);
+    const seq = view.getUint32(2, true);
+    const baseSeq = view.getUint32(6, true);
+    const count = view.getUint32(10, true);
+
+    let offset = HEADER_SIZE;
+    const idsOffset = offset;
+    offset += 16 * count;
+    const xOffset = offset;
+    offset += 4 * count;
+    const yOffset = offset;
+    offset += 4 * count;
+    const columnOffsets: Record<string, number> = {};
+    for (const column of BYTE_COLUMNS) {
+        columnOffsets[column] = offset;
+        offset += count;
+    }
+    const trailerLength = view.getUint32(offset, true);
+    offset += 4;
+    const trailer = JSON.parse(textDecoder.decode(bytes.subarray(offset, offset + trailerLength)));
+
+    const bitlings: Record<string, any>[] = [];
+    for (let i = 0; i < count; i++) {
+        const creature: Record<string, any> = {
+            id: uuidFromBytes(bytes, idsOffset + 16 * i),
+            x: view.getFloat32(xOffset + 4 * i, true),
+            y: view.getFloat32(yOffset + 4 * i, true),
+        };
+        for (const column of BYTE_COLUMNS) {
+            creature[column] = bytes[columnOffsets[column] + i];
+        }
+        creature.emoji = dictionary.emojis[creature.emoji] ?? '❓';
+        creature.action = dictionary.actions[creature.action] ?? 'idle';
+        bitlings.push(creature);
+    }
+
+    if (kind === KIND_KEYFRAME) {
+        return { type: 'world_update', seq, keyframe: true, payload: { ...trailer, bitlings } };
+    }
+    const removed = trailer.bitlings_removed ?? [];
+    delete trailer.bitlings_removed;
+    return {
+        type: 'world_delta',
+        seq,
+        base_seq: baseSeq,
+        payload: { ...trailer, bitlings: { added: [], changed: bitlings, removed } },
+    };
+}
@@ -1,5 +1,17 @@
 // src/network/websocketClient.ts
 import { SimulationState } from "../simulation/state"
+import { CodeDictionary, decodeBinaryFrame } from "./binaryCodec"
+
+// Wire encoding requested from the server for world updates
+export type WireEncoding = 'json' | 'binary';
+
+// World-space rectangle the client is showing; the server only sends entities near it
+export interface Viewport {
+    x: number;
+    y: number;
+    width: number;
+    height: number;
+}
 
 export class websocketClient {
     private url: string;
@@ -7,15 +19,22 @@ export class websocketClient {
     private state: SimulationState;
     private reconnectInterval = 5000; // Try reconnecting every 5 seconds
     private reconnectTimer: number | null = null;
+    private resyncPending = false; // Set while waiting for a keyframe after a missed delta
+    private encoding: WireEncoding;
+    private dictionary: CodeDictionary = { emojis: [], actions: [] };
+    private viewport: Viewport | null = null; // Last viewport reported to the server
+    onMetrics: ((metrics: any) => void) | null = null; // Receives replies to requestMetrics()
 
-    constructor(url: string, state: SimulationState) {
+    constructor(url: string, state: SimulationState, encoding: WireEncoding = 'json') {
         this.url = url;
         this.state = state;
+        this.encoding = encoding;
     }
 
     connect() {
         console.log(`Attempting to connect to ${this.url}...`);
         this.ws = new WebSocket(this.url);
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
             console.log('WebSocket connection established.');
@@ -24,13 +43,18 @@ export class websocketClient {
                 clearTimeout(this.reconnectTimer);
                 this.reconnectTimer = null;
             }
-            // Maybe request initial state or send a hello message?
-            // this.sendMessage({ type: 'request_initial_state' });
+            // Negotiate the world update encoding
+            this.sendMessage({ type: 'hello', payload: { encoding: this.encoding } });
+            if (this.viewport) {
+                this.sendMessage({ type: 'viewport', payload: this.viewport });
+            }
         };
 
         this.ws.onmessage = (event) => {
             try {
-                const message = JSON.parse(event.data);
+                const message = event.data instanceof ArrayBuffer
+                    ? decodeBinaryFrame(event.data, this.dictionary)
+                    : JSON.parse(event.data);
                 this.handleMessage(message);
             } catch (error) {
                 console.error('Failed to parse message or handle:', event.data, error);
@@ -58,9 +82,40 @@ export class websocketClient {
         // console.debug('Message received:', message);
         switch (message.type) {
             case 'world_update':
-                this.state.updateWorld(message.payload);
+                // Full keyframe: replaces the whole world
+                this.state.applyKeyframe(message.seq ?? -1, message.payload);
+                this.resyncPending = false;
                 document.getElementById('bitling-count')!.textContent = String(message.payload.bitlings?.length || 0);
                 break;
+            case 'world_delta':
+                if (!this.state.applyDelta(message.seq, message.base_seq, message.payload)) {
+                    // Missed a frame: ask the server for a fresh keyframe
+                    if (!this.resyncPending) {
+                        console.warn(`Out-of-sequence delta ${message.seq} (have ${this.state.seq}), requesting resync`);
+                        this.sendMessage({ type: 'resync' });
+                        this.resyncPending = true;
+                    }
+                    break;
+                }
+                document.getElementById('bitling-count')!.textContent = String(this.state.world.bitlings.length);
+                break;
+            case 'welcome':
+                this.encoding = message.payload.encoding;
+                if (message.payload.dictionary) {
+                    this.dictionary = message.payload.dictionary;
+                }
+                break;
+            case 'dictionary':
+                // Server registered new emoji/action codes
+                this.dictionary = message.payload;
+                break;
+            case 'metrics':
+                if (this.onMetrics) {
+                    this.onMetrics(message.payload);
+                } else {
+                    console.debug('Server metrics:', message.payload);
+                }
+                break;
             case 'pong':
                 console.log('Received pong');
                 break;
@@ -78,6 +133,24 @@ export class websocketClient {
         }
     }
 
+    // Report the visible world rectangle; pass null to receive the whole world again
+    setViewport(viewport: Viewport | null) {
+        const previous = this.viewport;
+        if (previous && viewport && previous.x === viewport.x && previous.y === viewport.y
+            && previous.width === viewport.width && previous.height === viewport.height) {
+            return;
+        }
+        this.viewport = viewport;
+        if (this.isConnected()) {
+            this.sendMessage({ type: 'viewport', payload: viewport });
+        }
+    }
+
+    // Ask the server for a snapshot of its loop metrics (answered with a 'metrics' message)
+    requestMetrics() {
+        this.sendMessage({ type: 'metrics' });
+    }
+
     isConnected(): boolean {
         return this.ws?.readyState === WebSocket.OPEN;
     }
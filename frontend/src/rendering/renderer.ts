@@ -79,6 +79,18 @@ export class Renderer {
         }
     }
 
+    // World-space rectangle currently on screen
+    getViewport(): { x: number; y: number; width: number; height: number } {
+        const topLeft = this.getWorldCoordinates(0, 0);
+        const bottomRight = this.getWorldCoordinates(this.app.screen.width, this.app.screen.height);
+        return {
+            x: topLeft.x,
+            y: topLeft.y,
+            width: bottomRight.x - topLeft.x,
+            height: bottomRight.y - topLeft.y,
+        };
+    }
+
     // --- Interaction Methods ---
     // Get world coordinates from screen coordinates (needed for clicking)
     getWorldCoordinates(screenX: number, screenY: number): { x: number; y: number } {
@@ -17,22 +17,86 @@ export interface FoodState {
     emoji: string;
 }
 
+export interface ObstacleState {
+    id: string;
+    x: number;
+    y: number;
+    radius: number;
+    emoji: string;
+}
+
 export interface WorldState {
     bitlings: BitlingState[];
     food: FoodState[];
+    obstacles?: ObstacleState[];
     // Add other potential world objects (trees, rocks) later
 }
 
+// Changes to one entity collection since the previous frame
+export interface CollectionDelta<T> {
+    added: T[];
+    changed: T[];
+    removed: string[];
+}
+
+export interface WorldDelta {
+    bitlings?: CollectionDelta<BitlingState>;
+    food?: CollectionDelta<FoodState>;
+    obstacles?: CollectionDelta<ObstacleState>;
+}
+
 export class SimulationState {
     public world: WorldState = {
         bitlings: [],
         food: [],
     };
 
+    // Sequence number of the last frame applied, -1 until the first keyframe
+    public seq = -1;
+
+    private bitlings = new Map<string, BitlingState>();
+    private food = new Map<string, FoodState>();
+    private obstacles = new Map<string, ObstacleState>();
+
     updateWorld(newState: WorldState) {
-        // Directly replace state for now.
-        // Later, could implement more granular updates if needed for performance.
+        // Directly replace state (used for keyframes).
         this.world = newState;
+        this.bitlings = new Map(newState.bitlings?.map((b) => [b.id, b]) ?? []);
+        this.food = new Map(newState.food?.map((f) => [f.id, f]) ?? []);
+        this.obstacles = new Map(newState.obstacles?.map((o) => [o.id, o]) ?? []);
         // console.log("World state updated:", this.world);
     }
-}
\ No newline at end of file
+
+    applyKeyframe(seq: number, newState: WorldState) {
+        this.updateWorld(newState);
+        this.seq = seq;
+    }
+
+    /**
+     * Apply a delta on top of the current world.
+     * Returns false (and changes nothing) if the delta does not follow the
+     * last applied frame; the caller should then request a resync.
+     */
+    applyDelta(seq: number, baseSeq: number, delta: WorldDelta): boolean {
+        if (this.seq < 0 || baseSeq !== this.seq) {
+            return false;
+        }
+        applyCollection(this.bitlings, delta.bitlings);
+        applyCollection(this.food, delta.food);
+        applyCollection(this.obstacles, delta.obstacles);
+        this.world = {
+            bitlings: Array.from(this.bitlings.values()),
+            food: Array.from(this.food.values()),
+            obstacles: Array.from(this.obstacles.values()),
+        };
+        this.seq = seq;
+        return true;
+    }
+}
+
+function applyCollection<T extends { id: string }>(entities: Map<string, T>, delta?: CollectionDelta<T>) {
+    if (!delta) return;
+    for (const id of delta.removed) entities.delete(id);
+    for (const entity of delta.added) entities.set(entity.id, entity);
+    for (const entity of delta.changed) entities.set(entity.id, entity);
+}